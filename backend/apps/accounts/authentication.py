@@ -0,0 +1,137 @@
+"""JWT authentication with a cached user principal.
+
+``JWTAuthentication.get_user`` loads the full ``users`` row on every request.
+``CachedJWTAuthentication`` keeps a compact copy of the columns that
+permission checks and ``UserSerializer`` need (role, account status, flags,
+ids, profile) in a per-process LRU backed by the shared Django cache, and
+rebuilds a ``User`` instance from it. Columns that are not cached (password,
+``last_login``, ...) stay deferred and are loaded lazily if a view touches
+them, so ``request.user`` behaves like a normal model instance, including
+``class_obj.teacher != request.user`` comparisons.
+
+Shared-cache keys carry a per-user version. ``invalidate_user_principal``
+bumps that version (after the transaction commits, see ``signals``). Every
+lookup reads the current version from the shared cache and local entries
+remember the version they were built from, so a role or ``is_active`` change
+is seen by all processes on their next request; the local tier only saves
+fetching and unpickling the principal itself.
+"""
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from apps.core.cache import LocalLRUCache
+from .models import User
+
+
+PRINCIPAL_FIELDS = (
+    'id', 'email', 'username', 'first_name', 'last_name',
+    'role', 'account_status', 'is_active', 'is_staff', 'is_superuser',
+    'student_id', 'teacher_id', 'department', 'phone', 'avatar',
+    'created_at', 'updated_at', 'last_login_at',
+)
+
+LOCAL_TTL = getattr(settings, 'AUTH_PRINCIPAL_LOCAL_TTL', 30)
+SHARED_TTL = getattr(settings, 'AUTH_PRINCIPAL_CACHE_TTL', 300)
+
+_local = LocalLRUCache(
+    maxsize=getattr(settings, 'AUTH_PRINCIPAL_LOCAL_MAXSIZE', 4096),
+    ttl=LOCAL_TTL,
+)
+_stats = {'local_hits': 0, 'shared_hits': 0, 'misses': 0}
+_stats_lock = threading.Lock()
+
+
+def _version_key(user_id):
+    return f'auth:principal:ver:{user_id}'
+
+
+def _principal_key(user_id, version):
+    return f'auth:principal:{user_id}:{version}'
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def principal_cache_stats():
+    """Return hit/miss counters of this process and the overall hit rate."""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats['local_hits'] + stats['shared_hits'] + stats['misses']
+    hits = stats['local_hits'] + stats['shared_hits']
+    stats['lookups'] = lookups
+    stats['hit_rate'] = round(hits / lookups, 4) if lookups else 0.0
+    stats['local_size'] = len(_local)
+    return stats
+
+
+def invalidate_user_principal(user_id):
+    """Drop the cached principal of a user in every process."""
+    _local.delete(user_id)
+    try:
+        cache.incr(_version_key(user_id))
+    except ValueError:
+        # No version yet: nothing has been cached in the shared tier
+        cache.set(_version_key(user_id), 1, None)
+
+
+def _build_user(values):
+    # ``Model.from_db`` expects values in concrete field order
+    fields = [f.attname for f in User._meta.concrete_fields if f.attname in values]
+    db = router.db_for_read(User)
+    return User.from_db(db, fields, [values[f] for f in fields])
+
+
+def get_user_principal(user_id):
+    """Return a ``User`` rebuilt from the principal cache, or ``None``."""
+    version = cache.get(_version_key(user_id), 0)
+    local = _local.get(user_id)
+    if local is not None and local[0] == version:
+        _count('local_hits')
+        return _build_user(local[1])
+
+    key = _principal_key(user_id, version)
+    entry = cache.get(key)
+    if entry is not None:
+        _count('shared_hits')
+        _local.set(user_id, (version, entry))
+        return _build_user(entry)
+
+    _count('misses')
+    entry = User.objects.filter(pk=user_id).values(*PRINCIPAL_FIELDS).first()
+    if entry is None:
+        return None
+    cache.set(key, entry, SHARED_TTL)
+    _local.set(user_id, (version, entry))
+    return _build_user(entry)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """Drop-in replacement for ``JWTAuthentication`` using the principal cache."""
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN or api_settings.USER_ID_FIELD != 'id':
+            # Revocation checks need the password hash, which is never cached
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = get_user_principal(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
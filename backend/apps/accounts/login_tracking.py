@@ -0,0 +1,134 @@
+"""Write-behind bookkeeping for ``last_login`` / ``last_login_at``.
+
+Writing the login timestamp on every login turns a login storm into a storm
+of single-row UPDATEs on ``users``. Instead:
+
+- a user's timestamp is persisted at most once per
+  ``LAST_LOGIN_WRITE_INTERVAL`` seconds (guarded by ``cache.add``, so the
+  limit holds across processes when the cache is shared);
+- accepted timestamps are buffered in-process and written with a single
+  ``bulk_update`` once ``LAST_LOGIN_FLUSH_SIZE`` entries are pending or
+  ``LAST_LOGIN_FLUSH_INTERVAL`` seconds have passed, and on interpreter exit;
+- a daemon thread, started with the first buffered entry, also flushes every
+  ``LAST_LOGIN_FLUSH_INTERVAL`` seconds, so an idle worker does not sit on
+  its buffer until the next login. A crash or SIGKILL loses at most that
+  interval's worth of timestamps.
+
+The stored value can therefore lag the real last login by up to the write
+interval. ``bulk_update`` does not send ``post_save``, so this does not
+invalidate the cached JWT principal either.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, close_old_connections
+from django.utils import timezone
+
+from .models import User
+
+
+logger = logging.getLogger(__name__)
+
+WRITE_INTERVAL = getattr(settings, 'LAST_LOGIN_WRITE_INTERVAL', 300)
+FLUSH_SIZE = getattr(settings, 'LAST_LOGIN_FLUSH_SIZE', 200)
+FLUSH_INTERVAL = getattr(settings, 'LAST_LOGIN_FLUSH_INTERVAL', 5)
+
+_pending = {}
+_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def _rate_limit_key(user_id):
+    return f'auth:last_login:{user_id}'
+
+
+def record_login(user, when=None):
+    """Stamp ``user`` as logged in and schedule the DB write if it is due.
+
+    The instance is updated in memory right away so the login response shows
+    the new timestamp even when the write is skipped or still buffered.
+    """
+    when = when or timezone.now()
+    user.last_login = when
+    user.last_login_at = when
+
+    if WRITE_INTERVAL > 0 and not cache.add(_rate_limit_key(user.pk), 1, WRITE_INTERVAL):
+        return False
+
+    flusher.start()
+    with _lock:
+        _pending[user.pk] = when
+        due = (
+            len(_pending) >= FLUSH_SIZE
+            or time.monotonic() - _last_flush >= FLUSH_INTERVAL
+        )
+    if due:
+        flush_login_buffer()
+    return True
+
+
+def pending_count():
+    with _lock:
+        return len(_pending)
+
+
+def flush_login_buffer():
+    """Write all buffered timestamps in one ``bulk_update``. Returns the row count."""
+    global _last_flush
+    with _lock:
+        batch = dict(_pending)
+        _pending.clear()
+        _last_flush = time.monotonic()
+    if not batch:
+        return 0
+
+    users = [User(pk=pk, last_login=when, last_login_at=when) for pk, when in batch.items()]
+    try:
+        User.objects.bulk_update(users, ['last_login', 'last_login_at'], batch_size=500)
+    except DatabaseError:
+        logger.exception('Không thể ghi thời gian đăng nhập cho %d tài khoản', len(users))
+        # Let the next login of these users retry the write
+        cache.delete_many([_rate_limit_key(pk) for pk in batch])
+        return 0
+    return len(users)
+
+
+class _Flusher:
+    """One daemon thread calling ``flush_login_buffer`` every ``FLUSH_INTERVAL`` seconds."""
+
+    def __init__(self):
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def start(self):
+        if FLUSH_INTERVAL <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='last-login-flush', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(FLUSH_INTERVAL):
+            if not pending_count():
+                continue
+            try:
+                flush_login_buffer()
+            except Exception:
+                logger.exception('Không thể ghi thời gian đăng nhập')
+            finally:
+                close_old_connections()
+
+
+flusher = _Flusher()
+
+atexit.register(flush_login_buffer)
@@ -0,0 +1,139 @@
+"""
+Django Management Command: Benchmark Login
+Đo số lượt đăng nhập/giây qua /api/auth/login/ trên database test tạm thời
+Chạy: python manage.py benchmark_login --hasher pbkdf2 --iterations 600000
+"""
+
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    CaptureQueriesContext, override_settings,
+    setup_test_environment, teardown_test_environment,
+)
+from rest_framework.test import APIClient
+
+from apps.accounts import login_tracking
+from apps.accounts.hashers import TunedArgon2PasswordHasher, TunedPBKDF2PasswordHasher
+from apps.accounts.models import User
+
+
+PASSWORD = 'Benchmark@123'
+
+HASHERS = {
+    'pbkdf2': 'apps.accounts.hashers.TunedPBKDF2PasswordHasher',
+    'argon2': 'apps.accounts.hashers.TunedArgon2PasswordHasher',
+}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark logins/sec and users-table writes on a throwaway test database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50, help='Number of accounts to create')
+        parser.add_argument('--logins', type=int, default=200, help='Total login requests per pass')
+        parser.add_argument('--hasher', choices=sorted(HASHERS), default='pbkdf2')
+        parser.add_argument('--iterations', type=int, help='PBKDF2 iterations (default: settings)')
+        parser.add_argument('--argon2-time-cost', type=int, help='Argon2 time cost (default: settings)')
+        parser.add_argument('--argon2-memory-cost', type=int, help='Argon2 memory cost in KiB (default: settings)')
+
+    def handle(self, *args, **options):
+        if options['hasher'] == 'argon2':
+            try:
+                import argon2  # noqa: F401
+            except ImportError:
+                raise CommandError('Cần cài đặt argon2-cffi để dùng --hasher argon2')
+
+        overrides = {}
+        if options['iterations']:
+            overrides[(TunedPBKDF2PasswordHasher, 'iterations')] = options['iterations']
+        if options['argon2_time_cost']:
+            overrides[(TunedArgon2PasswordHasher, 'time_cost')] = options['argon2_time_cost']
+        if options['argon2_memory_cost']:
+            overrides[(TunedArgon2PasswordHasher, 'memory_cost')] = options['argon2_memory_cost']
+        originals = {key: getattr(*key) for key in overrides}
+        for (cls, attr), value in overrides.items():
+            setattr(cls, attr, value)
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with override_settings(PASSWORD_HASHERS=[HASHERS[options['hasher']]]):
+                self.run_benchmark(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+            for (cls, attr), value in originals.items():
+                setattr(cls, attr, value)
+
+    def run_benchmark(self, options):
+        hasher = HASHERS[options['hasher']].rsplit('.', 1)[1]
+        if options['hasher'] == 'pbkdf2':
+            cost = f'iterations={TunedPBKDF2PasswordHasher.iterations}'
+        else:
+            cost = (f'time_cost={TunedArgon2PasswordHasher.time_cost}, '
+                    f'memory_cost={TunedArgon2PasswordHasher.memory_cost}')
+        self.stdout.write(self.style.SUCCESS(f'🚀 Login benchmark: {hasher} ({cost})'))
+
+        # One hash shared by every account: creating users stays cheap
+        password_hash = make_password(PASSWORD)
+        User.objects.bulk_create([
+            User(
+                email=f'bench{i}@example.com', username=f'bench{i}',
+                first_name='Bench', last_name=str(i), password=password_hash,
+                role=User.Role.STUDENT, account_status=User.AccountStatus.ACTIVE,
+            )
+            for i in range(options['users'])
+        ])
+        emails = list(User.objects.values_list('email', flat=True))
+
+        hash_rate = self.measure_hash_rate(password_hash)
+        self.stdout.write(f'   Password verify: {hash_rate:.1f} verifications/sec')
+
+        self.run_pass('Write-behind (batched)', emails, options['logins'])
+
+        # Previous behaviour: one UPDATE per login
+        saved = (login_tracking.WRITE_INTERVAL, login_tracking.FLUSH_SIZE)
+        login_tracking.WRITE_INTERVAL, login_tracking.FLUSH_SIZE = 0, 1
+        try:
+            self.run_pass('Direct write per login', emails, options['logins'])
+        finally:
+            login_tracking.WRITE_INTERVAL, login_tracking.FLUSH_SIZE = saved
+
+    def measure_hash_rate(self, password_hash, rounds=5):
+        from django.contrib.auth.hashers import check_password
+        started = time.perf_counter()
+        for _ in range(rounds):
+            check_password(PASSWORD, password_hash)
+        return rounds / (time.perf_counter() - started)
+
+    def run_pass(self, label, emails, logins):
+        cache.delete_many([login_tracking._rate_limit_key(pk) for pk in User.objects.values_list('pk', flat=True)])
+        client = APIClient()
+        failures = 0
+
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for i in range(logins):
+                response = client.post('/api/auth/login/', {
+                    'email': emails[i % len(emails)],
+                    'password': PASSWORD,
+                }, format='json')
+                if response.status_code != 200:
+                    failures += 1
+            login_tracking.flush_login_buffer()
+            elapsed = time.perf_counter() - started
+
+        updates = sum(
+            1 for q in queries.captured_queries
+            if q['sql'].startswith('UPDATE') and 'users' in q['sql'].split('SET')[0]
+        )
+        self.stdout.write(f'\n📊 {label}')
+        self.stdout.write(f'   Logins: {logins} ({failures} failed) in {elapsed:.2f}s')
+        self.stdout.write(self.style.SUCCESS(f'   Throughput: {logins / elapsed:.1f} logins/sec'))
+        self.stdout.write(f'   Queries: {len(queries)} total, {len(queries) / logins:.2f}/login')
+        self.stdout.write(f'   UPDATE users: {updates}')
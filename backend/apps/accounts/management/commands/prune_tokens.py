@@ -0,0 +1,47 @@
+"""
+Django Management Command: Prune Tokens
+Xóa refresh token đã hết hạn (outstanding + blacklisted) theo từng lô
+Chạy: python manage.py prune_tokens [--batch-size 1000] [--warm-cache]
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.accounts.token_store import PRUNE_BATCH_SIZE, prune_expired_tokens, warm_blacklist_cache
+
+
+class Command(BaseCommand):
+    help = 'Delete expired outstanding/blacklisted refresh tokens in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=PRUNE_BATCH_SIZE,
+            help='Rows deleted per transaction',
+        )
+        parser.add_argument(
+            '--grace-hours',
+            type=int,
+            default=0,
+            help='Keep tokens that expired less than this many hours ago',
+        )
+        parser.add_argument(
+            '--warm-cache',
+            action='store_true',
+            help='Load every unexpired blacklisted jti into the cache afterwards',
+        )
+
+    def handle(self, *args, **options):
+        outstanding, blacklisted = prune_expired_tokens(
+            batch_size=options['batch_size'],
+            grace=timedelta(hours=options['grace_hours']),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Deleted {outstanding} outstanding and {blacklisted} blacklisted tokens'
+        ))
+
+        if options['warm_cache']:
+            warmed = warm_blacklist_cache(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'✅ Cached {warmed} blacklisted tokens'))
@@ -4,6 +4,7 @@ from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
 from apps.accounts.models import User
 from apps.accounts.email_utils import send_password_reset_email, send_password_reset_confirmation_email
+from apps.core import mailer
 
 
 class Command(BaseCommand):
@@ -39,6 +40,8 @@ class Command(BaseCommand):
                 reset_url = f"http://localhost:5173/reset-password?uid={uid}&token={token}"
                 
                 success = send_password_reset_email(user, reset_url)
+                # Wait for the background outbox so the result is known before exit
+                mailer.outbox.join()
                 
                 if success:
                     self.stdout.write(
@@ -53,6 +56,8 @@ class Command(BaseCommand):
             elif email_type == 'confirmation':
                 # Send confirmation email
                 success = send_password_reset_confirmation_email(user)
+                # Wait for the background outbox so the result is known before exit
+                mailer.outbox.join()
                 
                 if success:
                     self.stdout.write(
@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+INDEX = models.Index(fields=['expires_at'], name='token_bl_outst_expires_idx')
+
+
+def add_index(apps, schema_editor):
+    OutstandingToken = apps.get_model('token_blacklist', 'OutstandingToken')
+    schema_editor.add_index(OutstandingToken, INDEX)
+
+
+def remove_index(apps, schema_editor):
+    OutstandingToken = apps.get_model('token_blacklist', 'OutstandingToken')
+    schema_editor.remove_index(OutstandingToken, INDEX)
+
+
+class Migration(migrations.Migration):
+    """Index used by apps.accounts.token_store.prune_expired_tokens.
+
+    The model belongs to simplejwt's token_blacklist app, so the index is
+    created directly instead of through AddIndex.
+    """
+
+    dependencies = [
+        ('accounts', '0003_user_status_note'),
+        ('token_blacklist', '0012_alter_outstandingtoken_user'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_index, remove_index),
+    ]
@@ -0,0 +1,19 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import User
+from .authentication import invalidate_user_principal
+
+
+# After commit: bumping earlier lets a concurrent request cache the old row
+# under the new version
+@receiver(post_save, sender=User)
+def invalidate_principal_on_save(sender, instance, **kwargs):
+    user_id = instance.pk
+    transaction.on_commit(lambda: invalidate_user_principal(user_id))
+
+
+@receiver(post_delete, sender=User)
+def invalidate_principal_on_delete(sender, instance, **kwargs):
+    user_id = instance.pk
+    transaction.on_commit(lambda: invalidate_user_principal(user_id))
@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from .token_store import prune_expired_tokens as prune_tokens
+
+
+@shared_task(name='apps.accounts.tasks.prune_expired_tokens', ignore_result=True)
+def prune_expired_tokens():
+    outstanding, blacklisted = prune_tokens()
+    return {'outstanding': outstanding, 'blacklisted': blacklisted}
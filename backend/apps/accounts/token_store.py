@@ -0,0 +1,148 @@
+"""Outstanding/blacklisted refresh token store.
+
+With ``ROTATE_REFRESH_TOKENS`` and ``BLACKLIST_AFTER_ROTATION`` every refresh
+and logout adds rows to ``token_blacklist_outstandingtoken`` and
+``token_blacklist_blacklistedtoken``. This module keeps those tables bounded
+and the blacklist check cheap:
+
+- ``prune_expired_tokens`` deletes expired rows in batches (an expired token
+  is rejected by its ``exp`` claim anyway, so its blacklist row is useless).
+  Run it with ``manage.py prune_tokens`` or the ``prune_expired_tokens``
+  Celery beat task.
+- ``CachedRefreshToken`` records blacklisted ``jti`` values in the Django
+  cache until the token expires. A cache hit rejects the token without a
+  query. A miss falls back to the database unless
+  ``TOKEN_BLACKLIST_CACHE_AUTHORITATIVE`` is on, which is only safe with a
+  shared, persistent cache (Redis) warmed by ``prune_tokens --warm-cache``.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import aware_utcnow, datetime_from_epoch
+
+
+CACHE_ENABLED = getattr(settings, 'TOKEN_BLACKLIST_CACHE', True)
+CACHE_AUTHORITATIVE = getattr(settings, 'TOKEN_BLACKLIST_CACHE_AUTHORITATIVE', False)
+PRUNE_BATCH_SIZE = getattr(settings, 'TOKEN_PRUNE_BATCH_SIZE', 1000)
+
+
+def _blacklist_key(jti):
+    return f'auth:blacklist:{jti}'
+
+
+def _remember_blacklisted(jti, expires_at):
+    if not CACHE_ENABLED:
+        return
+    # Keep the entry until the token would be rejected for expiry anyway
+    timeout = int((expires_at - aware_utcnow()).total_seconds()) + 60
+    if timeout > 0:
+        cache.set(_blacklist_key(jti), 1, timeout)
+
+
+def is_blacklisted(jti):
+    """Blacklist membership, answered from the cache whenever possible."""
+    if CACHE_ENABLED:
+        if cache.get(_blacklist_key(jti)):
+            return True
+        if CACHE_AUTHORITATIVE:
+            return False
+
+    entry = (
+        BlacklistedToken.objects
+        .filter(token__jti=jti)
+        .values_list('token__expires_at', flat=True)
+        .first()
+    )
+    if entry is None:
+        return False
+    _remember_blacklisted(jti, entry)
+    return True
+
+
+def warm_blacklist_cache(batch_size=PRUNE_BATCH_SIZE):
+    """Load every unexpired blacklisted ``jti`` into the cache. Returns the count."""
+    if not CACHE_ENABLED:
+        return 0
+    now = aware_utcnow()
+    rows = (
+        BlacklistedToken.objects
+        .filter(token__expires_at__gt=now)
+        .values_list('token__jti', 'token__expires_at')
+        .iterator(chunk_size=batch_size)
+    )
+    count = 0
+    batch = {}
+    for jti, expires_at in rows:
+        batch[jti] = expires_at
+        if len(batch) >= batch_size:
+            count += _set_many(batch)
+            batch = {}
+    count += _set_many(batch)
+    return count
+
+
+def _set_many(batch):
+    # set_many takes a single timeout: use the longest-lived token in the batch
+    if not batch:
+        return 0
+    timeout = int((max(batch.values()) - aware_utcnow()).total_seconds()) + 60
+    cache.set_many({_blacklist_key(jti): 1 for jti in batch}, timeout)
+    return len(batch)
+
+
+def prune_expired_tokens(batch_size=PRUNE_BATCH_SIZE, grace=timedelta(0)):
+    """Delete expired outstanding tokens and their blacklist rows in batches.
+
+    Each batch is its own short transaction so the tables are never locked
+    for long. Returns ``(outstanding_deleted, blacklisted_deleted)``.
+    """
+    cutoff = aware_utcnow() - grace
+    outstanding_deleted = blacklisted_deleted = 0
+
+    while True:
+        ids = list(
+            OutstandingToken.objects
+            .filter(expires_at__lte=cutoff)
+            .order_by('expires_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        with transaction.atomic():
+            # Delete children first so the cascade has nothing left to collect
+            deleted, _counts = BlacklistedToken.objects.filter(token_id__in=ids).delete()
+            blacklisted_deleted += deleted
+            deleted, _counts = OutstandingToken.objects.filter(id__in=ids).delete()
+            outstanding_deleted += deleted
+        if len(ids) < batch_size:
+            break
+
+    return outstanding_deleted, blacklisted_deleted
+
+
+class CachedRefreshToken(RefreshToken):
+    """``RefreshToken`` whose blacklist check goes through ``is_blacklisted``."""
+
+    def check_blacklist(self):
+        if is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        result = super().blacklist()
+        _remember_blacklisted(
+            self.payload[api_settings.JTI_CLAIM],
+            datetime_from_epoch(self.payload['exp']),
+        )
+        return result
+
+
+class CachedTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = CachedRefreshToken
@@ -20,6 +20,9 @@ urlpatterns = [
     # path('forgot-password/', views.ForgotPasswordView.as_view(), name='forgot_password'),
     # path('reset-password/', views.ResetPasswordView.as_view(), name='reset_password'),
     
+    # Monitoring
+    path('auth-cache-stats/', views.auth_cache_stats, name='auth_cache_stats'),
+
     # Health Check
     path('health/', views.health_check, name='health_check'),
 ]
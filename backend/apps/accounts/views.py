@@ -3,9 +3,11 @@ from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
 from .models import User
+from .authentication import principal_cache_stats
+from .login_tracking import record_login
+from .token_store import CachedRefreshToken
 from .serializers import (
     UserSerializer, 
     UserProfileSerializer,
@@ -98,7 +100,7 @@ class RegisterView(generics.CreateAPIView):
         user = serializer.save()
         
         # Generate tokens
-        refresh = RefreshToken.for_user(user)
+        refresh = CachedRefreshToken.for_user(user)
         
         return Response({
             'message': 'Đăng ký thành công!',
@@ -121,12 +123,11 @@ class LoginView(APIView):
         
         user = serializer.validated_data['user']
         
-        # Update last login
-        user.last_login_at = timezone.now()
-        user.save(update_fields=['last_login_at'])
+        # Update last login (batched, at most once per interval per user)
+        record_login(user)
         
         # Generate tokens
-        refresh = RefreshToken.for_user(user)
+        refresh = CachedRefreshToken.for_user(user)
         
         return Response({
             'message': 'Đăng nhập thành công!',
@@ -146,7 +147,7 @@ class LogoutView(APIView):
         try:
             refresh_token = request.data.get('refresh')
             if refresh_token:
-                token = RefreshToken(refresh_token)
+                token = CachedRefreshToken(refresh_token)
                 token.blacklist()
             
             return Response({
@@ -252,6 +253,15 @@ class AvatarUploadView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def auth_cache_stats(request):
+    """Hit rate of the JWT principal cache in this worker process (admin only)"""
+    if not (request.user.is_superuser or request.user.is_staff or request.user.role == User.Role.ADMIN):
+        return Response({'message': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
+    return Response(principal_cache_stats(), status=status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def health_check(request):
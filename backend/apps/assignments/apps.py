@@ -3,4 +3,13 @@ from django.apps import AppConfig
 
 class AssignmentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.assignments'
\ No newline at end of file
+    name = 'apps.assignments'
+
+    def ready(self):
+        from student_management import celery_app
+        from .deadlines import ASSIGNMENT_SCHEDULER, scheduler
+        # Without Celery the beat entry never fires; fall back to the thread
+        if ASSIGNMENT_SCHEDULER == 'thread' or (ASSIGNMENT_SCHEDULER == 'celery' and celery_app is None):
+            # Started with the first request, so manage.py commands never run it
+            from django.core.signals import request_started
+            request_started.connect(scheduler.start, dispatch_uid='assignment-deadlines')
@@ -0,0 +1,85 @@
+"""Deadline enforcement for assignment submissions.
+
+``expire_submissions`` applies the deadlines with two ``UPDATE ... WHERE``
+statements, each driven by an indexed range on the deadline column:
+
+- drafts of timed assignments whose ``personal_due_at`` (start + time limit)
+  has passed become ``auto_closed``: the time is up and they can no longer be
+  submitted;
+- other drafts whose assignment ``due_at`` has passed are flagged
+  ``is_late``; they may still be handed in, as a late submission.
+
+It runs periodically, picked with ``ASSIGNMENT_SCHEDULER``:
+
+- ``'celery'`` (default): the ``close-expired-submissions`` beat entry;
+- ``'thread'``: a daemon thread in each web process, started with the first
+  request (the updates are idempotent, so several processes may run it);
+- ``'off'``: run ``python manage.py close_expired_submissions --loop`` from
+  cron/systemd instead.
+
+``submit_assignment`` runs the same statements for the one submission being
+handed in, so a late request cannot slip in between two scheduler runs.
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import Assignment, AssignmentSubmission
+
+
+logger = logging.getLogger(__name__)
+
+ASSIGNMENT_SCHEDULER = getattr(settings, 'ASSIGNMENT_SCHEDULER', 'celery')
+INTERVAL = getattr(settings, 'ASSIGNMENT_SCHEDULER_INTERVAL', 60)
+
+
+def expire_submissions(queryset=None, now=None):
+    """Close expired timed drafts and flag overdue ones; returns ``{'closed', 'marked_late'}``."""
+    now = now or timezone.now()
+    submissions = AssignmentSubmission.objects.all() if queryset is None else queryset
+    drafts = submissions.filter(status=AssignmentSubmission.Status.DRAFT)
+
+    closed = drafts.filter(personal_due_at__lt=now).update(
+        status=AssignmentSubmission.Status.AUTO_CLOSED, is_late=True, updated_at=now,
+    )
+    overdue = Assignment.objects.filter(due_at__lt=now).values('id')
+    marked_late = drafts.filter(
+        personal_due_at__isnull=True, is_late=False, assignment_id__in=overdue,
+    ).update(is_late=True, updated_at=now)
+    return {'closed': closed, 'marked_late': marked_late}
+
+
+class _Scheduler:
+    """In-process fallback: one daemon thread calling ``expire_submissions`` every ``INTERVAL`` seconds."""
+
+    def __init__(self):
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def start(self, **kwargs):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='assignment-deadlines', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(INTERVAL):
+            try:
+                result = expire_submissions()
+                if result['closed'] or result['marked_late']:
+                    logger.info('Đã khóa %(closed)d bài hết giờ, đánh dấu trễ %(marked_late)d bài', result)
+            except Exception:
+                logger.exception('Không thể xử lý bài quá hạn')
+            finally:
+                close_old_connections()
+
+
+scheduler = _Scheduler()
@@ -0,0 +1,116 @@
+"""Batch grading of assignment submissions.
+
+``parse_grades`` checks a whole batch against one assignment (one query for
+the submissions) before anything is written; ``apply_grades`` then saves it
+with a single ``bulk_update``. ``sync_assignment_grades`` copies the results
+into ``apps.grades.Grade``.
+"""
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from django.utils import timezone
+
+from apps.grades.upsert import bulk_upsert_grades
+from .models import AssignmentSubmission
+
+
+MAX_BATCH = 1000
+GRADE_FIELDS = ['grade', 'feedback', 'status', 'graded_at', 'graded_by', 'updated_at']
+
+
+def parse_grades(assignment, items):
+    """``(submissions to update, errors)`` for ``[{submission_id, grade, feedback}, ...]``.
+
+    ``grade`` (``0..points_max``) and ``feedback`` are each optional, as in
+    ``grade_submission``, but an item must carry at least one of them.
+    """
+    ids = []
+    for item in items:
+        try:
+            ids.append(int(item['submission_id']))
+        except (KeyError, TypeError, ValueError):
+            ids.append(None)
+    submissions = AssignmentSubmission.objects.filter(assignment=assignment, id__in=[pk for pk in ids if pk]).in_bulk()
+
+    changed = []
+    errors = []
+    seen = set()
+    points_max = assignment.points_max
+    for position, (item, pk) in enumerate(zip(items, ids)):
+        if pk is None:
+            errors.append({'index': position, 'error': 'Thiếu hoặc sai submission_id'})
+            continue
+        if pk in seen:
+            errors.append({'index': position, 'submission_id': pk, 'error': 'submission_id bị lặp'})
+            continue
+        seen.add(pk)
+        subm = submissions.get(pk)
+        if subm is None:
+            errors.append({'index': position, 'submission_id': pk, 'error': 'Bài nộp không thuộc bài tập này'})
+            continue
+        grade = item.get('grade')
+        feedback = item.get('feedback')
+        has_grade = grade is not None and grade != ''
+        if not has_grade and feedback is None:
+            errors.append({'index': position, 'submission_id': pk, 'error': 'Thiếu grade hoặc feedback'})
+            continue
+        if has_grade:
+            try:
+                grade = Decimal(str(grade))
+                if not grade.is_finite():
+                    raise InvalidOperation(grade)
+                grade = grade.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+            except InvalidOperation:
+                errors.append({'index': position, 'submission_id': pk, 'error': 'Điểm không hợp lệ'})
+                continue
+            if not 0 <= grade <= points_max:
+                errors.append({'index': position, 'submission_id': pk, 'error': f'Điểm phải trong khoảng 0..{points_max}'})
+                continue
+            subm.grade = grade
+        if feedback is not None:
+            subm.feedback = feedback
+        changed.append(subm)
+    return changed, errors
+
+
+def apply_grades(submissions, user):
+    """Mark ``submissions`` graded by ``user`` in one ``bulk_update``."""
+    now = timezone.now()
+    for subm in submissions:
+        subm.status = AssignmentSubmission.Status.GRADED
+        subm.graded_at = now
+        subm.graded_by = user
+        # bulk_update skips auto_now
+        subm.updated_at = now
+    AssignmentSubmission.objects.bulk_update(submissions, GRADE_FIELDS, batch_size=500)
+
+
+def sync_assignment_grades(class_obj, subject, student_ids, user):
+    """Write the ``assignment`` grade of ``student_ids`` in ``class_obj``; returns rows written.
+
+    ``Grade`` holds a single ``assignment`` row per student, class and
+    subject, so it receives the mean of the student's graded assignments of
+    the class (latest attempt of each), scaled from ``points_max`` to 10.
+    """
+    latest = {}
+    submissions = (
+        AssignmentSubmission.objects
+        .filter(assignment__class_obj=class_obj, student_id__in=student_ids, grade__isnull=False)
+        .order_by('attempt_number')
+        .values_list('student_id', 'assignment_id', 'grade', 'assignment__points_max')
+    )
+    for student_id, assignment_id, grade, points_max in submissions:
+        if points_max:
+            latest[(student_id, assignment_id)] = grade * 10 / points_max
+
+    scores_by_student = defaultdict(list)
+    for (student_id, _), score in latest.items():
+        scores_by_student[student_id].append(score)
+    scores = {
+        student_id: (
+            (sum(values) / len(values)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP),
+            f'Trung bình {len(values)} bài tập',
+        )
+        for student_id, values in scores_by_student.items()
+    }
+    return bulk_upsert_grades(class_obj, subject, 'assignment', scores, user)
@@ -0,0 +1,32 @@
+"""
+Django Management Command: Close Expired Submissions
+Khóa các bài làm có giới hạn thời gian đã hết giờ và đánh dấu trễ hạn các bài nháp quá hạn nộp
+Chạy: python manage.py close_expired_submissions [--loop] [--interval 60]
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.assignments.deadlines import INTERVAL, expire_submissions
+
+
+class Command(BaseCommand):
+    help = 'Close expired timed drafts and flag overdue drafts as late'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep running, for hosts without Celery beat')
+        parser.add_argument('--interval', type=int, default=INTERVAL,
+                            help='Seconds between runs with --loop (default: ASSIGNMENT_SCHEDULER_INTERVAL)')
+
+    def handle(self, *args, **options):
+        while True:
+            result = expire_submissions()
+            self.stdout.write(self.style.SUCCESS(
+                f"🔒 Closed {result['closed']} expired submissions, ⏰ marked {result['marked_late']} late"
+            ))
+            if not options['loop']:
+                break
+            close_old_connections()
+            time.sleep(options['interval'])
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignments', '0002_alter_assignment_attachment_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['due_at'], name='assignments_due_at_28c63f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assignmentsubmission',
+            index=models.Index(fields=['status', 'personal_due_at'], name='assignment__status_3323e9_idx'),
+        ),
+    ]
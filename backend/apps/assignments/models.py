@@ -4,6 +4,7 @@ from apps.accounts.models import User
 from apps.classes.models import Class
 from apps.attendance.models import AttendanceSession
 from apps.students.models import Student
+from apps.files.storage import blob_storage
 
 
 class Assignment(models.Model):
@@ -18,7 +19,7 @@ class Assignment(models.Model):
     description = models.TextField(blank=True, null=True)
     type = models.CharField(max_length=20, choices=Type.choices, default=Type.ASSIGNMENT)
 
-    attachment = models.FileField(upload_to='assignment_attachments/%Y/%m/', blank=True, null=True)
+    attachment = models.FileField(upload_to='assignment_attachments/%Y/%m/', storage=blob_storage, max_length=255, blank=True, null=True)
 
     release_at = models.DateTimeField(blank=True, null=True)
     due_at = models.DateTimeField(blank=True, null=True)
@@ -40,6 +41,7 @@ class Assignment(models.Model):
         indexes = [
             models.Index(fields=['class_obj']),
             models.Index(fields=['type']),
+            models.Index(fields=['due_at']),
         ]
 
     def __str__(self):
@@ -71,7 +73,7 @@ class AssignmentSubmission(models.Model):
     personal_due_at = models.DateTimeField(blank=True, null=True)
 
     uploaded_at = models.DateTimeField(blank=True, null=True)
-    file = models.FileField(upload_to='assignment_submissions/%Y/%m/', blank=True, null=True)
+    file = models.FileField(upload_to='assignment_submissions/%Y/%m/', storage=blob_storage, max_length=255, blank=True, null=True)
     file_size = models.PositiveIntegerField(default=0)
 
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.DRAFT)
@@ -92,6 +94,8 @@ class AssignmentSubmission(models.Model):
         indexes = [
             models.Index(fields=['assignment']),
             models.Index(fields=['student']),
+            # Range scans of apps.assignments.deadlines
+            models.Index(fields=['status', 'personal_due_at']),
         ]
 
     def __str__(self):
@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from .deadlines import expire_submissions
+
+
+@shared_task(name='apps.assignments.tasks.close_expired_submissions', ignore_result=True)
+def close_expired_submissions():
+    return expire_submissions()
@@ -1,11 +1,22 @@
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
+from django.db import transaction
 from django.utils import timezone
+import os
 
 from apps.classes.models import Class, ClassStudent
 from apps.students.models import Student
+from apps.files.archives import ZipStream, csv_bytes, zip_response
+from apps.files.downloads import serve_file
+from apps.files.models import UploadSession
+from apps.grades.models import Subject
+from apps.grades.upsert import resolve_subject
+from apps.files.uploads import UploadError, open_upload, consume_upload
+from .deadlines import expire_submissions
+from .grading import MAX_BATCH, apply_grades, parse_grades, sync_assignment_grades
 from .models import Assignment, AssignmentSubmission
 from .serializers import AssignmentSerializer, AssignmentCreateSerializer, SubmissionSerializer, MySubmissionSerializer
 
@@ -46,7 +57,7 @@ class AssignmentListCreateView(generics.ListCreateAPIView):
             raise generics.ValidationError('Class not found')
         user = self.request.user
         if user.role != 'admin' and class_obj.teacher != user:
-            raise permissions.PermissionDenied('Bạn không có quyền tạo bài cho lớp này')
+            raise PermissionDenied('Bạn không có quyền tạo bài cho lớp này')
         serializer.save()
 
 
@@ -127,6 +138,64 @@ def grade_submission(request, assignment_id, submission_id):
         return Response({'error': 'Không tìm thấy bài nộp'}, status=status.HTTP_404_NOT_FOUND)
 
 
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def grade_submissions_batch(request, assignment_id):
+    """Grade many submissions of one assignment at once.
+
+    Body: ``{"grades": [{"submission_id", "grade", "feedback"}, ...],
+    "sync_grades": false, "subject_id": null}``. The whole batch is validated
+    first; nothing is saved if any item is invalid. With ``sync_grades`` the
+    students' ``assignment`` grade in ``apps.grades`` is recomputed too.
+    """
+    try:
+        assignment = Assignment.objects.select_related('class_obj').get(id=assignment_id)
+    except Assignment.DoesNotExist:
+        return Response({'error': 'Không tìm thấy bài'}, status=status.HTTP_404_NOT_FOUND)
+    user = request.user
+    if user.role != 'admin' and assignment.class_obj.teacher_id != user.id:
+        return Response({'error': 'Không có quyền'}, status=status.HTTP_403_FORBIDDEN)
+
+    items = request.data.get('grades')
+    if not isinstance(items, list) or not items:
+        return Response({'error': 'Thiếu danh sách grades'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(items) > MAX_BATCH:
+        return Response({'error': f'Tối đa {MAX_BATCH} bài mỗi lần'}, status=status.HTTP_400_BAD_REQUEST)
+
+    sync = str(request.data.get('sync_grades', '')).lower() in ('1', 'true', 'yes')
+    subject = None
+    if sync:
+        # Same rule as the grade endpoints: teachers do not write 'assignment' grades
+        if user.role == 'teacher':
+            return Response({'error': 'Giảng viên chỉ được nhập điểm Thường xuyên (10%) và Giữa kỳ (30%)'}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            subject = resolve_subject(assignment.class_obj, request.data.get('subject_id'))
+        except (Subject.DoesNotExist, ValueError):
+            return Response({'error': 'Subject không tồn tại'}, status=status.HTTP_400_BAD_REQUEST)
+        if not subject:
+            return Response({'error': 'Không xác định được môn học cho lớp này. Hãy truyền subject_id.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    submissions, errors = parse_grades(assignment, items)
+    if errors:
+        return Response({'error': 'Danh sách điểm không hợp lệ', 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    synced = 0
+    with transaction.atomic():
+        apply_grades(submissions, user)
+        if sync:
+            student_ids = {subm.student_id for subm in submissions}
+            synced = sync_assignment_grades(assignment.class_obj, subject, student_ids, user)
+    return Response({
+        'success': True,
+        'graded': len(submissions),
+        'synced_grades': synced,
+        'submissions': [
+            {'id': subm.id, 'grade': subm.grade, 'feedback': subm.feedback, 'status': subm.status}
+            for subm in submissions
+        ],
+    })
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def my_submission(request, assignment_id):
@@ -195,6 +264,13 @@ def submit_assignment(request, assignment_id):
         if not ClassStudent.objects.filter(class_obj=assignment.class_obj, student=student, is_active=True).exists():
             return Response({'error': 'Bạn không thuộc lớp này'}, status=status.HTTP_403_FORBIDDEN)
         f = request.FILES.get('file')
+        upload_id = request.data.get('upload_id')
+        if not f and upload_id:
+            # File sent beforehand through a chunked upload (apps.files)
+            try:
+                f = open_upload(upload_id, user, UploadSession.Purpose.ASSIGNMENT, target_id=assignment.id)
+            except UploadError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         if not f:
             return Response({'error': 'Thiếu file'}, status=status.HTTP_400_BAD_REQUEST)
         if assignment.max_file_size_mb and f.size > assignment.max_file_size_mb * 1024 * 1024:
@@ -206,12 +282,21 @@ def submit_assignment(request, assignment_id):
             if allow and ext not in allow:
                 return Response({'error': f'Chỉ cho phép: {assignment.allowed_file_types}'}, status=status.HTTP_400_BAD_REQUEST)
         subm, _ = AssignmentSubmission.objects.get_or_create(assignment=assignment, student=student, attempt_number=1)
+        # Same rule as the scheduler, in case it has not run since the time ran out
+        expire_submissions(AssignmentSubmission.objects.filter(pk=subm.pk))
+        subm.refresh_from_db(fields=['status', 'is_late'])
+        if subm.status == AssignmentSubmission.Status.AUTO_CLOSED or (
+            subm.personal_due_at and timezone.now() > subm.personal_due_at
+        ):
+            return Response({'error': 'Đã hết thời gian làm bài'}, status=status.HTTP_400_BAD_REQUEST)
         subm.file = f
         subm.file_size = f.size
         subm.uploaded_at = timezone.now()
         subm.status = AssignmentSubmission.Status.SUBMITTED
         subm.compute_late()
         subm.save()
+        if upload_id and not request.FILES.get('file'):
+            consume_upload(f)
         return Response(MySubmissionSerializer(subm).data)
     except Assignment.DoesNotExist:
         return Response({'error': 'Không tìm thấy bài'}, status=status.HTTP_404_NOT_FOUND)
@@ -229,3 +314,92 @@ def list_submissions(request, assignment_id):
         return Response(SubmissionSerializer(subms, many=True).data)
     except Assignment.DoesNotExist:
         return Response({'error': 'Không tìm thấy bài'}, status=status.HTTP_404_NOT_FOUND)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def download_attachment(request, assignment_id):
+    try:
+        assignment = Assignment.objects.select_related('class_obj').get(id=assignment_id)
+    except Assignment.DoesNotExist:
+        return Response({'error': 'Không tìm thấy bài'}, status=status.HTTP_404_NOT_FOUND)
+    user = request.user
+    if user.role != 'admin' and assignment.class_obj.teacher_id != user.id:
+        is_enrolled = assignment.is_published and ClassStudent.objects.filter(
+            class_obj_id=assignment.class_obj_id, student__user=user, is_active=True
+        ).exists()
+        if not is_enrolled:
+            return Response({'error': 'Không có quyền'}, status=status.HTTP_403_FORBIDDEN)
+    return serve_file(request, assignment.attachment)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def download_submission(request, assignment_id, submission_id):
+    try:
+        subm = AssignmentSubmission.objects.select_related('assignment__class_obj', 'student').get(
+            id=submission_id, assignment_id=assignment_id
+        )
+    except AssignmentSubmission.DoesNotExist:
+        return Response({'error': 'Không tìm thấy bài nộp'}, status=status.HTTP_404_NOT_FOUND)
+    user = request.user
+    if user.role != 'admin' and subm.assignment.class_obj.teacher_id != user.id and subm.student.user_id != user.id:
+        return Response({'error': 'Không có quyền'}, status=status.HTTP_403_FORBIDDEN)
+    return serve_file(request, subm.file)
+
+
+MANIFEST_HEADER = ['STT', 'MSSV', 'Họ tên', 'Lần nộp', 'Trạng thái', 'Nộp lúc', 'Nộp muộn', 'Điểm', 'Nhận xét', 'File']
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def download_all_submissions(request, assignment_id):
+    """Every submitted file as one streamed ZIP (``<MSSV>/<file>``) plus ``manifest.csv``."""
+    try:
+        assignment = Assignment.objects.select_related('class_obj').get(id=assignment_id)
+    except Assignment.DoesNotExist:
+        return Response({'error': 'Không tìm thấy bài'}, status=status.HTTP_404_NOT_FOUND)
+    user = request.user
+    if user.role != 'admin' and assignment.class_obj.teacher_id != user.id:
+        return Response({'error': 'Không có quyền'}, status=status.HTTP_403_FORBIDDEN)
+
+    submissions = (
+        AssignmentSubmission.objects.filter(assignment=assignment)
+        .select_related('student')
+        .order_by('student__student_id', 'attempt_number')
+    )
+
+    def archive():
+        stream = ZipStream()
+        rows = []
+        submitted = set()
+        for subm in submissions.iterator(chunk_size=200):
+            student = subm.student
+            submitted.add(student.id)
+            name = ''
+            if subm.file:
+                folder = student.student_id if subm.attempt_number == 1 else f'{student.student_id}/lan-{subm.attempt_number}'
+                name = (yield from stream.add_file(
+                    f'{folder}/{os.path.basename(subm.file.name)}', subm.file, subm.uploaded_at
+                )) or ''
+            rows.append([
+                len(rows) + 1, student.student_id, student.full_name, subm.attempt_number,
+                subm.get_status_display(),
+                timezone.localtime(subm.uploaded_at).strftime('%d/%m/%Y %H:%M') if subm.uploaded_at else '',
+                'Có' if subm.is_late else 'Không',
+                subm.grade if subm.grade is not None else '', subm.feedback or '', name,
+            ])
+        # Enrolled students without any submission, so the manifest covers the whole class
+        missing = (
+            ClassStudent.objects.filter(class_obj_id=assignment.class_obj_id, is_active=True)
+            .exclude(student_id__in=submitted)
+            .order_by('student__student_id')
+            .values_list('student__student_id', 'student__first_name', 'student__last_name')
+        )
+        for student_id, first_name, last_name in missing.iterator():
+            rows.append([len(rows) + 1, student_id, f"{first_name} {last_name}".strip(), '', 'Chưa nộp', '', '', '', '', ''])
+        yield from stream.add_bytes('manifest.csv', csv_bytes(MANIFEST_HEADER, rows))
+        yield from stream.close()
+
+    filename = f"Bai_nop_{assignment.class_obj.class_id}_{assignment.id}_{timezone.localtime().strftime('%Y%m%d')}.zip"
+    return zip_response(archive(), filename)
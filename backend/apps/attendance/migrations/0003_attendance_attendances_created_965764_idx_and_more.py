@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0002_attendancesession_group_name_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['-created_at', '-id'], name='attendances_created_965764_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['session', '-created_at'], name='attendances_session_51a613_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendancesession',
+            index=models.Index(fields=['-session_date', '-start_time', '-id'], name='attendance__session_b9f24d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendancesession',
+            index=models.Index(fields=['class_obj', '-session_date', '-start_time'], name='attendance__class_o_52c850_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0002_roomschedule_room_dates_index'),
+        ('attendance', '0003_attendance_attendances_created_965764_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendancesession',
+            name='room',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='attendance_sessions', to='rooms.room'),
+        ),
+        migrations.AddField(
+            model_name='attendancesession',
+            name='room_schedule',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='attendance_sessions', to='rooms.roomschedule'),
+        ),
+    ]
@@ -20,6 +20,12 @@ class AttendanceSession(models.Model):
     start_time = models.TimeField()
     end_time = models.TimeField()
     location = models.CharField(max_length=200, blank=True, null=True)
+    room = models.ForeignKey(
+        'rooms.Room', on_delete=models.SET_NULL, related_name='attendance_sessions', null=True, blank=True
+    )
+    room_schedule = models.ForeignKey(
+        'rooms.RoomSchedule', on_delete=models.SET_NULL, related_name='attendance_sessions', null=True, blank=True
+    )
     session_type = models.CharField(max_length=20, choices=SessionType.choices, default=SessionType.LECTURE)
     group_name = models.CharField(max_length=50, blank=True, null=True)
     qr_code = models.CharField(max_length=100, unique=True, blank=True, null=True)
@@ -33,6 +39,11 @@ class AttendanceSession(models.Model):
         verbose_name = 'Buổi điểm danh'
         verbose_name_plural = 'Buổi điểm danh'
         ordering = ['-session_date', '-start_time']
+        indexes = [
+            # Keyset pagination, optionally narrowed by class
+            models.Index(fields=['-session_date', '-start_time', '-id']),
+            models.Index(fields=['class_obj', '-session_date', '-start_time']),
+        ]
     
     def __str__(self):
         return f"{self.class_obj.class_id} - {self.session_name} ({self.session_date})"
@@ -62,6 +73,11 @@ class Attendance(models.Model):
         verbose_name_plural = 'Điểm danh'
         unique_together = ['session', 'student']
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination, optionally narrowed by session
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['session', '-created_at']),
+        ]
     
     def __str__(self):
         return f"{self.student.student_id} - {self.session.session_name}: {self.get_status_display()}"
@@ -15,33 +15,60 @@ class AttendanceSessionSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'class_obj', 'session_name', 'description',
             'session_date', 'start_time', 'end_time', 'location',
-            'session_type', 'group_name',
+            'room', 'room_schedule', 'session_type', 'group_name',
             'qr_code', 'is_active', 'created_by', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        # Rooms are only assigned by apps.rooms.allocation, which books a
+        # RoomSchedule after checking conflicts
+        read_only_fields = ['id', 'room', 'room_schedule', 'created_at', 'updated_at']
+
+    # Changing these invalidates the booked room
+    room_fields = ('session_date', 'start_time', 'end_time', 'session_type')
+
+    def update(self, instance, validated_data):
+        moved = instance.room_id is not None and any(
+            field in validated_data and validated_data[field] != getattr(instance, field)
+            for field in self.room_fields
+        )
+        if not moved:
+            return super().update(instance, validated_data)
+        # Give the old booking back, then book a room for the new time
+        from apps.rooms.allocation import allocate_rooms, release_rooms
+        release_rooms([instance])
+        session = super().update(instance, validated_data)
+        allocate_rooms([session], self.context['request'].user)
+        return session
 
 
 class AttendanceSessionCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating attendance sessions"""
     class_id = serializers.IntegerField(write_only=True)
+    # Book a free room through the allocator instead of choosing one
+    auto_assign_room = serializers.BooleanField(write_only=True, required=False, default=False)
     
     class Meta:
         model = AttendanceSession
         fields = [
             'class_id', 'session_name', 'description',
             'session_date', 'start_time', 'end_time', 'location',
-            'session_type', 'group_name'
+            'room', 'session_type', 'group_name', 'auto_assign_room'
         ]
+        read_only_fields = ['room']
     
     def create(self, validated_data):
         class_id = validated_data.pop('class_id')
+        auto_assign_room = validated_data.pop('auto_assign_room', False)
         from apps.classes.models import Class
         class_obj = Class.objects.get(id=class_id)
         validated_data.update({
             'class_obj': class_obj,
             'created_by': self.context['request'].user
         })
-        return super().create(validated_data)
+        session = super().create(validated_data)
+        if auto_assign_room:
+            from apps.rooms.allocation import allocate_rooms
+            allocate_rooms([session], self.context['request'].user)
+        return session
 
 
 class AttendanceSerializer(serializers.ModelSerializer):
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.core.view_cache import bump_class
+from .models import Attendance, AttendanceSession, AttendanceSummary
+
+
+@receiver([post_save, post_delete], sender=AttendanceSession)
+@receiver([post_save, post_delete], sender=AttendanceSummary)
+def invalidate_session_views(sender, instance, **kwargs):
+    bump_class(instance.class_obj_id, 'attendance')
+
+
+@receiver([post_save, post_delete], sender=Attendance)
+def invalidate_attendance_views(sender, instance, **kwargs):
+    # The session is already loaded by every code path that saves attendance
+    bump_class(instance.session.class_obj_id, 'attendance')
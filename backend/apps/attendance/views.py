@@ -12,14 +12,17 @@ import base64
 from datetime import datetime, timedelta
 from .models import Attendance, AttendanceSession
 from .serializers import AttendanceSerializer, AttendanceSessionSerializer, AttendanceSessionCreateSerializer, AttendanceCreateSerializer
+from apps.core.pagination import KeysetPaginationMixin
+from apps.core.view_cache import cached_view
 
 
 logger = logging.getLogger(__name__)
 
-class AttendanceListCreateView(generics.ListCreateAPIView):
-    """List and create attendance records"""
+class AttendanceListCreateView(KeysetPaginationMixin, generics.ListCreateAPIView):
+    """List and create attendance records (``?pagination=cursor`` for keyset mode)"""
     queryset = Attendance.objects.all()
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('-created_at', '-id')
 
     def get_serializer_class(self):
         # Use write serializer for POST to support manual attendance creation
@@ -44,7 +47,7 @@ class AttendanceListCreateView(generics.ListCreateAPIView):
             # Always try student_code first (more common case for frontend)
             try:
                 queryset = queryset.filter(student__student_id=sid)
-                logger.debug(f"Filtered by student__student_id: {sid}, found {queryset.count()} records")
+                logger.debug(f"Filtered by student__student_id: {sid}")
             except Exception as e:
                 logger.warning(f"Failed to filter by student_code {sid}: {e}")
                 # Fallback: if it's pure numeric, try as Student.pk
@@ -55,7 +58,7 @@ class AttendanceListCreateView(generics.ListCreateAPIView):
                     except Exception as e2:
                         logger.error(f"Failed to filter by both student_code and pk for {sid}: {e2}")
             
-        return queryset.order_by('-created_at')
+        return queryset.order_by('-created_at', '-id')
 
     def post(self, request, *args, **kwargs):
         """Robust POST handler that normalizes payload keys and always uses the write serializer.
@@ -105,10 +108,12 @@ class AttendanceDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
 
-class AttendanceSessionListCreateView(generics.ListCreateAPIView):
-    """List and create attendance sessions"""
+class AttendanceSessionListCreateView(KeysetPaginationMixin, generics.ListCreateAPIView):
+    """List and create attendance sessions (``?pagination=cursor`` for keyset mode)"""
     queryset = AttendanceSession.objects.all()
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('-session_date', '-start_time', '-id')
+
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return AttendanceSessionCreateSerializer
@@ -130,7 +135,7 @@ class AttendanceSessionListCreateView(generics.ListCreateAPIView):
         if session_date is not None:
             queryset = queryset.filter(session_date=session_date)
         
-        return queryset.order_by('-session_date', '-start_time')
+        return queryset.order_by('-session_date', '-start_time', '-id')
 
 
 class AttendanceSessionDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -199,6 +204,7 @@ def end_attendance_session(request, session_id):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@cached_view(scopes=['attendance'])
 def attendance_statistics(request):
     """Get attendance statistics"""
     total_sessions = AttendanceSession.objects.count()
@@ -49,7 +49,8 @@ def bulk_create_sessions(request):
             "default_start_time": "07:00",
             "default_end_time": "11:00",
             "session_type": "lecture"
-        }
+        },
+        "auto_assign_room": true  # optional: book real rooms for the sessions
     }
     """
     try:
@@ -92,6 +93,8 @@ def bulk_create_sessions(request):
         # Validate and create sessions
         created_sessions = []
         errors = []
+        auto_assign_room = bool(request.data.get('auto_assign_room'))
+        allocation = None
         
         with transaction.atomic():
             for idx, session_data in enumerate(sessions_data):
@@ -105,8 +108,7 @@ def bulk_create_sessions(request):
                     )
                     
                     if serializer.is_valid():
-                        session = serializer.save()
-                        created_sessions.append(AttendanceSessionSerializer(session).data)
+                        created_sessions.append(serializer.save())
                     else:
                         errors.append({
                             'index': idx,
@@ -121,6 +123,19 @@ def bulk_create_sessions(request):
                         'data': session_data,
                         'error': str(e)
                     })
+
+            if auto_assign_room and created_sessions:
+                from apps.rooms.allocation import allocate_rooms
+                assigned, unassigned = allocate_rooms(created_sessions, request.user)
+                allocation = {
+                    'assigned_count': len(assigned),
+                    'unassigned': [
+                        {'session_name': s.session_name, 'session_date': s.session_date}
+                        for s in unassigned
+                    ]
+                }
+
+        created_sessions = AttendanceSessionSerializer(created_sessions, many=True).data
         
         # Prepare response
         response_data = {
@@ -129,6 +144,8 @@ def bulk_create_sessions(request):
             'created_sessions': created_sessions,
             'errors': errors
         }
+        if allocation is not None:
+            response_data['room_allocation'] = allocation
         
         if errors:
             response_data['message'] = f'Created {len(created_sessions)} sessions. {len(errors)} failed.'
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.core.view_cache import bump_class
+from .models import Class, ClassStudent
+
+
+@receiver([post_save, post_delete], sender=Class)
+def invalidate_class_views(sender, instance, **kwargs):
+    bump_class(instance.pk, 'classes')
+
+
+@receiver([post_save, post_delete], sender=ClassStudent)
+def invalidate_enrollment_views(sender, instance, **kwargs):
+    bump_class(instance.class_obj_id, 'enrollment')
@@ -10,6 +10,7 @@ from apps.students.models import Student
 from apps.students.serializers import StudentSerializer
 from apps.attendance.models import AttendanceSession, Attendance
 from apps.grades.models import Grade, GradeSummary
+from apps.core.view_cache import cached_view
 
 from .models import Class, ClassStudent, ClassJoinToken
 from .serializers import (
@@ -312,6 +313,7 @@ def remove_student_from_class(request, class_id, student_id):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@cached_view(scopes=['classes', 'enrollment'], vary_on_user=True)
 def class_statistics(request):
     """Get comprehensive class statistics"""
     try:
@@ -0,0 +1,92 @@
+"""Caching primitives shared across apps."""
+import threading
+import time
+from collections import OrderedDict
+
+
+class LocalLRUCache:
+    """Small thread-safe, per-process LRU with a TTL per entry.
+
+    Used in front of the shared Django cache for data that is read on nearly
+    every request (e.g. the authenticated user principal).
+    """
+
+    def __init__(self, maxsize=1024, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TwoTierCache:
+    """Per-process ``LocalLRUCache`` in front of a shared Django cache.
+
+    Reads try the local tier first; shared hits are copied locally. Keys
+    should be versioned (see ``apps.core.view_cache``) because deletes only
+    reach the local tier of the process that issued them.
+    """
+
+    def __init__(self, alias='default', local_ttl=5, local_maxsize=2048):
+        self.alias = alias
+        self.local = LocalLRUCache(maxsize=local_maxsize, ttl=local_ttl)
+        self.hits = {'local': 0, 'shared': 0, 'miss': 0}
+
+    @property
+    def shared(self):
+        from django.core.cache import caches
+        return caches[self.alias]
+
+    def get(self, key, default=None):
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            self.hits['local'] += 1
+            return value
+        value = self.shared.get(key, _MISSING)
+        if value is _MISSING:
+            self.hits['miss'] += 1
+            return default
+        self.hits['shared'] += 1
+        self.local.set(key, value)
+        return value
+
+    def set(self, key, value, timeout=None):
+        self.local.set(key, value)
+        self.shared.set(key, value, timeout)
+
+    def delete(self, key):
+        self.local.delete(key)
+        self.shared.delete(key)
+
+
+_MISSING = object()
@@ -0,0 +1,397 @@
+"""Streaming export/import of core data between environments.
+
+The dump is NDJSON: a ``_meta`` header line, then one ``{"type", "data"}``
+line per row, written entity by entity in foreign-key dependency order
+(``ENTITIES``). Rows reference each other by natural key (user email,
+``student_id``, ``class_id`` ...) instead of database ids, so a dump can be
+loaded into any database.
+
+Import reads the file line by line and writes chunks of one entity with
+``bulk_create`` (new rows) and ``bulk_update`` (existing rows, when asked),
+each chunk in its own transaction. A chunk that hits a unique constraint
+(a username or email taken by another row) is retried row by row, and the
+rows that still fail are counted and reported instead of aborting the import.
+Natural key -> pk maps are loaded once per entity and kept up to date, so
+resolving foreign keys costs no queries. After every chunk the line number is
+written to a checkpoint file, and an interrupted import resumes from there.
+
+Password hashes and staff/superuser flags are left out of dumps unless
+``include_credentials`` is set; imported users without a hash get an
+unusable password and must reset it.
+"""
+import datetime
+import decimal
+import gzip
+import json
+import os
+import time
+from dataclasses import dataclass, field
+
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+
+from .view_cache import bump
+
+
+FORMAT_VERSION = 2
+
+_encoder = DjangoJSONEncoder()
+
+
+def _plain(value):
+    """JSON form of a key value, so database values match values read from a dump."""
+    if isinstance(value, (datetime.date, datetime.time, decimal.Decimal)):
+        return _encoder.default(value)
+    return value
+
+
+@dataclass
+class Entity:
+    name: str
+    model_label: str
+    # Natural key: model field names (foreign keys included)
+    key: tuple
+    fields: tuple
+    # Foreign key field -> (target entity, lookup path of its natural key)
+    fks: dict = field(default_factory=dict)
+    # Exported only with include_credentials
+    credentials: tuple = ()
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    @property
+    def columns(self):
+        return tuple(self.fks) + self.fields + self.credentials
+
+
+# Dependency order: every entity only references entities listed before it
+ENTITIES = [
+    Entity('users', 'accounts.User', ('email',), (
+        'email', 'username', 'first_name', 'last_name', 'role', 'account_status',
+        'phone', 'student_id', 'teacher_id', 'department', 'is_active',
+    ), credentials=('password', 'is_staff', 'is_superuser')),
+    Entity('buildings', 'rooms.Building', ('building_id',), (
+        'building_id', 'building_name', 'building_type', 'description', 'address', 'floors', 'is_active',
+    )),
+    Entity('rooms', 'rooms.Room', ('room_id',), (
+        'room_id', 'room_name', 'floor', 'room_type', 'capacity', 'area', 'equipment',
+        'description', 'status', 'is_active',
+    ), fks={'building': ('buildings', 'building__building_id')}),
+    Entity('students', 'students.Student', ('student_id',), (
+        'student_id', 'first_name', 'last_name', 'email', 'phone', 'gender', 'date_of_birth',
+        'address', 'is_active',
+    ), fks={'user': ('users', 'user__email')}),
+    Entity('classes', 'classes.Class', ('class_id',), (
+        'class_id', 'class_name', 'description', 'max_students', 'class_mode', 'is_active',
+        'restrict_to_roster_emails', 'allow_auto_enroll_on_attendance_qr',
+    ), fks={'teacher': ('users', 'teacher__email')}),
+    Entity('class_students', 'classes.ClassStudent', ('class_obj', 'student'), (
+        'is_active', 'status', 'joined_at', 'source',
+    ), fks={
+        'class_obj': ('classes', 'class_obj__class_id'),
+        'student': ('students', 'student__student_id'),
+    }),
+    Entity('room_schedules', 'rooms.RoomSchedule', ('room', 'title', 'start_date', 'start_time'), (
+        'title', 'description', 'start_date', 'end_date', 'start_time', 'end_time',
+        'is_recurring', 'recurring_days',
+    ), fks={
+        'room': ('rooms', 'room__room_id'),
+        'created_by': ('users', 'created_by__email'),
+    }),
+]
+ENTITY_BY_NAME = {entity.name: entity for entity in ENTITIES}
+
+
+def open_dump(path, mode='r'):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+# -- export ----------------------------------------------------------------
+
+def export_rows(entity, chunk_size=2000, include_credentials=False):
+    """Yield export dicts of one entity; foreign keys become natural keys."""
+    lookups = {name: path for name, (_target, path) in entity.fks.items()}
+    fields = entity.fields + entity.credentials if include_credentials else entity.fields
+    queryset = entity.model.objects.order_by('pk').values(*fields, *lookups.values())
+    for row in queryset.iterator(chunk_size=chunk_size):
+        data = {name: row[name] for name in fields}
+        for name, path in lookups.items():
+            data[name] = row[path]
+        yield data
+
+
+def export_dump(path, entities=ENTITIES, chunk_size=2000, progress=None, include_credentials=False):
+    """Write an NDJSON dump; returns ``{entity: (rows, seconds)}``."""
+    stats = {}
+    with open_dump(path, 'w') as out:
+        out.write(json.dumps({
+            'type': '_meta',
+            'version': FORMAT_VERSION,
+            'exported_at': datetime.datetime.now().isoformat(),
+            'entities': [entity.name for entity in entities],
+            'credentials': include_credentials,
+        }) + '\n')
+        for entity in entities:
+            started = time.perf_counter()
+            count = 0
+            for data in export_rows(entity, chunk_size, include_credentials):
+                out.write(json.dumps({'type': entity.name, 'data': data}, cls=DjangoJSONEncoder, ensure_ascii=False))
+                out.write('\n')
+                count += 1
+            stats[entity.name] = (count, time.perf_counter() - started)
+            if progress:
+                progress(entity.name, *stats[entity.name])
+    return stats
+
+
+# -- reading ---------------------------------------------------------------
+
+def read_ndjson(path):
+    """Yield ``(line_number, type, data)`` from an NDJSON dump."""
+    with open_dump(path) as handle:
+        for number, line in enumerate(handle, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if record.get('type') != '_meta':
+                yield number, record['type'], record['data']
+
+
+# Sections of the v1 ``export_data.py`` JSON document: (section, entity,
+# renamed keys, dropped keys)
+_LEGACY_SECTIONS = [
+    ('teachers', 'users', {}, {'id'}),
+    ('buildings', 'buildings', {}, set()),
+    ('rooms', 'rooms', {'building_id': 'building'}, set()),
+    ('students', 'students', {}, set()),
+    ('classes', 'classes', {'teacher_email': 'teacher'}, {'teacher_id'}),
+    ('class_students', 'class_students', {'class_id': 'class_obj', 'student_id': 'student'}, set()),
+    ('room_schedules', 'room_schedules', {'room_id': 'room', 'created_by_email': 'created_by'}, {'created_by_id'}),
+]
+
+
+def read_legacy_json(path):
+    """Yield records of a v1 single-document dump in dependency order.
+
+    Line numbers are positions in the record stream, so checkpoints work the
+    same way as for NDJSON.
+    """
+    with open_dump(path) as handle:
+        document = json.load(handle)
+    number = 0
+    for section, entity, renames, dropped in _LEGACY_SECTIONS:
+        for item in document.get(section, []):
+            number += 1
+            data = {renames.get(key, key): value for key, value in item.items() if key not in dropped}
+            if section == 'teachers':
+                data.setdefault('role', 'teacher')
+            yield number, entity, data
+
+
+def read_records(path):
+    """Records of an NDJSON dump, or of a v1 JSON document."""
+    with open_dump(path) as handle:
+        head = handle.readline()
+    # NDJSON starts with a complete one-line object; the v1 dump is indented
+    try:
+        json.loads(head)
+    except ValueError:
+        return read_legacy_json(path)
+    return read_ndjson(path)
+
+
+# -- import ----------------------------------------------------------------
+
+@dataclass
+class EntityStats:
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    missing: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows(self):
+        return self.created + self.updated + self.skipped + self.missing + self.failed
+
+
+class Importer:
+    """Chunked, resumable loader for dumps produced by ``export_dump``."""
+
+    def __init__(self, chunk_size=1000, update=False, checkpoint=None, log=None):
+        self.chunk_size = chunk_size
+        self.update = update
+        self.checkpoint = checkpoint
+        self.log = log or (lambda message: None)
+        self.keys = {}          # entity name -> {natural key tuple: pk}
+        self.stats = {}         # entity name -> EntityStats
+
+    # -- natural key maps -------------------------------------------------
+
+    def key_map(self, entity):
+        """``{natural key: pk}`` of an entity, loaded with one query."""
+        if entity.name not in self.keys:
+            lookups = [entity.fks[name][1] if name in entity.fks else name for name in entity.key]
+            self.keys[entity.name] = {
+                tuple(_plain(value) for value in row[:-1]): row[-1]
+                for row in entity.model.objects.values_list(*lookups, 'pk').iterator(chunk_size=5000)
+            }
+        return self.keys[entity.name]
+
+    def _natural_key(self, entity, data):
+        return tuple(_plain(data.get(name)) for name in entity.key)
+
+    # -- checkpoints ------------------------------------------------------
+
+    def load_checkpoint(self):
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return 0
+        with open(self.checkpoint, encoding='utf-8') as handle:
+            state = json.load(handle)
+        for name, values in state.get('stats', {}).items():
+            self.stats[name] = EntityStats(**values)
+        return state.get('line', 0)
+
+    def save_checkpoint(self, line):
+        if not self.checkpoint:
+            return
+        temporary = self.checkpoint + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as handle:
+            json.dump({
+                'line': line,
+                'stats': {name: vars(stats) for name, stats in self.stats.items()},
+            }, handle)
+        os.replace(temporary, self.checkpoint)
+
+    def clear_checkpoint(self):
+        if self.checkpoint and os.path.exists(self.checkpoint):
+            os.remove(self.checkpoint)
+
+    # -- loading ----------------------------------------------------------
+
+    def run(self, records, resume=True):
+        """Import ``(line, type, data)`` records; returns ``{entity: EntityStats}``."""
+        done = self.load_checkpoint() if resume else 0
+        if done:
+            self.log(f'Tiếp tục từ dòng {done}')
+        buffer, current, last_line = [], None, done
+        for line, name, data in records:
+            if line <= done:
+                continue
+            if name not in ENTITY_BY_NAME:
+                continue
+            if buffer and (name != current or len(buffer) >= self.chunk_size):
+                self._flush(ENTITY_BY_NAME[current], buffer, last_line)
+                buffer = []
+            current, last_line = name, line
+            buffer.append(data)
+        if buffer:
+            self._flush(ENTITY_BY_NAME[current], buffer, last_line)
+        self.clear_checkpoint()
+        # bulk_create/bulk_update send no model signals. Room schedules may
+        # also come from an earlier, interrupted run: refresh unconditionally
+        bump('students', 'classes', 'enrollment')
+        from apps.rooms.availability import availability
+        transaction.on_commit(availability.invalidate_all)
+        return self.stats
+
+    def _build(self, entity, data):
+        """Model instance for an export dict, or ``None`` if a foreign key is unknown."""
+        model = entity.model
+        values = {}
+        for name in entity.fields + entity.credentials:
+            if name not in data:
+                continue
+            value = data[name]
+            model_field = model._meta.get_field(name)
+            # '' would collide on unique nullable columns (student_id, teacher_id)
+            if value == '' and model_field.null and model_field.unique:
+                value = None
+            values[name] = value
+        for name, (target, _path) in entity.fks.items():
+            natural = data.get(name)
+            if natural is None:
+                if model._meta.get_field(name).null:
+                    continue
+                return None
+            pk = self.key_map(ENTITY_BY_NAME[target]).get((natural,))
+            if pk is None:
+                return None
+            values[model._meta.get_field(name).attname] = pk
+        if entity.name == 'users':
+            values.setdefault('username', data.get('email'))
+            values['password'] = data.get('password') or make_password(None)
+        return model(**values)
+
+    def _flush(self, entity, rows, last_line):
+        started = time.perf_counter()
+        stats = self.stats.setdefault(entity.name, EntityStats())
+        known = self.key_map(entity)
+        model = entity.model
+        new, new_keys, existing = [], [], []
+
+        for data in rows:
+            instance = self._build(entity, data)
+            if instance is None:
+                stats.missing += 1
+                continue
+            natural = self._natural_key(entity, data)
+            if natural in known and self.update:
+                instance.pk = known[natural]
+                existing.append(instance)
+            elif natural in known or natural in new_keys:
+                stats.skipped += 1
+            else:
+                new.append(instance)
+                new_keys.append(natural)
+
+        columns = [name for name in entity.columns if name not in entity.key and name in rows[0]]
+        try:
+            with transaction.atomic():
+                created = model.objects.bulk_create(new, batch_size=self.chunk_size)
+                if existing:
+                    model.objects.bulk_update(existing, columns, batch_size=self.chunk_size)
+        except IntegrityError:
+            created, new_keys, updated = self._write_rows(entity, new, new_keys, existing, columns, stats)
+        else:
+            updated = len(existing)
+
+        if any(obj.pk is None for obj in created):
+            # Backends without RETURNING (MySQL): reload the map
+            del self.keys[entity.name]
+        else:
+            known.update(zip(new_keys, (obj.pk for obj in created)))
+        stats.created += len(created)
+        stats.updated += updated
+        stats.seconds += time.perf_counter() - started
+        self.save_checkpoint(last_line)
+
+    def _write_rows(self, entity, new, new_keys, existing, columns, stats):
+        """Row by row fallback of a chunk that broke a constraint; reports the rows that fail."""
+        model = entity.model
+        created, created_keys, updated = [], [], 0
+        for instance, natural in zip(new, new_keys):
+            try:
+                with transaction.atomic():
+                    created.extend(model.objects.bulk_create([instance]))
+                created_keys.append(natural)
+            except IntegrityError as e:
+                stats.failed += 1
+                self.log(f'  ⚠️  {entity.name} {natural}: {e}')
+        for instance in existing:
+            try:
+                with transaction.atomic():
+                    model.objects.bulk_update([instance], columns)
+                updated += 1
+            except IntegrityError as e:
+                stats.failed += 1
+                self.log(f'  ⚠️  {entity.name} #{instance.pk}: {e}')
+        return created, created_keys, updated
@@ -0,0 +1,226 @@
+"""Outbound mail: templated messages, batched sends and a delivery queue.
+
+Messages are described by plain dicts (``to``, ``subject``, ``template``,
+``context``) so they can cross a Celery boundary as JSON. Delivery modes,
+picked with ``MAIL_QUEUE``:
+
+- ``'celery'`` (default): payloads go to the ``apps.core.tasks.send_email_batch``
+  task on the configured broker, so they survive a worker restart (falls back
+  to ``'thread'`` if Celery is missing or the broker refuses them);
+- ``'thread'``: a daemon thread in this process drains the queue; whatever is
+  still queued is lost if the process is killed;
+- ``'sync'``: sent before the call returns (management commands, locmem).
+
+Every send renders templates loaded once per process and pushes a whole batch
+through a single backend connection, so SMTP is opened once per batch
+instead of once per email.
+"""
+import atexit
+import logging
+import queue
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+
+
+logger = logging.getLogger(__name__)
+
+MAIL_QUEUE = getattr(settings, 'MAIL_QUEUE', 'celery')
+MAIL_BATCH_SIZE = getattr(settings, 'MAIL_BATCH_SIZE', 100)
+
+
+@lru_cache(maxsize=None)
+def _template(name):
+    # Parsed once per process; ``None`` marks an optional part that is absent
+    try:
+        return get_template(name)
+    except TemplateDoesNotExist:
+        return None
+
+
+def build_message(payload):
+    """Render a payload into an ``EmailMultiAlternatives`` (text + optional HTML)."""
+    template = payload['template']
+    context = payload.get('context') or {}
+    text_template = _template(f'emails/{template}.txt')
+    html_template = _template(f'emails/{template}.html')
+    if text_template is None and html_template is None:
+        raise TemplateDoesNotExist(f'emails/{template}')
+
+    html_body = html_template.render(context) if html_template else None
+    text_body = text_template.render(context) if text_template else ''
+
+    to = payload['to']
+    message = EmailMultiAlternatives(
+        subject=payload['subject'],
+        body=text_body,
+        from_email=payload.get('from_email') or settings.DEFAULT_FROM_EMAIL,
+        to=[to] if isinstance(to, str) else list(to),
+    )
+    if html_body is not None:
+        message.attach_alternative(html_body, 'text/html')
+    return message
+
+
+class SendInterrupted(Exception):
+    """The connection failed part-way through ``send_now``.
+
+    ``unsent`` holds the payloads that were not delivered, so a retry does
+    not mail the others twice.
+    """
+
+    def __init__(self, unsent, sent):
+        super().__init__(f'{len(unsent)} email chưa được gửi')
+        self.unsent = unsent
+        self.sent = sent
+
+
+def send_now(payloads, connection=None):
+    """Send payloads synchronously over one connection. Returns the sent count.
+
+    Raises ``SendInterrupted`` when the connection fails part-way.
+    """
+    built = []
+    for payload in payloads:
+        try:
+            built.append((payload, build_message(payload)))
+        except Exception:
+            logger.exception('Không thể tạo email "%s" gửi tới %s', payload.get('template'), payload.get('to'))
+    if not built:
+        return 0
+
+    connection = connection or get_connection()
+    sent = done = 0
+    # One open/close for the whole call; messages are handed over one by one
+    # (SMTP delivers them one at a time anyway) so a failure knows what is left
+    try:
+        with connection:
+            for _payload, message in built:
+                sent += connection.send_messages([message]) or 0
+                done += 1
+    except OSError as exc:
+        if done < len(built):
+            logger.warning('Kết nối gửi email bị lỗi sau %d/%d email: %s', done, len(built), exc)
+            raise SendInterrupted([payload for payload, _message in built[done:]], sent) from exc
+        logger.warning('Không đóng được kết nối gửi email: %s', exc)
+    logger.info('Đã gửi %d/%d email', sent, len(built))
+    return sent
+
+
+class _Outbox:
+    """In-process fallback queue drained by a single daemon thread."""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def put(self, payloads):
+        for payload in payloads:
+            self._queue.put(payload)
+        self._ensure_worker()
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='mail-outbox', daemon=True)
+                self._thread.start()
+
+    def _drain(self, block):
+        batch = []
+        try:
+            batch.append(self._queue.get(block=block))
+            while len(batch) < MAIL_BATCH_SIZE:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _send(self, batch):
+        try:
+            send_now(batch)
+        except Exception:
+            logger.exception('Gửi lô %d email thất bại', len(batch))
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _run(self):
+        while True:
+            batch = self._drain(block=True)
+            if batch:
+                self._send(batch)
+
+    def flush(self):
+        """Send whatever is still queued in the calling thread."""
+        while True:
+            batch = self._drain(block=False)
+            if not batch:
+                return
+            self._send(batch)
+
+    def join(self):
+        self._queue.join()
+
+
+outbox = _Outbox()
+atexit.register(outbox.flush)
+
+
+def _celery_task():
+    try:
+        from .tasks import send_email_batch
+    except ImportError:
+        return None
+    return send_email_batch
+
+
+def enqueue(payloads):
+    """Hand payloads to the configured delivery mode. Returns the number queued."""
+    payloads = list(payloads)
+    if not payloads:
+        return 0
+
+    if MAIL_QUEUE == 'sync':
+        return send_now(payloads)
+
+    if MAIL_QUEUE == 'celery':
+        task = _celery_task()
+        if task is None:
+            logger.warning('Celery chưa được cài đặt, gửi email bằng hàng đợi nội bộ')
+        else:
+            start = 0
+            try:
+                for start in range(0, len(payloads), MAIL_BATCH_SIZE):
+                    task.delay(payloads[start:start + MAIL_BATCH_SIZE])
+                return len(payloads)
+            except Exception:
+                logger.exception('Không gửi được email tới Celery broker, dùng hàng đợi nội bộ')
+                # Batches before ``start`` already reached the broker
+                payloads = payloads[start:]
+
+    outbox.put(payloads)
+    return len(payloads)
+
+
+def queue_email(to, subject, template, context=None):
+    """Queue one templated email."""
+    return enqueue([{'to': to, 'subject': subject, 'template': template, 'context': context or {}}])
+
+
+def queue_bulk(recipients, subject, template, context=None):
+    """Queue the same template for many recipients.
+
+    ``recipients`` is an iterable of ``(email, per_recipient_context)``; each
+    per-recipient context is layered over the shared ``context``.
+    """
+    shared = context or {}
+    return enqueue(
+        {'to': email, 'subject': subject, 'template': template, 'context': {**shared, **(extra or {})}}
+        for email, extra in recipients
+        if email
+    )
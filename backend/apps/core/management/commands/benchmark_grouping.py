@@ -0,0 +1,96 @@
+"""
+Django Management Command: Benchmark Grouping
+Đo số query và độ trễ của API chia nhóm (/api/grouping/generate/) theo sĩ số lớp trên database test tạm thời
+Chạy: python manage.py benchmark_grouping [--sizes 30,200,1000,5000] [--group-sizes 2,4] [--strategy balanced]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.classes.models import Class, ClassStudent
+from apps.core import perf
+from apps.students.models import Student
+
+
+class Command(BaseCommand):
+    help = 'Benchmark group generation (queries, p50/p95 latency, peak memory) across class sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='30,200,1000,5000', help='Comma separated class sizes')
+        parser.add_argument('--group-sizes', default='2,4', help='Comma separated group sizes')
+        parser.add_argument('--strategy', choices=['random', 'balanced'], default='random')
+        parser.add_argument('--iterations', type=int, default=10, help='Measured requests per case')
+        parser.add_argument('--warmup', type=int, default=1)
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(value) for value in options['sizes'].split(',')]
+            group_sizes = [int(value) for value in options['group_sizes'].split(',')]
+        except ValueError:
+            raise CommandError('--sizes and --group-sizes must be comma separated integers')
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with override_settings(DEBUG=False):
+                rows = self.run_benchmark(sizes, group_sizes, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(f'\n📊 {"students":>8} {"group":>5} {"groups":>6} {"queries":>7} {"p50 ms":>8} {"p95 ms":>8} {"peak KB":>9}')
+        for class_size, group_size, groups, result in rows:
+            self.stdout.write(
+                f'   {class_size:>8} {group_size:>5} {groups:>6} {result.queries:>7} '
+                f'{result.p50_ms:>8} {result.p95_ms:>8} {result.peak_kb:>9}'
+            )
+        failed = [result.name for *_, result in rows if not result.ok]
+        if failed:
+            raise CommandError(f'Unexpected responses in: {", ".join(failed)}')
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark hoàn thành'))
+
+    def run_benchmark(self, sizes, group_sizes, options):
+        teacher = User.objects.create_user(
+            'bench.grouping@example.com', 'Benchmark@123', role='teacher', first_name='Bench', last_name='Teacher',
+        )
+        client = APIClient()
+        client.force_authenticate(teacher)
+
+        rows = []
+        for class_size in sizes:
+            class_obj = self.create_class(teacher, class_size)
+            self.stdout.write(f'  ⏱️  {class_size} students...')
+            for group_size in group_sizes:
+                scenario = perf.Scenario(
+                    f'generate_{class_size}_by_{group_size}', 'POST', '/api/grouping/generate/',
+                    data=lambda ctx, i, group_size=group_size: {
+                        'class_id': ctx['class'].pk, 'group_size': group_size, 'seed': f'bench-{i}',
+                        'strategy': options['strategy'],
+                    },
+                )
+                result = perf.run_scenario(
+                    client, scenario, {'class': class_obj},
+                    iterations=options['iterations'], warmup=options['warmup'],
+                )
+                rows.append((class_size, group_size, -(-class_size // group_size), result))
+        return rows
+
+    def create_class(self, teacher, class_size):
+        prefix = f'BG{class_size}'
+        class_obj = Class.objects.create(
+            class_id=prefix, class_name=f'Benchmark {class_size}', teacher=teacher, max_students=class_size,
+        )
+        Student.objects.bulk_create([
+            Student(student_id=f'{prefix}SV{n:05d}', first_name='Sinh', last_name=f'Viên {n}',
+                    email=f'{prefix.lower()}.{n}@example.com', gender='male', date_of_birth='2004-01-01')
+            for n in range(class_size)
+        ], batch_size=1000)
+        student_ids = Student.objects.filter(student_id__startswith=f'{prefix}SV').values_list('id', flat=True)
+        ClassStudent.objects.bulk_create([
+            ClassStudent(class_obj=class_obj, student_id=student_id) for student_id in student_ids
+        ], batch_size=1000)
+        return class_obj
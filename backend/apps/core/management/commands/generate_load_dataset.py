@@ -0,0 +1,400 @@
+"""
+Django Management Command: Generate Load Dataset
+Sinh dữ liệu giả lập quy mô lớn (hàng triệu dòng) bằng bulk_create để đo hiệu năng
+Chạy: python manage.py generate_load_dataset [--students 20000] [--classes 500] [--seed 42] [--clear]
+"""
+
+import random
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from datetime import time as dtime
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.attendance.models import Attendance, AttendanceSession, AttendanceSummary
+from apps.classes.models import Class, ClassStudent
+from apps.core.view_cache import bump, class_scope
+from apps.grades.models import Grade, Subject
+from apps.students.models import Student
+
+
+FIRST_NAMES = ['An', 'Bình', 'Chi', 'Dũng', 'Giang', 'Hà', 'Hải', 'Hạnh', 'Hiếu', 'Hoa', 'Hùng', 'Huy',
+               'Khánh', 'Lan', 'Linh', 'Long', 'Mai', 'Minh', 'Nam', 'Ngọc', 'Phong', 'Phương', 'Quân',
+               'Quỳnh', 'Sơn', 'Tâm', 'Thảo', 'Trang', 'Trung', 'Tú', 'Tuấn', 'Vy', 'Yến']
+LAST_NAMES = ['Nguyễn', 'Trần', 'Lê', 'Phạm', 'Hoàng', 'Huỳnh', 'Phan', 'Vũ', 'Võ', 'Đặng', 'Bùi', 'Đỗ',
+              'Hồ', 'Ngô', 'Dương', 'Lý']
+SUBJECT_NAMES = ['Lập trình Python', 'Cơ sở dữ liệu', 'Mạng máy tính', 'Cấu trúc dữ liệu', 'Hệ điều hành',
+                 'Trí tuệ nhân tạo', 'Phát triển Web', 'Kỹ thuật phần mềm', 'Toán rời rạc', 'An toàn thông tin']
+SLOTS = [(dtime(7, 0), dtime(9, 30)), (dtime(9, 45), dtime(12, 15)),
+         (dtime(13, 0), dtime(15, 30)), (dtime(15, 45), dtime(18, 15))]
+# present / late / excused / absent, roughly what real classes record
+STATUS_WEIGHTS = (('present', 0.82), ('late', 0.07), ('excused', 0.04), ('absent', 0.07))
+GRADE_TYPES = ('regular', 'midterm', 'final')
+EMAIL_DOMAIN = 'loadtest.local'
+# Generated ids: prefix + code + a fixed number of digits
+ID_DIGITS = {'GV': 5, 'SV': 7, 'MH': 4, 'C': 6}
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class Command(BaseCommand):
+    help = 'Generate a large deterministic dataset with bulk_create for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--teachers', type=int, default=100)
+        parser.add_argument('--classes', type=int, default=500)
+        parser.add_argument('--students', type=int, default=20000)
+        parser.add_argument('--class-size', type=int, default=45, help='Students enrolled per class')
+        parser.add_argument('--sessions-per-class', type=int, default=30)
+        parser.add_argument('--subjects', type=int, default=40)
+        parser.add_argument(
+            '--attendance-density', type=float, default=0.9,
+            help='Fraction of (session, enrolled student) pairs that get an attendance record',
+        )
+        parser.add_argument(
+            '--grade-density', type=float, default=0.8,
+            help='Fraction of enrollments that get regular/midterm/final grades',
+        )
+        parser.add_argument('--start-date', default='2025-09-01', help='First week of sessions (YYYY-MM-DD)')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per INSERT')
+        parser.add_argument(
+            '--prefix', default='LT',
+            help='Prefix of generated ids/emails (letters and digits); --clear only removes that dataset',
+        )
+        parser.add_argument('--password', default='loadtest123', help='Password of every generated account')
+        parser.add_argument('--clear', action='store_true', help='Delete a previous dataset with the same prefix first')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.prefix = options['prefix']
+        if not self.prefix.isascii() or not self.prefix.isalnum():
+            raise CommandError('--prefix must contain only letters and digits')
+        self.batch_size = options['batch_size']
+        self.rng = random.Random(options['seed'])
+        try:
+            self.start_date = datetime.strptime(options['start_date'], '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError('--start-date must be YYYY-MM-DD')
+        if options['class_size'] > options['students']:
+            raise CommandError('--class-size cannot exceed --students')
+
+        self.check_foreign_rows()
+        if options['clear']:
+            self.clear()
+        elif self.generated_users().exists():
+            raise CommandError(f'A dataset with prefix "{self.prefix}" exists; use --clear or another --prefix')
+
+        self.stdout.write(self.style.SUCCESS(f'🚀 Generating load dataset (seed={options["seed"]})...'))
+        started = time.perf_counter()
+        self.totals = {}
+
+        teachers = self.create_teachers()
+        students = self.create_students()
+        subjects = self.create_subjects()
+        classes = self.create_classes(teachers, subjects)
+        rosters = self.create_enrollments(classes, students)
+        sessions = self.create_sessions(classes)
+        self.create_attendance(sessions, rosters, classes)
+        self.create_grades(classes, rosters, subjects, teachers)
+        # bulk_create sends no model signals: invalidate cached statistics here
+        bump(*(class_scope(class_pk) for class_pk, _teacher in classes),
+             'students', 'classes', 'enrollment', 'attendance', 'grades')
+
+        elapsed = time.perf_counter() - started
+        total = sum(self.totals.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Created {total:,} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)'
+        ))
+
+    # -- helpers -----------------------------------------------------------
+
+    def insert(self, model, rows, label=None):
+        """bulk_create an iterable in batches; returns the number of rows."""
+        label = label or model._meta.db_table
+        started = time.perf_counter()
+        count = 0
+        for batch in chunked(rows, self.batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(batch, batch_size=self.batch_size)
+            count += len(batch)
+        elapsed = time.perf_counter() - started
+        self.totals[label] = self.totals.get(label, 0) + count
+        self.stdout.write(f'  📊 {label}: {count:,} rows in {elapsed:.2f}s ({count / max(elapsed, 1e-9):,.0f} rows/s)')
+        return count
+
+    def name(self):
+        return self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+
+    # -- dataset ownership -------------------------------------------------
+    # Ids alone do not prove a row was generated: a real class may well be
+    # called "LTC000001". Rows belong to the dataset only when they are tied
+    # to a generated ``@EMAIL_DOMAIN`` account (or, for subjects, carry the
+    # dataset marker), and nothing else is ever read back or deleted.
+
+    def id_pattern(self, code):
+        return rf'^{self.prefix}{code}[0-9]{{{ID_DIGITS[code]}}}$'
+
+    @property
+    def marker(self):
+        return f'{EMAIL_DOMAIN}:{self.prefix}'
+
+    def generated_users(self):
+        return User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}', email__startswith=f'{self.prefix.lower()}.')
+
+    def generated_classes(self):
+        return Class.objects.filter(class_id__regex=self.id_pattern('C'), teacher__in=self.generated_users())
+
+    def generated_students(self):
+        return Student.objects.filter(student_id__regex=self.id_pattern('SV'), user__in=self.generated_users())
+
+    def generated_subjects(self):
+        return Subject.objects.filter(subject_id__regex=self.id_pattern('MH'), description=self.marker)
+
+    def check_foreign_rows(self):
+        """Refuse to run when generated ids are already taken by rows outside the dataset."""
+        users = self.generated_users()
+        foreign = {
+            'users': User.objects.filter(
+                Q(teacher_id__regex=self.id_pattern('GV')) | Q(student_id__regex=self.id_pattern('SV'))
+            ).exclude(pk__in=users),
+            'classes': Class.objects.filter(class_id__regex=self.id_pattern('C')).exclude(teacher__in=users),
+            'students': Student.objects.filter(student_id__regex=self.id_pattern('SV')).exclude(user__in=users),
+            'subjects': Subject.objects.filter(subject_id__regex=self.id_pattern('MH')).exclude(description=self.marker),
+        }
+        taken = [label for label, queryset in foreign.items() if queryset.exists()]
+        if taken:
+            raise CommandError(
+                f'Prefix "{self.prefix}" matches existing {", ".join(taken)} that were not generated; '
+                'use another --prefix'
+            )
+
+    # -- entities ----------------------------------------------------------
+
+    def create_teachers(self):
+        # Hashing once: every account shares the same password
+        password = make_password(self.options['password'])
+        rows = []
+        for n in range(self.options['teachers']):
+            first, last = self.name()
+            rows.append(User(
+                email=f'{self.prefix.lower()}.teacher{n}@{EMAIL_DOMAIN}',
+                username=f'{self.prefix.lower()}.teacher{n}',
+                password=password, first_name=first, last_name=last,
+                role='teacher', account_status='active', teacher_id=f'{self.prefix}GV{n:05d}',
+            ))
+        self.insert(User, rows, 'users (teachers)')
+        # bulk_create does not return ids on MySQL: read them back by natural key
+        teachers = self.generated_users().filter(teacher_id__regex=self.id_pattern('GV'))
+        return list(teachers.order_by('teacher_id').values_list('id', flat=True))
+
+    def create_students(self):
+        password = make_password(self.options['password'])
+        count = self.options['students']
+        users = []
+        for n in range(count):
+            first, last = self.name()
+            users.append(User(
+                email=f'{self.prefix.lower()}.sv{n}@{EMAIL_DOMAIN}',
+                username=f'{self.prefix.lower()}.sv{n}',
+                password=password, first_name=first, last_name=last,
+                role='student', account_status='active', student_id=f'{self.prefix}SV{n:07d}',
+            ))
+        self.insert(User, users, 'users (students)')
+        user_ids = dict(self.generated_users().filter(student_id__regex=self.id_pattern('SV')).values_list('student_id', 'id'))
+
+        students = (
+            Student(
+                user_id=user_ids[user.student_id],
+                student_id=user.student_id,
+                first_name=user.first_name,
+                last_name=user.last_name,
+                email=user.email,
+                gender=self.rng.choice(('male', 'female')),
+                date_of_birth=date(2003, 1, 1) + timedelta(days=self.rng.randrange(4 * 365)),
+            )
+            for user in users
+        )
+        self.insert(Student, students)
+        return list(self.generated_students().order_by('student_id').values_list('id', flat=True))
+
+    def create_subjects(self):
+        rows = [
+            Subject(
+                subject_id=f'{self.prefix}MH{n:04d}',
+                subject_name=f'{SUBJECT_NAMES[n % len(SUBJECT_NAMES)]} {n // len(SUBJECT_NAMES) + 1}',
+                credits=self.rng.choice((2, 3, 4)),
+                description=self.marker,
+            )
+            for n in range(self.options['subjects'])
+        ]
+        self.insert(Subject, rows)
+        return list(self.generated_subjects().order_by('subject_id').values_list('id', flat=True))
+
+    def create_classes(self, teachers, subjects):
+        rows = [
+            Class(
+                class_id=f'{self.prefix}C{n:06d}',
+                class_name=f'Lớp {SUBJECT_NAMES[n % len(SUBJECT_NAMES)]} {n}',
+                teacher_id=teachers[n % len(teachers)],
+                max_students=self.options['class_size'] + 5,
+            )
+            for n in range(self.options['classes'])
+        ]
+        self.insert(Class, rows)
+        return list(self.generated_classes().order_by('class_id').values_list('id', 'teacher_id'))
+
+    def create_enrollments(self, classes, students):
+        size = self.options['class_size']
+        rosters = {class_pk: self.rng.sample(students, size) for class_pk, _teacher in classes}
+        rows = (
+            ClassStudent(class_obj_id=class_pk, student_id=student_pk)
+            for class_pk, roster in rosters.items()
+            for student_pk in roster
+        )
+        self.insert(ClassStudent, rows)
+        return rosters
+
+    def create_sessions(self, classes):
+        per_class = self.options['sessions_per_class']
+        rows = []
+        for class_pk, teacher_pk in classes:
+            weekday = self.rng.randrange(6)
+            start_time, end_time = self.rng.choice(SLOTS)
+            first_day = self.start_date + timedelta(days=(weekday - self.start_date.weekday()) % 7)
+            for week in range(per_class):
+                rows.append(AttendanceSession(
+                    class_obj_id=class_pk,
+                    session_name=f'Buổi {week + 1}',
+                    session_date=first_day + timedelta(weeks=week),
+                    start_time=start_time,
+                    end_time=end_time,
+                    session_type='practice' if week % 3 == 2 else 'lecture',
+                    created_by_id=teacher_pk,
+                ))
+        self.insert(AttendanceSession, rows)
+        sessions = AttendanceSession.objects.filter(
+            class_obj__in=self.generated_classes()
+        ).order_by('id').values_list('id', 'class_obj_id', 'session_date', 'start_time')
+        return list(sessions)
+
+    def create_attendance(self, sessions, rosters, classes):
+        density = self.options['attendance_density']
+        statuses = [status for status, _ in STATUS_WEIGHTS]
+        weights = [weight for _, weight in STATUS_WEIGHTS]
+        tz = timezone.get_current_timezone()
+        counts = defaultdict(lambda: defaultdict(int))     # (student, class) -> status -> n
+
+        def rows():
+            for session_pk, class_pk, day, start_time in sessions:
+                opened = datetime.combine(day, start_time, tzinfo=tz)
+                for student_pk in rosters[class_pk]:
+                    if self.rng.random() >= density:
+                        continue
+                    status = self.rng.choices(statuses, weights)[0]
+                    counts[student_pk, class_pk][status] += 1
+                    check_in = None
+                    if status == 'present':
+                        check_in = opened + timedelta(minutes=self.rng.randrange(-10, 10))
+                    elif status == 'late':
+                        check_in = opened + timedelta(minutes=self.rng.randrange(10, 40))
+                    yield Attendance(session_id=session_pk, student_id=student_pk, status=status, check_in_time=check_in)
+
+        self.insert(Attendance, rows())
+
+        sessions_per_class = defaultdict(int)
+        for _session_pk, class_pk, _day, _start in sessions:
+            sessions_per_class[class_pk] += 1
+        summaries = (
+            AttendanceSummary(
+                student_id=student_pk,
+                class_obj_id=class_pk,
+                total_sessions=sessions_per_class[class_pk],
+                present_count=by_status['present'],
+                absent_count=by_status['absent'],
+                late_count=by_status['late'],
+                excused_count=by_status['excused'],
+                attendance_rate=Decimal(
+                    (by_status['present'] + by_status['excused']) * 100 / max(sessions_per_class[class_pk], 1)
+                ).quantize(Decimal('0.01')),
+            )
+            for (student_pk, class_pk), by_status in counts.items()
+        )
+        self.insert(AttendanceSummary, summaries)
+
+    def create_grades(self, classes, rosters, subjects, teachers):
+        density = self.options['grade_density']
+
+        def score():
+            # Roughly normal around 7, in quarter points within [0, 10]
+            value = min(max(self.rng.gauss(7.0, 1.6), 0.0), 10.0)
+            return Decimal(round(value * 4) / 4).quantize(Decimal('0.01'))
+
+        def rows():
+            for index, (class_pk, teacher_pk) in enumerate(classes):
+                subject_pk = subjects[index % len(subjects)]
+                for student_pk in rosters[class_pk]:
+                    if self.rng.random() >= density:
+                        continue
+                    for grade_type in GRADE_TYPES:
+                        yield Grade(
+                            student_id=student_pk, class_obj_id=class_pk, subject_id=subject_pk,
+                            grade_type=grade_type, score=score(), max_score=Decimal('10.00'),
+                            created_by_id=teacher_pk,
+                        )
+
+        self.insert(Grade, rows())
+
+    # -- cleanup -----------------------------------------------------------
+
+    def clear(self):
+        """Remove the dataset with the same prefix.
+
+        Only rows tied to generated accounts are touched (see
+        ``generated_users``). The high-volume leaf tables (no other table
+        points at them) go first with ``_raw_delete``, one DELETE each,
+        instead of being loaded into memory. The owners are then removed with
+        ``QuerySet.delete()``, so every other dependent row (group sets,
+        assignments, materials, grade summaries, tokens, rows added by
+        ``perf_benchmark``...) follows the models' own ``on_delete`` rules and
+        signals.
+        """
+        self.stdout.write(f'🗑️  Clearing dataset "{self.prefix}"...')
+        class_ids = self.generated_classes().values('id')
+        leaves = [
+            Attendance.objects.filter(session__class_obj__in=class_ids),
+            AttendanceSummary.objects.filter(class_obj__in=class_ids),
+            Grade.objects.filter(class_obj__in=class_ids),
+            ClassStudent.objects.filter(class_obj__in=class_ids),
+        ]
+        owners = [
+            AttendanceSession.objects.filter(class_obj__in=class_ids),
+            Class.objects.filter(id__in=class_ids),
+            self.generated_subjects(),
+            self.generated_students(),
+            self.generated_users(),
+        ]
+        with transaction.atomic():
+            for queryset in leaves:
+                deleted = queryset._raw_delete(queryset.db)
+                self.stdout.write(f'  🗑️  {queryset.model._meta.label}: {deleted:,}')
+            for queryset in owners:
+                _, per_model = queryset.delete()
+                for label, deleted in per_model.items():
+                    if deleted:
+                        self.stdout.write(f'  🗑️  {label}: {deleted:,}')
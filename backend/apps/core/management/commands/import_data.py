@@ -0,0 +1,68 @@
+"""
+Django Management Command: Import Data
+Import file NDJSON của export_data (hoặc file JSON cũ của export_data.py) theo lô
+Chạy: python manage.py import_data <file> [--chunk-size 1000] [--update] [--restart]
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.datasync import Importer, read_records
+
+
+class Command(BaseCommand):
+    help = 'Bulk-load an export_data dump in dependency order, resuming from a checkpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='NDJSON dump (.ndjson / .ndjson.gz) or v1 JSON export')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Rows written per transaction',
+        )
+        parser.add_argument(
+            '--update',
+            action='store_true',
+            help='Update rows that already exist (default: keep them unchanged)',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Checkpoint file; default <path>.checkpoint',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Ignore an existing checkpoint and start from the first line',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            records = read_records(path)
+        except OSError as e:
+            raise CommandError(f'Không đọc được file {path}: {e}')
+
+        importer = Importer(
+            chunk_size=options['chunk_size'],
+            update=options['update'],
+            checkpoint=options['checkpoint'] or f'{path}.checkpoint',
+            log=self.stdout.write,
+        )
+        self.stdout.write(f'🔄 Đang import dữ liệu từ {path}...')
+        started = time.perf_counter()
+        stats = importer.run(records, resume=not options['restart'])
+        elapsed = time.perf_counter() - started
+
+        for name, entity_stats in stats.items():
+            self.stdout.write(
+                f'  📊 {name}: {entity_stats.created} mới, {entity_stats.updated} cập nhật, '
+                f'{entity_stats.skipped} đã tồn tại, {entity_stats.missing} thiếu khóa ngoại, '
+                f'{entity_stats.failed} lỗi '
+                f'({entity_stats.rows / max(entity_stats.seconds, 1e-9):,.0f} dòng/s)'
+            )
+        total = sum(entity_stats.rows for entity_stats in stats.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Import hoàn thành: {total} dòng trong {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} dòng/s)'
+        ))
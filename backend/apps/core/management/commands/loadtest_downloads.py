@@ -0,0 +1,163 @@
+"""
+Django Management Command: Load Test Downloads
+Mô phỏng cả lớp (mặc định 200 sinh viên) tải cùng lúc một tài liệu qua /api/materials/<id>/download/
+và đo thời gian mỗi worker Django bị chiếm giữ, với và không với X-Accel-Redirect
+Chạy: python manage.py loadtest_downloads [--students 200] [--workers 8] [--file-mb 2] [--client-mbps 100]
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.classes.models import Class, ClassStudent
+from apps.core import perf
+from apps.materials.models import ClassMaterial
+from apps.students.models import Student
+
+
+MODES = {
+    # MEDIA_SENDFILE value of each mode
+    'stream': '',
+    'nginx': 'nginx',
+    'sendfile': 'sendfile',
+}
+
+
+class Command(BaseCommand):
+    help = 'Simulate a whole class downloading one material at once and report Django worker occupancy'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=200, help='Simultaneous downloads')
+        parser.add_argument('--workers', type=int, default=8, help='Django worker processes/threads to simulate')
+        parser.add_argument('--file-mb', type=float, default=2, help='Size of the downloaded file')
+        parser.add_argument('--client-mbps', type=float, default=100,
+                            help='Bandwidth of each client in Mbit/s; a streaming worker is held at that pace')
+        parser.add_argument('--modes', default='stream,nginx', help=f'Comma separated: {", ".join(MODES)}')
+        parser.add_argument('--max-hold-ms', type=float, default=250,
+                            help='Fail if p95 worker hold time exceeds this in nginx/sendfile modes')
+
+    def handle(self, *args, **options):
+        modes = [mode.strip() for mode in options['modes'].split(',') if mode.strip()]
+        unknown = [mode for mode in modes if mode not in MODES]
+        if unknown or not modes:
+            raise CommandError(f'--modes must be taken from: {", ".join(MODES)}')
+        if options['students'] < 1 or options['workers'] < 1:
+            raise CommandError('--students and --workers must be positive')
+
+        media_root = tempfile.mkdtemp(prefix='loadtest-media-')
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with override_settings(DEBUG=False, MEDIA_ROOT=media_root):
+                material, users = self.create_fixture(options)
+                rows = []
+                for mode in modes:
+                    self.stdout.write(f'  ⏱️  {mode}: {len(users)} downloads on {options["workers"]} workers...')
+                    with override_settings(MEDIA_SENDFILE=MODES[mode]):
+                        rows.append((mode, self.run_mode(material, users, options)))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+            shutil.rmtree(media_root, ignore_errors=True)
+
+        self.stdout.write(
+            f'\n📊 {"mode":<9} {"ok":>5} {"hold p50":>9} {"hold p95":>9} {"wait p95":>9} '
+            f'{"worker-s":>9} {"total s":>8} {"busy %":>7} {"MB via Django":>14}'
+        )
+        for mode, stats in rows:
+            self.stdout.write(
+                f'   {mode:<9} {stats["ok"]:>5} {stats["hold_p50_ms"]:>9} {stats["hold_p95_ms"]:>9} '
+                f'{stats["wait_p95_ms"]:>9} {stats["worker_seconds"]:>9} {stats["makespan_s"]:>8} '
+                f'{stats["occupancy_pct"]:>7} {stats["streamed_mb"]:>14}'
+            )
+
+        failed = [mode for mode, stats in rows if stats['ok'] != len(users)]
+        if failed:
+            raise CommandError(f'Unexpected responses in: {", ".join(failed)}')
+        slow = [
+            mode for mode, stats in rows
+            if MODES[mode] and stats['hold_p95_ms'] > options['max_hold_ms']
+        ]
+        if slow:
+            raise CommandError(f'Workers held longer than {options["max_hold_ms"]} ms (p95) in: {", ".join(slow)}')
+        self.stdout.write(self.style.SUCCESS('✅ Load test hoàn thành'))
+
+    def create_fixture(self, options):
+        teacher = User.objects.create_user(
+            'loadtest.teacher@example.com', 'Loadtest@123', role='teacher', first_name='Load', last_name='Test',
+        )
+        class_obj = Class.objects.create(
+            class_id='LTDL', class_name='Load test downloads', teacher=teacher, max_students=options['students'],
+        )
+        # Unusable passwords: hashing hundreds of real ones would dominate the setup
+        password = make_password(None)
+        User.objects.bulk_create([
+            User(email=f'ltdl.{n}@example.com', username=f'ltdl.{n}', password=password, role='student',
+                 first_name='Sinh', last_name=f'Viên {n}')
+            for n in range(options['students'])
+        ], batch_size=1000)
+        users = list(User.objects.filter(email__startswith='ltdl.').order_by('id'))
+        Student.objects.bulk_create([
+            Student(user=user, student_id=f'LTDL{n:05d}', first_name='Sinh', last_name=f'Viên {n}',
+                    email=user.email, gender='male', date_of_birth='2004-01-01')
+            for n, user in enumerate(users)
+        ], batch_size=1000)
+        student_ids = Student.objects.filter(student_id__startswith='LTDL').values_list('id', flat=True)
+        ClassStudent.objects.bulk_create([
+            ClassStudent(class_obj=class_obj, student_id=student_id) for student_id in student_ids
+        ], batch_size=1000)
+
+        material = ClassMaterial(class_obj=class_obj, title='Slide bài giảng', created_by=teacher)
+        size = int(options['file_mb'] * 1024 * 1024)
+        material.file.save('Slide_Bai_Giang.pdf', ContentFile(b'%PDF-1.4\n' + os.urandom(max(size - 9, 0))))
+        return material, users
+
+    def run_mode(self, material, users, options):
+        url = f'/api/materials/{material.pk}/download/'
+        bytes_per_second = options['client_mbps'] * 1024 * 1024 / 8
+
+        def download(user):
+            # One pool thread plays one worker: it is busy from the request
+            # until the last byte leaves Django, paced by the client bandwidth.
+            started = time.perf_counter()
+            client = APIClient()
+            client.force_authenticate(user)
+            response = client.get(url)
+            streamed = 0
+            if response.status_code == 200 and getattr(response, 'streaming', False):
+                for chunk in response.streaming_content:
+                    streamed += len(chunk)
+                    time.sleep(len(chunk) / bytes_per_second)
+                response.close()
+            finished = time.perf_counter()
+            return started, finished, response.status_code, streamed
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            results = list(pool.map(download, users))
+
+        holds = [(finished - started) * 1000 for started, finished, _, _ in results]
+        waits = [(started - t0) * 1000 for started, _, _, _ in results]
+        makespan = max(finished for _, finished, _, _ in results) - t0
+        worker_seconds = sum(holds) / 1000
+        return {
+            'ok': sum(1 for *_, status, _ in results if status == 200),
+            'hold_p50_ms': round(perf.percentile(holds, 0.50), 1),
+            'hold_p95_ms': round(perf.percentile(holds, 0.95), 1),
+            'wait_p95_ms': round(perf.percentile(waits, 0.95), 1),
+            'worker_seconds': round(worker_seconds, 2),
+            'makespan_s': round(makespan, 2),
+            'occupancy_pct': round(100 * worker_seconds / (options['workers'] * makespan), 1),
+            'streamed_mb': round(sum(streamed for *_, streamed in results) / (1024 * 1024), 1),
+        }
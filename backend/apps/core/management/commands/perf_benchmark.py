@@ -0,0 +1,258 @@
+"""
+Django Management Command: Perf Benchmark
+Đo số query, độ trễ p50/p95 và bộ nhớ đỉnh của các API quan trọng trên database test tạm thời
+Chạy: python manage.py perf_benchmark [--size small] [--only class_detail,grade_statistics] [--update-budgets]
+"""
+
+import io
+import json
+from datetime import time, timedelta
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.attendance.models import AttendanceSession
+from apps.classes.models import Class, ClassStudent
+from apps.core import perf, view_cache
+from apps.grades.models import Subject
+from apps.rooms.models import Building, Room, RoomSchedule
+
+
+# Arguments for generate_load_dataset
+SIZES = {
+    'small': ['--teachers', '20', '--classes', '60', '--students', '3000', '--class-size', '45',
+              '--sessions-per-class', '15'],
+    'medium': ['--teachers', '100', '--classes', '500', '--students', '20000', '--class-size', '60',
+               '--sessions-per-class', '30'],
+    'large': ['--teachers', '400', '--classes', '2000', '--students', '100000', '--class-size', '80',
+              '--sessions-per-class', '45'],
+}
+IMPORT_ROWS = 200
+
+
+def _workbook(rows, header_row=1):
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    if header_row == 2:
+        sheet.append(['DANH SÁCH'])
+    for row in rows:
+        sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    buffer.name = 'import.xlsx'
+    return buffer
+
+
+def student_import_file(ctx, iteration):
+    header = ['mssv', 'họ_đệm', 'tên', 'email', 'giới_tính', 'ngày_sinh']
+    rows = [
+        [f'BI{iteration:03d}{n:05d}', 'Nguyễn', 'An', f'bi{iteration}.{n}@example.com', 'Nam', '01/01/2004']
+        for n in range(IMPORT_ROWS)
+    ]
+    return {'file': _workbook([header] + rows, header_row=2)}
+
+
+def grade_import_file(ctx, iteration):
+    # Columns of grades.views.import_excel; one subject per iteration, since a
+    # student has a single grade per class, subject and type
+    subject, _ = Subject.objects.get_or_create(
+        subject_id=f'BENCH{iteration:03d}', defaults={'subject_name': f'Benchmark {iteration}'},
+    )
+    header = ['student_id', 'class_id', 'subject', 'score', 'exam_type']
+    rows = [
+        [student_id, ctx['class'].pk, subject.subject_id, 7.5, 'quiz']
+        for student_id in ctx['roster_ids'][:IMPORT_ROWS]
+    ]
+    return {'file': _workbook([header] + rows)}
+
+
+def imported_rows(response):
+    data = getattr(response, 'data', None) or {}
+    if not data.get('created_count'):
+        return f'nothing imported: {str(data.get("errors", ""))[:200]}'
+    if data.get('errors'):
+        return f'{len(data["errors"])} rows rejected: {str(data["errors"][0])[:200]}'
+    return None
+
+
+def attendance_import_file(ctx, iteration):
+    header = ['student_id', 'session_id', 'status']
+    session = ctx['sessions'][iteration % len(ctx['sessions'])]
+    rows = [[student_pk, session, 'present'] for student_pk in ctx['roster_pks'][:IMPORT_ROWS]]
+    return {'file': _workbook([header] + rows)}
+
+
+def check_in(ctx, iteration):
+    return {'qr_code': ctx['qr_session'].qr_code, 'student_id': ctx['roster_ids'][iteration]}
+
+
+SCENARIOS = [
+    perf.Scenario('class_detail_with_students', 'GET', lambda ctx: f'/api/classes/{ctx["class"].pk}/detail/'),
+    perf.Scenario('check_in_with_qr', 'POST', '/api/attendance/check-in-qr/', user='student', data=check_in,
+                  expect=(200, 201), max_iterations=40),
+    perf.Scenario('grade_statistics', 'GET', '/api/grades/statistics/', user='admin'),
+    perf.Scenario('class_grade_summary', 'GET', lambda ctx: f'/api/grades/class/{ctx["class"].pk}/summary/'),
+    perf.Scenario('class_list', 'GET', '/api/classes/'),
+    perf.Scenario('class_list_admin', 'GET', '/api/classes/', user='admin'),
+    perf.Scenario('available_rooms', 'GET', lambda ctx: (
+        f'/api/rooms/rooms/available/?date={ctx["today"]:%Y-%m-%d}&start_time=09:00&end_time=11:00'
+    )),
+    perf.Scenario('generate_groups', 'POST', '/api/grouping/generate/',
+                  data=lambda ctx, i: {'class_id': ctx['class'].pk, 'group_size': 4, 'seed': f'bench-{i}'}),
+    perf.Scenario('import_students_excel', 'POST', '/api/students/import-excel/', user='admin',
+                  data=student_import_file, format='multipart'),
+    perf.Scenario('import_grades_excel', 'POST', '/api/grades/import-excel/', user='admin',
+                  data=grade_import_file, format='multipart', check=imported_rows),
+    perf.Scenario('import_attendance_excel', 'POST', '/api/attendance/import-excel/', user='admin',
+                  data=attendance_import_file, format='multipart'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark hot API endpoints (queries, p50/p95 latency, peak memory) against stored budgets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', choices=sorted(SIZES), default='small', help='Generated dataset size')
+        parser.add_argument('--iterations', type=int, default=20, help='Measured requests per scenario')
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--only', help='Comma separated scenario names')
+        parser.add_argument('--budgets', default=str(perf.DEFAULT_BUDGETS), help='Budgets JSON file')
+        parser.add_argument(
+            '--tolerance', type=float, default=1.5,
+            help='Allowed factor over the latency/memory budget (query counts must not grow)',
+        )
+        parser.add_argument('--update-budgets', action='store_true', help='Store these results as the new budgets')
+        parser.add_argument('--json', dest='json_path', help='Also write raw results to this file')
+
+    def handle(self, *args, **options):
+        scenarios = SCENARIOS
+        if options['only']:
+            names = {name.strip() for name in options['only'].split(',')}
+            scenarios = [scenario for scenario in SCENARIOS if scenario.name in names]
+            unknown = names - {scenario.name for scenario in scenarios}
+            if unknown:
+                raise CommandError(f'Unknown scenarios: {", ".join(sorted(unknown))}')
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        saved_cache = view_cache.ENABLED
+        try:
+            # Keep the benchmark quiet and independent of SMTP/debug settings.
+            # The response cache is read at import time: switch it off so
+            # cached views are measured, not served from the warmup's entry
+            view_cache.ENABLED = False
+            with override_settings(DEBUG=False, EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'):
+                results = self.run_benchmark(scenarios, options)
+        finally:
+            view_cache.ENABLED = saved_cache
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.report(results, options)
+
+    def run_benchmark(self, scenarios, options):
+        self.stdout.write(self.style.SUCCESS(f'🚀 Generating "{options["size"]}" dataset...'))
+        call_command('generate_load_dataset', *SIZES[options['size']], '--seed', '1', stdout=io.StringIO())
+        ctx = self.build_context()
+        clients = {}
+        for role, user in ctx['users'].items():
+            clients[role] = APIClient()
+            clients[role].force_authenticate(user)
+
+        results = []
+        for scenario in scenarios:
+            self.stdout.write(f'  ⏱️  {scenario.name}...')
+            results.append(perf.run_scenario(
+                clients[scenario.user], scenario, ctx,
+                iterations=options['iterations'], warmup=options['warmup'],
+            ))
+        return results
+
+    def build_context(self):
+        """Fixtures shared by the scenarios: the busiest class, its teacher, a live QR session, rooms."""
+        class_obj = Class.objects.filter(class_id__startswith='LTC').order_by('id').select_related('teacher').first()
+        roster = list(
+            ClassStudent.objects.filter(class_obj=class_obj)
+            .order_by('student_id').values_list('student_id', 'student__student_id')
+        )
+        today = timezone.localdate()
+        qr_session = AttendanceSession.objects.create(
+            class_obj=class_obj, session_name='Benchmark', session_date=today,
+            start_time=time(0, 0), end_time=time(23, 59), qr_code='BENCH-QR', created_by=class_obj.teacher,
+        )
+
+        building = Building.objects.create(building_id='BENCH', building_name='Benchmark')
+        Room.objects.bulk_create([
+            Room(room_id=f'BENCH{n:03d}', room_name=str(n), building=building, floor=n // 20 + 1, capacity=40 + n % 60)
+            for n in range(120)
+        ])
+        rooms = list(Room.objects.filter(building=building))
+        admin = User.objects.create_superuser('bench.admin@example.com', 'Benchmark@123', first_name='Bench', last_name='Admin')
+        RoomSchedule.objects.bulk_create([
+            RoomSchedule(
+                room=room, title='Booked', start_date=today - timedelta(days=30), end_date=today + timedelta(days=60),
+                start_time=time(9, 45), end_time=time(12, 15), is_recurring=False, created_by=admin,
+            )
+            for room in rooms[::3]
+        ])
+        student_user = User.objects.filter(role='student', email__endswith='@loadtest.local').first()
+
+        return {
+            'class': class_obj,
+            'subject': Subject.objects.filter(subject_id__startswith='LTMH').first(),
+            'roster_pks': [pk for pk, _ in roster],
+            'roster_ids': [student_id for _, student_id in roster],
+            'sessions': list(AttendanceSession.objects.filter(class_obj=class_obj).values_list('id', flat=True)),
+            'qr_session': qr_session,
+            'today': today,
+            'users': {'admin': admin, 'teacher': class_obj.teacher, 'student': student_user},
+        }
+
+    def report(self, results, options):
+        size = options['size']
+        budgets_file = perf.load_budgets(options['budgets'])
+        budgets = budgets_file.get(size, {})
+
+        self.stdout.write(f'\n📊 {"scenario":<28} {"queries":>7} {"p50 ms":>8} {"p95 ms":>8} {"peak KB":>9}  status')
+        failures = []
+        for result in results:
+            violations = []
+            if result.name in budgets:
+                violations = perf.check_budget(result, budgets[result.name], options['tolerance'])
+            if not result.ok:
+                violations.append(f'unexpected responses {result.unexpected}')
+            line = (f'   {result.name:<28} {result.queries:>7} {result.p50_ms:>8} {result.p95_ms:>8} '
+                    f'{result.peak_kb:>9}  {"no budget" if result.name not in budgets else "ok"}')
+            if violations:
+                failures.append((result.name, violations))
+                self.stdout.write(self.style.ERROR(line.replace(' ok', ' FAIL') + '  ' + '; '.join(violations)))
+            else:
+                self.stdout.write(line)
+
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as handle:
+                json.dump({'size': size, 'results': perf.results_as_json(results)}, handle, indent=2)
+
+        if options['update_budgets']:
+            broken = [result.name for result in results if not result.ok]
+            if broken:
+                raise CommandError(f'Not recording budgets of failing scenarios: {", ".join(broken)}')
+            budgets_file[size] = {**budgets, **perf.budgets_from_results(results)}
+            perf.save_budgets(budgets_file, options['budgets'])
+            self.stdout.write(self.style.SUCCESS(f'✅ Budgets for "{size}" written to {options["budgets"]}'))
+            return
+
+        if failures:
+            raise CommandError(
+                f'{len(failures)} scenario(s) over budget: ' + ', '.join(name for name, _ in failures)
+            )
+        self.stdout.write(self.style.SUCCESS('✅ All scenarios within budget'))
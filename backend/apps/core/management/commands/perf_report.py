@@ -0,0 +1,84 @@
+"""
+Django Management Command: Perf Report
+Tổng hợp số query, thời gian DB/serialize/latency theo từng view từ PerformanceMiddleware
+Chạy: python manage.py perf_report [--sort queries] [--limit 20] [--reset]
+"""
+
+import json
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+
+from apps.core.profiling import clear_snapshots, load_snapshots, merged_views, quantile
+
+
+SORT_KEYS = {
+    'total': lambda s: s['seconds'],
+    'latency': lambda s: s['seconds'] / s['requests'],
+    'p95': lambda s: quantile(s, 0.95),
+    'queries': lambda s: s['queries'] / s['requests'],
+    'db': lambda s: s['db_seconds'],
+    'requests': lambda s: s['requests'],
+    'nplusone': lambda s: s['nplusone'],
+}
+
+
+class Command(BaseCommand):
+    help = 'Summarize per-view SQL/latency stats collected by PerformanceMiddleware'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sort', choices=sorted(SORT_KEYS), default='total',
+                            help='Order views by this column (default: total time spent)')
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--suspects', type=int, default=10, help='Recent N+1 suspects to show')
+        parser.add_argument('--json', action='store_true', help='Print raw merged stats as JSON')
+        parser.add_argument('--reset', action='store_true', help='Delete collected stats after reporting')
+
+    def handle(self, *args, **options):
+        # This process served no requests: only the workers' snapshots count
+        snapshots = load_snapshots(include_live=False)
+        views = {view: stats for view, stats in merged_views(snapshots).items() if stats['requests']}
+
+        if options['json']:
+            self.stdout.write(json.dumps({'workers': len(snapshots), 'views': views}, indent=2))
+        elif not views:
+            self.stdout.write('Chưa có dữ liệu: bật PERF_PROFILING và gửi vài request trước.')
+        else:
+            self.print_table(views, options)
+            self.print_suspects(snapshots, options['suspects'])
+
+        if options['reset']:
+            clear_snapshots()
+            self.stdout.write(self.style.SUCCESS('✅ Perf stats cleared'))
+
+    def print_table(self, views, options):
+        ordered = sorted(views.items(), key=lambda item: SORT_KEYS[options['sort']](item[1]), reverse=True)
+        self.stdout.write(self.style.SUCCESS(f'📊 Hot endpoints (sorted by {options["sort"]})'))
+        self.stdout.write(
+            f'{"view":<55} {"reqs":>6} {"avg ms":>8} {"p95 ms":>8} {"q/req":>6} {"q max":>6} '
+            f'{"db ms":>7} {"ser ms":>7} {"N+1":>5}'
+        )
+        for view, s in ordered[:options['limit']]:
+            n = s['requests']
+            p95 = quantile(s, 0.95)
+            line = (
+                f'{view[:55]:<55} {n:>6} {s["seconds"] / n * 1000:>8.1f} '
+                f'{"inf" if p95 == float("inf") else f"<={p95 * 1000:.0f}":>8} '
+                f'{s["queries"] / n:>6.1f} {s["queries_max"]:>6} {s["db_seconds"] / n * 1000:>7.1f} '
+                f'{s["render_seconds"] / n * 1000:>7.1f} {s["nplusone"]:>5}'
+            )
+            self.stdout.write(self.style.WARNING(line) if s['nplusone'] else line)
+
+    def print_suspects(self, snapshots, limit):
+        suspects = sorted(
+            (suspect for snapshot in snapshots for suspect in snapshot.get('suspects', [])),
+            key=lambda suspect: suspect['at'], reverse=True,
+        )[:limit]
+        if not suspects:
+            return
+        self.stdout.write(self.style.WARNING('\n⚠️  Recent N+1 suspects'))
+        for suspect in suspects:
+            at = datetime.fromtimestamp(suspect['at']).strftime('%Y-%m-%d %H:%M:%S')
+            self.stdout.write(f'  {at}  {suspect["view"]}  ({suspect["queries"]} queries, {suspect["ms"]} ms)')
+            for repeated in suspect['repeated']:
+                self.stdout.write(f'      {repeated["times"]} x {repeated["sql"]}')
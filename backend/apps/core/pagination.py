@@ -0,0 +1,213 @@
+"""Pagination helpers shared by the large list endpoints.
+
+Two modes are available on views using ``KeysetPaginationMixin``:
+
+- Page-number (default, backwards compatible): ``?page=3``. Add ``?count=false``
+  to skip the ``COUNT(*)`` query; the response then has ``count: null`` and the
+  next link is computed by fetching one extra row.
+- Cursor/keyset (opt-in): ``?pagination=cursor``. Uses an opaque ``cursor``
+  parameter and seeks on the view's ``cursor_ordering`` instead of ``OFFSET``,
+  so deep pages cost the same as the first one. Never issues a count.
+"""
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+FALSE_VALUES = ('0', 'false', 'no', 'off')
+
+
+def _cursor_value(value):
+    # Full precision: DjangoJSONEncoder rounds datetimes to milliseconds,
+    # which would skip rows created within the same millisecond
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+class OptionalCountPageNumberPagination(PageNumberPagination):
+    """PageNumberPagination that can skip the total count with ``?count=false``."""
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.skip_count = request.query_params.get(self.count_query_param, '').lower() in FALSE_VALUES
+        if not self.skip_count:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        try:
+            page_number = int(request.query_params.get(self.page_query_param, 1))
+        except (TypeError, ValueError):
+            raise NotFound('Số trang không hợp lệ')
+        if page_number < 1:
+            raise NotFound('Số trang không hợp lệ')
+
+        offset = (page_number - 1) * page_size
+        # One extra row tells us whether a next page exists without COUNT(*)
+        rows = list(queryset[offset:offset + page_size + 1])
+        if not rows and page_number != 1:
+            raise NotFound('Trang không tồn tại')
+
+        self.request = request
+        self.page_number = page_number
+        self.has_next = len(rows) > page_size
+        return rows[:page_size]
+
+    def get_paginated_response(self, data):
+        if not getattr(self, 'skip_count', False):
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('count', None),
+            ('next', self._get_uncounted_next_link()),
+            ('previous', self._get_uncounted_previous_link()),
+            ('results', data),
+        ]))
+
+    def _get_uncounted_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.page_number + 1)
+
+    def _get_uncounted_previous_link(self):
+        if self.page_number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
+
+class KeysetCursorPagination(CursorPagination):
+    """Keyset pagination on every column of the view's ``cursor_ordering``.
+
+    DRF's ``CursorPagination`` seeks on the first column only and skips rows
+    sharing that value with an ``OFFSET``. Here the cursor holds the values of
+    all ordering columns of the last row, and the next page is the rows after
+    that tuple, e.g. ``(session_date, start_time, id) < (d, t, i)`` for a
+    descending ordering, written as ``date < d OR (date = d AND (time < t OR
+    ...))``. Pages inside one busy date therefore cost the same as any other.
+
+    ``cursor_ordering`` must end with a unique column (``id``), use
+    non-nullable columns of the model itself, and be backed by a composite
+    index.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    invalid_cursor_message = 'Cursor không hợp lệ'
+
+    def get_ordering(self, request, queryset, view):
+        # Ignore OrderingFilter/``?ordering=``: the cursor only works for the
+        # indexed ordering declared on the view.
+        ordering = getattr(view, 'cursor_ordering', None) or self.ordering
+        if isinstance(ordering, str):
+            return (ordering,)
+        return tuple(ordering)
+
+    # -- cursor encoding --------------------------------------------------
+
+    def _encode(self, reverse, row):
+        position = [getattr(row, self._attnames[name]) for name in self._names]
+        payload = json.dumps({'r': int(reverse), 'p': position}, default=_cursor_value, separators=(',', ':'))
+        cursor = urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def _decode(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            reverse, position = bool(payload['r']), payload['p']
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self._names):
+            raise NotFound(self.invalid_cursor_message)
+        # A crafted cursor must not reach the query with values the columns
+        # cannot hold (Django would raise ValidationError, i.e. a 500)
+        try:
+            position = [self._fields[name].to_python(value) for name, value in zip(self._names, position)]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if any(value is None for value in position):
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, position
+
+    # -- seeking ----------------------------------------------------------
+
+    def _after(self, ordering, position):
+        """``Q`` for rows strictly after ``position`` in ``ordering``."""
+        condition = None
+        # Built from the last column outwards: col_k beyond v_k, or equal and
+        # the rest of the tuple beyond
+        for field, value in reversed(list(zip(ordering, position))):
+            name = field.lstrip('-')
+            beyond = Q(**{f'{name}__lt' if field.startswith('-') else f'{name}__gt': value})
+            condition = beyond if condition is None else beyond | (Q(**{name: value}) & condition)
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self._names = [field.lstrip('-') for field in self.ordering]
+        self._fields = {name: queryset.model._meta.get_field(name) for name in self._names}
+        self._attnames = {name: field.attname for name, field in self._fields.items()}
+        cursor = self._decode(request)
+        reverse = bool(cursor and cursor[0])
+
+        # A "previous" cursor walks the reversed ordering from the page's first row
+        ordering = [field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering] \
+            if reverse else list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if cursor:
+            queryset = queryset.filter(self._after(ordering, cursor[1]))
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._encode(False, self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self._encode(True, self.page[0])
+
+
+class KeysetPaginationMixin:
+    """Let a generic list view switch to keyset pagination via ``?pagination=cursor``."""
+    cursor_ordering = ('-created_at', '-id')
+    pagination_mode_query_param = 'pagination'
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            mode = self.request.query_params.get(self.pagination_mode_query_param, '') if self.request else ''
+            if mode.lower() == 'cursor':
+                self._paginator = KeysetCursorPagination()
+            else:
+                self._paginator = OptionalCountPageNumberPagination()
+        return self._paginator
@@ -0,0 +1,166 @@
+"""In-process API benchmark harness.
+
+Scenarios are requests replayed through DRF's ``APIClient`` (no network, no
+server): each run records the number of SQL queries, wall-clock latency and
+Python peak memory (``tracemalloc``) of one request. Latency is measured on
+untraced runs; memory on one extra traced run, because tracing slows every
+allocation down.
+
+Results are compared with stored budgets::
+
+    {"class_detail": {"queries": 6, "p95_ms": 40, "peak_kb": 900}, ...}
+
+Query counts must not grow at all (they do not depend on the machine);
+latency and memory may exceed their budget by the given tolerance factor.
+"""
+import json
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from math import ceil
+from pathlib import Path
+from typing import Callable, Optional
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+DEFAULT_BUDGETS = Path(__file__).with_name('perf_budgets.json')
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    # Path, or ``callable(ctx) -> path``
+    path: object
+    user: str = 'teacher'
+    # ``callable(ctx, iteration) -> request data``; called outside the timing
+    data: Optional[Callable] = None
+    format: str = 'json'
+    expect: tuple = (200,)
+    # Writes that cannot be repeated forever (e.g. one check-in per student)
+    max_iterations: Optional[int] = None
+    # ``callable(response) -> error message or None``: catches a 200 that did nothing
+    check: Optional[Callable] = None
+
+
+@dataclass
+class Result:
+    name: str
+    iterations: int
+    queries: int
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+    peak_kb: float
+    statuses: dict = field(default_factory=dict)
+    # A few response samples with an unexpected status code
+    unexpected: list = field(default_factory=list)
+
+    @property
+    def ok(self):
+        return not self.unexpected
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(ceil(fraction * len(ordered)) - 1, 0)]
+
+
+def _request(client, scenario, ctx, iteration):
+    """Build the request up front and return a callable that only sends it."""
+    path = scenario.path(ctx) if callable(scenario.path) else scenario.path
+    call = getattr(client, scenario.method.lower())
+    if scenario.data is None:
+        return lambda: call(path)
+    data = scenario.data(ctx, iteration)
+    return lambda: call(path, data, format=scenario.format)
+
+
+def run_scenario(client, scenario, ctx, iterations=20, warmup=2):
+    """Run ``scenario`` and return a ``Result``."""
+    if scenario.max_iterations:
+        iterations = min(iterations, scenario.max_iterations - warmup - 1)
+    iteration = 0
+    for _ in range(warmup):
+        _request(client, scenario, ctx, iteration)()
+        iteration += 1
+
+    timings, queries, statuses, unexpected = [], 0, {}, []
+    for _ in range(iterations):
+        send = _request(client, scenario, ctx, iteration)
+        iteration += 1
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = send()
+            timings.append((time.perf_counter() - started) * 1000)
+        queries = max(queries, len(captured))
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        problem = None
+        if response.status_code not in scenario.expect:
+            problem = f'{response.status_code}: {str(getattr(response, "data", ""))[:200]}'
+        elif scenario.check:
+            problem = scenario.check(response)
+        if problem and len(unexpected) < 3:
+            unexpected.append(problem)
+
+    send = _request(client, scenario, ctx, iteration)
+    tracemalloc.start()
+    try:
+        send()
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Result(
+        name=scenario.name,
+        iterations=iterations,
+        queries=queries,
+        p50_ms=round(percentile(timings, 0.50), 2),
+        p95_ms=round(percentile(timings, 0.95), 2),
+        max_ms=round(max(timings), 2),
+        peak_kb=round(peak / 1024, 1),
+        statuses=statuses,
+        unexpected=unexpected,
+    )
+
+
+def load_budgets(path=DEFAULT_BUDGETS):
+    path = Path(path)
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def check_budget(result, budget, tolerance=1.5):
+    """Human-readable violations of ``budget`` (empty if within budget)."""
+    violations = []
+    if 'queries' in budget and result.queries > budget['queries']:
+        violations.append(f'queries {result.queries} > {budget["queries"]}')
+    if 'p95_ms' in budget and result.p95_ms > budget['p95_ms'] * tolerance:
+        violations.append(f'p95 {result.p95_ms}ms > {budget["p95_ms"]}ms x {tolerance}')
+    if 'peak_kb' in budget and result.peak_kb > budget['peak_kb'] * tolerance:
+        violations.append(f'peak {result.peak_kb}KB > {budget["peak_kb"]}KB x {tolerance}')
+    return violations
+
+
+def budgets_from_results(results, headroom=2.0):
+    """Budgets that pass with today's numbers; timing gets ``headroom`` for slower machines."""
+    return {
+        result.name: {
+            'queries': result.queries,
+            'p95_ms': round(result.p95_ms * headroom, 1),
+            'peak_kb': round(result.peak_kb * 1.25, 1),
+        }
+        for result in results
+    }
+
+
+def save_budgets(budgets, path=DEFAULT_BUDGETS):
+    Path(path).write_text(json.dumps(budgets, indent=2, sort_keys=True) + '\n', encoding='utf-8')
+
+
+def results_as_json(results):
+    return [dict(asdict(result), ok=result.ok) for result in results]
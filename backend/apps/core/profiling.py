@@ -0,0 +1,327 @@
+"""Per-view request profiling.
+
+``PerformanceMiddleware`` samples a fraction of requests (``PERF_SAMPLE_RATE``)
+and, for each sampled one, records through a database execute wrapper the
+number of queries and the time spent in them, the time spent rendering the
+response (DRF serializes to JSON in ``render()``) and the total latency.
+Numbers are aggregated per view (``"GET classes/<int:class_id>/detail/"``)
+into counters and a fixed-bucket latency histogram, so memory stays constant
+however many requests are served; a ring buffer keeps the last
+``PERF_RING_SIZE`` N+1 suspects.
+
+A request is an N+1 suspect when one SQL statement (same text, parameters
+aside) runs ``PERF_NPLUSONE_THRESHOLD`` times or more.
+
+Each worker periodically writes its aggregates to ``PERF_STATS_DIR`` so the
+metrics endpoint and ``manage.py perf_report`` can merge all processes. A
+snapshot whose process is gone, or that has not been rewritten for
+``PERF_SNAPSHOT_TTL`` seconds, is deleted instead of merged.
+"""
+import atexit
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+ENABLED = getattr(settings, 'PERF_PROFILING', False)
+SAMPLE_RATE = getattr(settings, 'PERF_SAMPLE_RATE', 0.1)
+NPLUSONE_THRESHOLD = getattr(settings, 'PERF_NPLUSONE_THRESHOLD', 5)
+RING_SIZE = getattr(settings, 'PERF_RING_SIZE', 200)
+FLUSH_INTERVAL = getattr(settings, 'PERF_FLUSH_INTERVAL', 30)
+SNAPSHOT_TTL = getattr(settings, 'PERF_SNAPSHOT_TTL', 60 * 60)
+STATS_DIR = Path(getattr(settings, 'PERF_STATS_DIR', Path(settings.BASE_DIR) / 'logs' / 'perf'))
+SERVER_TIMING = getattr(settings, 'PERF_SERVER_TIMING', settings.DEBUG)
+
+# Latency histogram upper bounds in seconds (Prometheus ``le`` labels)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+
+
+def sql_template(sql):
+    """Collapse ``IN (%s, %s, ...)`` so batches of different sizes compare equal."""
+    return _IN_LIST.sub('IN (...)', sql)
+
+
+class QueryRecorder:
+    """``connection.execute_wrapper`` that counts and times queries."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+            self.statements[sql] += 1
+
+    def repeated(self, threshold=NPLUSONE_THRESHOLD):
+        """``[(template, times)]`` of statements run at least ``threshold`` times."""
+        return [(sql_template(sql), times) for sql, times in self.statements.most_common(3) if times >= threshold]
+
+
+def _empty_stats():
+    return {
+        'requests': 0, 'errors': 0, 'queries': 0, 'queries_max': 0,
+        'db_seconds': 0.0, 'render_seconds': 0.0, 'seconds': 0.0, 'seconds_max': 0.0,
+        'nplusone': 0, 'buckets': [0] * (len(BUCKETS) + 1),
+    }
+
+
+def merge_stats(target, source):
+    for key, value in source.items():
+        if key == 'buckets':
+            target[key] = [a + b for a, b in zip(target[key], value)]
+        elif key.endswith('_max'):
+            target[key] = max(target[key], value)
+        else:
+            target[key] += value
+    return target
+
+
+def quantile(stats, fraction):
+    """Upper bound (seconds) of the histogram bucket holding the ``fraction`` quantile."""
+    rank = fraction * stats['requests']
+    seen = 0
+    for bound, count in zip(BUCKETS + (float('inf'),), stats['buckets']):
+        seen += count
+        if seen >= rank and count:
+            return bound
+    return 0.0
+
+
+class Registry:
+    """Aggregates of this process, plus snapshots written by the other workers."""
+
+    def __init__(self):
+        self.views = {}
+        self.suspects = deque(maxlen=RING_SIZE)
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self.started_at = time.time()
+
+    def record(self, view, status, total, recorder, render_seconds):
+        repeated = recorder.repeated()
+        with self._lock:
+            stats = self.views.get(view)
+            if stats is None:
+                stats = self.views[view] = _empty_stats()
+            stats['requests'] += 1
+            stats['errors'] += status >= 500
+            stats['queries'] += recorder.count
+            stats['queries_max'] = max(stats['queries_max'], recorder.count)
+            stats['db_seconds'] += recorder.seconds
+            stats['render_seconds'] += render_seconds
+            stats['seconds'] += total
+            stats['seconds_max'] = max(stats['seconds_max'], total)
+            stats['buckets'][next((i for i, bound in enumerate(BUCKETS) if total <= bound), len(BUCKETS))] += 1
+            if repeated:
+                stats['nplusone'] += 1
+                self.suspects.append({
+                    'view': view,
+                    'at': time.time(),
+                    'queries': recorder.count,
+                    'ms': round(total * 1000, 1),
+                    'repeated': [{'sql': sql[:300], 'times': times} for sql, times in repeated],
+                })
+        if repeated:
+            logger.warning('Possible N+1 in %s: %d x %s', view, repeated[0][1], repeated[0][0][:200])
+        if time.monotonic() - self._last_flush > FLUSH_INTERVAL:
+            self.flush()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'pid': os.getpid(),
+                'started_at': self.started_at,
+                'written_at': time.time(),
+                'views': {view: dict(stats, buckets=list(stats['buckets'])) for view, stats in self.views.items()},
+                'suspects': list(self.suspects),
+            }
+
+    def flush(self):
+        """Write this worker's aggregates for the other processes (atomic replace)."""
+        self._last_flush = time.monotonic()
+        try:
+            STATS_DIR.mkdir(parents=True, exist_ok=True)
+            path = STATS_DIR / f'{os.getpid()}.json'
+            temporary = path.with_suffix('.tmp')
+            temporary.write_text(json.dumps(self.snapshot()), encoding='utf-8')
+            os.replace(temporary, path)
+        except OSError as e:
+            logger.warning('Could not write perf stats: %s', e)
+
+    def reset(self):
+        with self._lock:
+            self.views.clear()
+            self.suspects.clear()
+
+
+registry = Registry()
+atexit.register(lambda: registry.views and registry.flush())
+
+
+def _pid_alive(pid):
+    if os.name == 'nt':
+        # os.kill() terminates the process on Windows; rely on the TTL there
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def load_snapshots(include_live=True):
+    """Snapshots of the live workers; this process's live data replaces its own file.
+
+    Files of dead workers and files older than ``SNAPSHOT_TTL`` are removed,
+    so their counters are not added forever (or taken over by a reused pid).
+    """
+    snapshots = []
+    if STATS_DIR.exists():
+        for path in STATS_DIR.glob('*.json'):
+            if include_live and path.stem == str(os.getpid()):
+                continue
+            try:
+                snapshot = json.loads(path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                continue
+            pid = snapshot.get('pid')
+            if not pid or time.time() - snapshot.get('written_at', 0) > SNAPSHOT_TTL or not _pid_alive(pid):
+                path.unlink(missing_ok=True)
+                continue
+            snapshots.append(snapshot)
+    if include_live:
+        snapshots.append(registry.snapshot())
+    return snapshots
+
+
+def merged_views(snapshots):
+    views = {}
+    for snapshot in snapshots:
+        for view, stats in snapshot['views'].items():
+            merge_stats(views.setdefault(view, _empty_stats()), stats)
+    return views
+
+
+def clear_snapshots():
+    registry.reset()
+    if STATS_DIR.exists():
+        for path in STATS_DIR.glob('*.json'):
+            path.unlink(missing_ok=True)
+
+
+# -- Prometheus text format ------------------------------------------------
+
+def _labels(view):
+    method, _, route = view.partition(' ')
+    route = route.replace('\\', '\\\\').replace('"', '\\"')
+    return f'method="{method}",view="{route}"'
+
+
+def prometheus_text(views):
+    lines = []
+
+    def family(name, kind, help_text, samples):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        lines.extend(samples)
+
+    ordered = sorted(views.items())
+    family('django_view_requests_total', 'counter', 'Sampled requests per view.',
+           [f'django_view_requests_total{{{_labels(v)}}} {s["requests"]}' for v, s in ordered])
+    family('django_view_errors_total', 'counter', 'Sampled responses with status >= 500.',
+           [f'django_view_errors_total{{{_labels(v)}}} {s["errors"]}' for v, s in ordered])
+    family('django_view_db_queries_total', 'counter', 'SQL queries issued by sampled requests.',
+           [f'django_view_db_queries_total{{{_labels(v)}}} {s["queries"]}' for v, s in ordered])
+    family('django_view_db_queries_max', 'gauge', 'Most SQL queries issued by one request.',
+           [f'django_view_db_queries_max{{{_labels(v)}}} {s["queries_max"]}' for v, s in ordered])
+    family('django_view_db_seconds_total', 'counter', 'Time spent executing SQL.',
+           [f'django_view_db_seconds_total{{{_labels(v)}}} {s["db_seconds"]:.6f}' for v, s in ordered])
+    family('django_view_render_seconds_total', 'counter', 'Time spent rendering (serializing) responses.',
+           [f'django_view_render_seconds_total{{{_labels(v)}}} {s["render_seconds"]:.6f}' for v, s in ordered])
+    family('django_view_nplusone_total', 'counter', 'Requests repeating one SQL statement (N+1 suspects).',
+           [f'django_view_nplusone_total{{{_labels(v)}}} {s["nplusone"]}' for v, s in ordered])
+
+    samples = []
+    for view, stats in ordered:
+        labels = _labels(view)
+        cumulative = 0
+        for bound, count in zip(BUCKETS + (float('inf'),), stats['buckets']):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            samples.append(f'django_view_latency_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+        samples.append(f'django_view_latency_seconds_sum{{{labels}}} {stats["seconds"]:.6f}')
+        samples.append(f'django_view_latency_seconds_count{{{labels}}} {stats["requests"]}')
+    family('django_view_latency_seconds', 'histogram', 'Total request latency.', samples)
+    return '\n'.join(lines) + '\n'
+
+
+# -- middleware ------------------------------------------------------------
+
+class PerformanceMiddleware:
+    """Sampled per-view query/latency instrumentation (see module docstring)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not ENABLED or random.random() >= SAMPLE_RATE:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        request._perf_render = 0.0
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return response
+        view = f'{request.method} {match.route or match.view_name}'
+        registry.record(view, response.status_code, total, recorder, request._perf_render)
+
+        if SERVER_TIMING:
+            response['Server-Timing'] = (
+                f'db;dur={recorder.seconds * 1000:.1f};desc="{recorder.count} queries", '
+                f'render;dur={request._perf_render * 1000:.1f}, total;dur={total * 1000:.1f}'
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this hook returns
+        if hasattr(request, '_perf_render'):
+            render = response.render
+
+            def timed_render():
+                started = time.perf_counter()
+                try:
+                    return render()
+                finally:
+                    request._perf_render += time.perf_counter() - started
+
+            response.render = timed_render
+        return response
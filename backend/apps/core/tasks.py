@@ -0,0 +1,12 @@
+from celery import shared_task
+
+from .mailer import SendInterrupted, send_now
+
+
+@shared_task(bind=True, name='apps.core.tasks.send_email_batch', ignore_result=True, max_retries=3)
+def send_email_batch(self, payloads):
+    try:
+        return send_now(payloads)
+    except SendInterrupted as exc:
+        # Retry only what was not delivered: the rest already reached its recipients
+        raise self.retry(args=[exc.unsent], exc=exc, countdown=min(2 ** self.request.retries, 600))
@@ -0,0 +1,172 @@
+import json
+from base64 import urlsafe_b64encode
+from datetime import date, time
+from unittest import mock
+
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import User
+from apps.attendance.models import AttendanceSession
+from apps.classes.models import Class
+from apps.core import mailer
+
+
+class CountingBackend(locmem.EmailBackend):
+    """locmem backend that counts how many connections were opened."""
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+
+class FailingBackend(locmem.EmailBackend):
+    """locmem backend whose connection drops after ``limit`` messages."""
+    limit = 0
+
+    def send_messages(self, messages):
+        if len(mail.outbox) + len(messages) > FailingBackend.limit:
+            raise ConnectionResetError('connection dropped')
+        return super().send_messages(messages)
+
+
+def payload(n):
+    return {
+        'to': f'student{n}@example.com',
+        'subject': f'Điểm {n}',
+        'template': 'grades_published',
+        'context': {'first_name': f'SV{n}', 'class_name': 'Lớp A', 'grades': []},
+    }
+
+
+@override_settings(EMAIL_BACKEND='apps.core.tests.CountingBackend')
+class SendNowTests(SimpleTestCase):
+
+    def setUp(self):
+        CountingBackend.opened = 0
+
+    def test_renders_text_and_html(self):
+        self.assertEqual(mailer.send_now([payload(1)]), 1)
+        message = mail.outbox[0]
+        self.assertEqual(message.to, ['student1@example.com'])
+        self.assertIn('Xin chào SV1', message.body)
+        self.assertEqual(message.alternatives[0][1], 'text/html')
+
+    def test_batches_share_one_connection(self):
+        with mock.patch.object(mailer, 'MAIL_BATCH_SIZE', 10):
+            self.assertEqual(mailer.send_now([payload(n) for n in range(25)]), 25)
+        self.assertEqual(len(mail.outbox), 25)
+        self.assertEqual(CountingBackend.opened, 1)
+
+    def test_unknown_template_is_skipped(self):
+        broken = dict(payload(2), template='does_not_exist')
+        self.assertEqual(mailer.send_now([broken, payload(3)]), 1)
+        self.assertEqual([message.to for message in mail.outbox], [['student3@example.com']])
+
+    @override_settings(EMAIL_BACKEND='apps.core.tests.FailingBackend')
+    def test_interrupted_send_reports_unsent(self):
+        FailingBackend.limit = 3
+        payloads = [payload(n) for n in range(5)]
+        with self.assertRaises(mailer.SendInterrupted) as raised:
+            mailer.send_now(payloads)
+        self.assertEqual(raised.exception.unsent, payloads[3:])
+        self.assertEqual(raised.exception.sent, 3)
+        # Retrying the remainder mails nobody twice
+        FailingBackend.limit = 5
+        self.assertEqual(mailer.send_now(raised.exception.unsent), 2)
+        self.assertEqual([message.to[0] for message in mail.outbox], [f'student{n}@example.com' for n in range(5)])
+
+
+class EnqueueTests(SimpleTestCase):
+
+    def test_sync_sends_before_returning(self):
+        with mock.patch.object(mailer, 'MAIL_QUEUE', 'sync'):
+            self.assertEqual(mailer.queue_email('a@example.com', 'Hi', 'grades_published'), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_thread_queue_is_drained(self):
+        with mock.patch.object(mailer, 'MAIL_QUEUE', 'thread'):
+            mailer.queue_bulk([(f'{n}@example.com', {'first_name': n}) for n in range(5)], 'Hi', 'grades_published')
+        mailer.outbox.join()
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [f'{n}@example.com' for n in range(5)])
+
+    def test_celery_gets_batches(self):
+        task = mock.Mock()
+        with mock.patch.object(mailer, 'MAIL_QUEUE', 'celery'), \
+                mock.patch.object(mailer, 'MAIL_BATCH_SIZE', 2), \
+                mock.patch.object(mailer, '_celery_task', return_value=task):
+            self.assertEqual(mailer.enqueue([payload(n) for n in range(5)]), 5)
+        self.assertEqual([len(call.args[0]) for call in task.delay.call_args_list], [2, 2, 1])
+        self.assertEqual(mail.outbox, [])
+
+    def test_celery_missing_falls_back_to_thread(self):
+        with mock.patch.object(mailer, 'MAIL_QUEUE', 'celery'), \
+                mock.patch.object(mailer, '_celery_task', return_value=None):
+            mailer.enqueue([payload(1)])
+        mailer.outbox.join()
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_broker_failure_keeps_unsent_batches(self):
+        task = mock.Mock()
+        task.delay.side_effect = [None, ConnectionError('broker down')]
+        with mock.patch.object(mailer, 'MAIL_QUEUE', 'celery'), \
+                mock.patch.object(mailer, 'MAIL_BATCH_SIZE', 2), \
+                mock.patch.object(mailer, '_celery_task', return_value=task):
+            mailer.enqueue([payload(n) for n in range(4)])
+        mailer.outbox.join()
+        # The first batch reached the broker; the second goes through the thread
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['student2@example.com', 'student3@example.com'])
+
+
+class KeysetCursorTests(APITestCase):
+    """Cursor pages seek on the full ordering tuple and reject malformed cursors."""
+    url = '/api/attendance/sessions/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            'teacher@example.com', 'Teacher@123', role='teacher', first_name='T', last_name='E',
+        )
+        class_obj = Class.objects.create(class_id='CS101', class_name='Lập trình', teacher=cls.user)
+        # Several sessions share a date and a start time
+        AttendanceSession.objects.bulk_create([
+            AttendanceSession(
+                class_obj=class_obj, session_name=f'Buổi {n}', session_date=date(2025, 9, 1 + n // 4),
+                start_time=time(7 + n % 2), end_time=time(11), created_by=cls.user,
+            )
+            for n in range(10)
+        ])
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def cursor(self, position, reverse=0):
+        payload = json.dumps({'r': reverse, 'p': position}).encode()
+        return urlsafe_b64encode(payload).decode()
+
+    def test_pages_cover_every_row_once(self):
+        seen, url = [], f'{self.url}?pagination=cursor&page_size=3'
+        while url:
+            data = self.client.get(url).data
+            seen.extend(row['id'] for row in data['results'])
+            url = data['next']
+        expected = list(AttendanceSession.objects.order_by('-session_date', '-start_time', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_malformed_cursor_is_not_found(self):
+        for position in (
+            ['not-a-date', '08:00:00', 1],
+            ['2025-09-01', '25:99', 1],
+            ['2025-09-01', '08:00:00', 'x'],
+            ['2025-09-01', '08:00:00', [1]],
+            ['2025-09-01', '08:00:00', None],
+            ['2025-09-01', 1],
+        ):
+            with self.subTest(position=position):
+                response = self.client.get(self.url, {'pagination': 'cursor', 'cursor': self.cursor(position)})
+                self.assertEqual(response.status_code, 404)
+        response = self.client.get(self.url, {'pagination': 'cursor', 'cursor': 'bm90LWpzb24'})
+        self.assertEqual(response.status_code, 404)
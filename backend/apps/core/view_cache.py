@@ -0,0 +1,137 @@
+"""Response caching for read-heavy DRF views with generation-based invalidation.
+
+Cached responses are keyed by view, caller (role, or user id for views whose
+result or permission check depends on the user), URL kwargs, query params and
+the current *generation* of every scope the view depends on::
+
+    @api_view(['GET'])
+    @permission_classes([permissions.IsAuthenticated])
+    @cached_view(scopes=lambda request, class_id: [class_scope(class_id)], vary_on_user=True)
+    def class_grade_summary(request, class_id):
+        ...
+
+A scope is a string such as ``'grades'`` (anything about grades changed) or
+``'class:42'`` (something in class 42 changed). Writers bump generations
+(``bump`` / ``bump_class``, wired to model signals in each app); old entries
+are never deleted, they just stop being addressed and expire. Generations are
+read from the shared cache on every request (one ``get_many``), so a bump is
+visible to all workers immediately; responses themselves go through the
+two-tier cache.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+from .cache import TwoTierCache
+
+
+ENABLED = getattr(settings, 'VIEW_CACHE_ENABLED', True)
+DEFAULT_TIMEOUT = getattr(settings, 'VIEW_CACHE_TIMEOUT', 300)
+
+responses = TwoTierCache(
+    local_ttl=getattr(settings, 'VIEW_CACHE_LOCAL_TTL', 5),
+    local_maxsize=getattr(settings, 'VIEW_CACHE_LOCAL_MAXSIZE', 2048),
+)
+
+
+def class_scope(class_id):
+    return f'class:{class_id}'
+
+
+def _generation_key(scope):
+    return f'viewcache:gen:{scope}'
+
+
+def generations(scopes):
+    keys = [_generation_key(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    return [found.get(key, 0) for key in keys]
+
+
+def _bump_now(scopes):
+    for scope in scopes:
+        key = _generation_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Missing (never bumped or evicted): any value differing from 0 works
+            if not cache.add(key, 1, None):
+                cache.incr(key)
+
+
+def bump(*scopes):
+    """Invalidate cached responses depending on ``scopes`` once the transaction commits."""
+    scopes = [scope for scope in scopes if scope]
+    if scopes:
+        transaction.on_commit(lambda: _bump_now(scopes))
+
+
+def bump_class(class_id, *domains):
+    """Bump one class and the global ``domains`` (e.g. ``'grades'``) it belongs to."""
+    bump(class_scope(class_id) if class_id else None, *domains)
+
+
+def cache_key(request, view_name, kwargs, scopes, vary_on_user):
+    user = request.user
+    caller = f'user:{user.pk}' if vary_on_user else f'role:{getattr(user, "role", "anonymous")}'
+    params = sorted(request.query_params.lists())
+    raw = repr((view_name, caller, sorted(kwargs.items()), params, scopes, generations(scopes)))
+    return 'viewcache:' + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def cached_response(request, view_name, kwargs, compute, scopes, timeout=None, vary_on_user=False):
+    """Return a cached ``Response`` or call ``compute()`` and cache its 200 result."""
+    if not ENABLED or request.method != 'GET':
+        return compute()
+    key = cache_key(request, view_name, kwargs, scopes, vary_on_user)
+    data = responses.get(key)
+    if data is not None:
+        response = Response(data)
+        response['X-Cache'] = 'HIT'
+        return response
+    response = compute()
+    if response.status_code == 200 and isinstance(response, Response):
+        responses.set(key, response.data, DEFAULT_TIMEOUT if timeout is None else timeout)
+        response['X-Cache'] = 'MISS'
+    return response
+
+
+def cached_view(scopes, timeout=None, vary_on_user=False):
+    """Cache a function view; put it below ``@api_view``/``@permission_classes``.
+
+    ``scopes`` is a list of scope names or ``callable(request, **kwargs)``
+    returning one.
+    """
+    def decorator(view):
+        view_name = f'{view.__module__}.{view.__name__}'
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            view_scopes = scopes(request, **kwargs) if callable(scopes) else list(scopes)
+            return cached_response(
+                request, view_name, kwargs, lambda: view(request, *args, **kwargs),
+                view_scopes, timeout, vary_on_user,
+            )
+        return wrapper
+    return decorator
+
+
+class CachedViewMixin:
+    """``cached_view`` for class-based views: set ``cache_scopes`` (or override ``get_cache_scopes``)."""
+    cache_scopes = ()
+    cache_timeout = None
+    cache_vary_on_user = False
+
+    def get_cache_scopes(self):
+        return list(self.cache_scopes)
+
+    def get(self, request, *args, **kwargs):
+        view_name = f'{type(self).__module__}.{type(self).__name__}'
+        return cached_response(
+            request, view_name, kwargs, lambda: super(CachedViewMixin, self).get(request, *args, **kwargs),
+            self.get_cache_scopes(), self.cache_timeout, self.cache_vary_on_user,
+        )
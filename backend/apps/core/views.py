@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import APIException
+from rest_framework.settings import api_settings
+
+from .profiling import load_snapshots, merged_views, prometheus_text
+
+
+def _metrics_allowed(request):
+    """Scrapers send ``PERF_METRICS_TOKEN`` as a bearer token; admins may use their session or JWT."""
+    token = getattr(settings, 'PERF_METRICS_TOKEN', '')
+    header = request.headers.get('Authorization', '')
+    if token and constant_time_compare(header, f'Bearer {token}'):
+        return True
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.is_superuser or user.is_staff or user.role == 'admin'
+    for authentication in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        try:
+            result = authentication().authenticate(request)
+        except APIException:
+            return False
+        if result:
+            user = result[0]
+            return user.is_superuser or user.is_staff or user.role == 'admin'
+    return False
+
+
+@require_GET
+def metrics(request):
+    """Prometheus text exposition of per-view request stats (all workers)"""
+    if not _metrics_allowed(request):
+        return HttpResponse('Forbidden\n', status=403, content_type='text/plain')
+    body = prometheus_text(merged_views(load_snapshots()))
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
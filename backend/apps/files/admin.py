@@ -0,0 +1,16 @@
+from django.contrib import admin
+from .models import Blob, UploadSession
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'owner', 'purpose', 'filename', 'size', 'status', 'created_at', 'expires_at')
+    list_filter = ('purpose', 'status', 'created_at')
+    search_fields = ('filename', 'owner__email')
+
+
+@admin.register(Blob)
+class BlobAdmin(admin.ModelAdmin):
+    list_display = ('digest', 'extension', 'size', 'ref_count', 'created_at', 'updated_at')
+    list_filter = ('extension',)
+    search_fields = ('digest',)
+    readonly_fields = ('digest', 'extension', 'size', 'ref_count', 'created_at', 'updated_at')
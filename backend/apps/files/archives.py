@@ -0,0 +1,138 @@
+"""ZIP archives streamed while they are written.
+
+``zipfile`` can write to a sink that cannot seek: each entry is followed by a
+data descriptor instead of patching its header afterwards. ``ZipStream``
+gives ``zipfile`` such a sink and hands back whatever it has written after
+every block, so a response can send the archive as it is produced. Neither
+the archive nor a whole member file is ever held in memory or on disk; only
+the central directory (one small record per entry) is kept until the end.
+
+Usage::
+
+    def archive():
+        stream = ZipStream()
+        for ...:
+            yield from stream.add_file(f'{student_code}/{name}', field_file, uploaded_at)
+        yield from stream.add_bytes('manifest.csv', manifest)
+        yield from stream.close()
+
+    return zip_response(archive(), 'Bai_nop.zip')
+"""
+import csv
+import io
+import os
+import posixpath
+import zipfile
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.http import content_disposition_header
+
+
+BLOCK_SIZE = 64 * 1024
+
+# Already compressed: deflating them again costs CPU and saves nothing
+STORED_EXTENSIONS = {
+    'zip', 'rar', '7z', 'gz', 'bz2', 'xz',
+    'docx', 'xlsx', 'pptx', 'odt', 'ods', 'odp', 'pdf',
+    'jpg', 'jpeg', 'png', 'gif', 'webp', 'mp3', 'mp4', 'mov', 'avi',
+}
+
+
+class _Sink:
+    """Write-only file object collecting what ``zipfile`` writes until drained."""
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts.clear()
+        return data
+
+
+def _date_time(moment):
+    moment = timezone.localtime(moment) if moment else timezone.localtime()
+    # ZIP timestamps start in 1980
+    return max(moment.timetuple()[:6], (1980, 1, 1, 0, 0, 0))
+
+
+class ZipStream:
+
+    def __init__(self):
+        self._sink = _Sink()
+        self._zip = zipfile.ZipFile(self._sink, 'w')
+        self._names = set()
+
+    def unique_name(self, name):
+        """``name``, or ``name (2).ext``... when already used in this archive."""
+        candidate = name
+        root, ext = posixpath.splitext(name)
+        number = 2
+        while candidate in self._names:
+            candidate = f'{root} ({number}){ext}'
+            number += 1
+        self._names.add(candidate)
+        return candidate
+
+    def _entry(self, name, modified):
+        info = zipfile.ZipInfo(self.unique_name(name), date_time=_date_time(modified))
+        extension = os.path.splitext(name)[1].lower().lstrip('.')
+        info.compress_type = zipfile.ZIP_STORED if extension in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+        return info
+
+    def add_file(self, name, field_file, modified=None):
+        """Yield the archive bytes of one stored file; returns the name used, ``None`` if it is missing."""
+        try:
+            source = field_file.open('rb')
+        except (FileNotFoundError, ValueError):
+            return None
+        info = self._entry(name, modified)
+        try:
+            with self._zip.open(info, 'w', force_zip64=field_file.size >= zipfile.ZIP64_LIMIT) as entry:
+                while True:
+                    block = source.read(BLOCK_SIZE)
+                    if not block:
+                        break
+                    entry.write(block)
+                    data = self._sink.drain()
+                    if data:
+                        yield data
+        finally:
+            source.close()
+        yield self._sink.drain()
+        return info.filename
+
+    def add_bytes(self, name, data, modified=None):
+        info = self._entry(name, modified)
+        self._zip.writestr(info, data)
+        yield self._sink.drain()
+        return info.filename
+
+    def close(self):
+        """Yield the central directory that ends the archive."""
+        self._zip.close()
+        yield self._sink.drain()
+
+
+def csv_bytes(header, rows):
+    """UTF-8 CSV with a BOM, so Excel shows Vietnamese names correctly."""
+    output = io.StringIO()
+    output.write('\ufeff')
+    writer = csv.writer(output)
+    writer.writerow(header)
+    writer.writerows(rows)
+    return output.getvalue().encode('utf-8')
+
+
+def zip_response(chunks, filename):
+    response = StreamingHttpResponse((chunk for chunk in chunks if chunk), content_type='application/zip')
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    return response
@@ -0,0 +1,101 @@
+"""Reference counting and garbage collection of stored blobs.
+
+``Blob.ref_count`` is maintained by ``ContentAddressedStorage`` as files are
+saved and deleted, but rows can also disappear without touching their file
+(cascading deletes, ``QuerySet.delete()``), so the counts drift. The batch job
+recounts every reference from the file columns listed in ``REFERENCES`` and
+then deletes blobs that are unreferenced and have not been touched for the
+grace period, which protects uploads whose row is not committed yet.
+"""
+import os
+from collections import Counter
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Blob
+from .storage import blob_key, blob_storage
+
+
+# (model label, file field) of every column stored through ``blob_storage``
+REFERENCES = (
+    ('materials.ClassMaterial', 'file'),
+    ('submissions.Submission', 'file'),
+    ('assignments.Assignment', 'attachment'),
+    ('assignments.AssignmentSubmission', 'file'),
+)
+
+GC_GRACE = timedelta(hours=getattr(settings, 'BLOB_GC_GRACE_HOURS', 24))
+BATCH_SIZE = 1000
+
+
+def referenced_blobs():
+    """``Counter`` of ``(digest, extension)`` -> number of rows referring to it."""
+    counts = Counter()
+    for label, field in REFERENCES:
+        names = (
+            apps.get_model(label).objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+            .values_list(field, flat=True)
+        )
+        for name in names.iterator(chunk_size=BATCH_SIZE):
+            key = blob_key(name)
+            if key is not None:
+                counts[key] += 1
+    return counts
+
+
+def reconcile_ref_counts(counts=None):
+    """Set every ``ref_count`` to the actual number of references; returns how many changed."""
+    counts = referenced_blobs() if counts is None else counts
+    changed = []
+    for blob in Blob.objects.only('id', 'digest', 'extension', 'ref_count').iterator(chunk_size=BATCH_SIZE):
+        actual = counts.get((blob.digest, blob.extension), 0)
+        if blob.ref_count != actual:
+            blob.ref_count = actual
+            changed.append(blob)
+    Blob.objects.bulk_update(changed, ['ref_count'], batch_size=BATCH_SIZE)
+    return len(changed)
+
+
+def collect_garbage(grace=None, dry_run=False):
+    """Recount references, then delete unreferenced blobs older than ``grace``.
+
+    Returns ``{'reconciled', 'deleted', 'freed_bytes'}``.
+    """
+    grace = GC_GRACE if grace is None else grace
+    reconciled = 0 if dry_run else reconcile_ref_counts()
+    cutoff = timezone.now() - grace
+    storage = blob_storage()
+
+    deleted = freed = 0
+    if dry_run:
+        counts = referenced_blobs()
+        for blob in Blob.objects.filter(updated_at__lt=cutoff).iterator(chunk_size=BATCH_SIZE):
+            if not counts.get((blob.digest, blob.extension)):
+                deleted += 1
+                freed += blob.size
+        return {'reconciled': reconciled, 'deleted': deleted, 'freed_bytes': freed}
+
+    garbage = Blob.objects.filter(ref_count=0, updated_at__lt=cutoff)
+    for blob in garbage.iterator(chunk_size=BATCH_SIZE):
+        path = storage.path(blob.path)
+        # Set the file aside first: a save racing with us either sees it
+        # missing and writes it again, or takes a reference, which makes the
+        # DELETE below match nothing and the file is put back.
+        parked = f'{path}.gc'
+        try:
+            os.replace(path, parked)
+        except FileNotFoundError:
+            parked = None
+        removed, _ = Blob.objects.filter(pk=blob.pk, ref_count=0, updated_at__lt=cutoff).delete()
+        if parked is not None:
+            if removed:
+                os.remove(parked)
+            else:
+                os.replace(parked, path)
+        if removed:
+            deleted += 1
+            freed += blob.size
+    return {'reconciled': reconciled, 'deleted': deleted, 'freed_bytes': freed}
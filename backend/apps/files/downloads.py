@@ -0,0 +1,168 @@
+"""Protected file downloads.
+
+A download view checks permissions, then calls ``serve_file``. What happens
+next depends on ``MEDIA_SENDFILE``:
+
+* ``'nginx'``: an empty response with ``X-Accel-Redirect`` pointing at the
+  internal location ``MEDIA_SENDFILE_PREFIX`` (an alias of ``MEDIA_ROOT``);
+  nginx sends the bytes, Range requests included, and the Django worker is
+  free as soon as the headers are out.
+* ``'sendfile'``: the same with ``X-Sendfile`` and the absolute path
+  (Apache ``mod_xsendfile``, lighttpd).
+* ``''`` (default): Django streams the file itself with ``FileResponse``,
+  honouring single ``Range: bytes=`` requests (``206``/``416``) and
+  ``If-Range``.
+
+Every response carries ``ETag`` (the sha256 digest for content-addressed
+files) and ``Last-Modified``, and conditional requests are answered with
+``304`` without opening the file.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+from .storage import blob_key
+
+
+BLOCK_SIZE = 64 * 1024
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def sendfile_backend():
+    return getattr(settings, 'MEDIA_SENDFILE', '')
+
+
+def sendfile_prefix():
+    return getattr(settings, 'MEDIA_SENDFILE_PREFIX', '/protected-media/').rstrip('/')
+
+
+def file_etag(name, stat):
+    key = blob_key(name)
+    if key is not None:
+        return f'"{key[0]}"'
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def parse_range(header, size):
+    """``(first, last)`` byte positions of a single ``bytes=`` range.
+
+    ``None`` means the header is ignored and the whole file is sent (multiple
+    ranges are not supported); ``ValueError`` means it cannot be satisfied.
+    """
+    match = RANGE.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    first = int(first)
+    if last and int(last) < first:
+        return None
+    if first >= size:
+        raise ValueError(header)
+    return first, min(int(last), size - 1) if last else size - 1
+
+
+def _if_range_matches(request, etag, last_modified):
+    value = request.META.get('HTTP_IF_RANGE')
+    if not value:
+        return True
+    if value.startswith(('"', 'W/')):
+        return value == etag
+    return parse_http_date_safe(value) == last_modified
+
+
+class _RangeFile:
+    """``length`` bytes of ``file`` starting at ``first``.
+
+    It has no ``tell()``/``fileno()``, so ``FileResponse`` leaves
+    ``Content-Length`` to the caller and WSGI servers cannot ``sendfile`` past
+    the end of the range.
+    """
+
+    def __init__(self, file, first, length):
+        file.seek(first)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def _stream(request, path, size, etag, last_modified, content_type):
+    byte_range = None
+    if 'HTTP_RANGE' in request.META and _if_range_matches(request, etag, last_modified):
+        try:
+            byte_range = parse_range(request.META['HTTP_RANGE'], size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    file = open(path, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        first, last = byte_range
+        response = FileResponse(_RangeFile(file, first, last - first + 1), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {first}-{last}/{size}'
+        response['Content-Length'] = last - first + 1
+    response.block_size = BLOCK_SIZE
+    return response
+
+
+def serve_file(request, field_file, filename=None, as_attachment=True):
+    """Response delivering ``field_file``; call it only after checking permissions."""
+    if not field_file:
+        raise Http404('Không có file')
+    storage = field_file.storage
+    path = storage.path(field_file.name)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise Http404('Không tìm thấy file')
+
+    filename = filename or os.path.basename(field_file.name)
+    etag = file_etag(field_file.name, stat)
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        backend = sendfile_backend()
+        if backend == 'nginx':
+            relative = os.path.relpath(path, storage.location).replace(os.sep, '/')
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = quote(f'{sendfile_prefix()}/{relative}')
+        elif backend == 'sendfile':
+            response = HttpResponse(content_type=content_type)
+            response['X-Sendfile'] = path
+        else:
+            response = _stream(request, path, stat.st_size, etag, last_modified, content_type)
+        if response.status_code != 416:
+            response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Accept-Ranges'] = 'bytes'
+    # Behind a login: browsers may keep it, shared caches must not
+    response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,29 @@
+"""
+Django Management Command: GC Blobs
+Đếm lại số tham chiếu của các file lưu theo nội dung (blob) và xóa các blob không còn được dùng
+Chạy: python manage.py gc_blobs [--grace-hours 24] [--dry-run]
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.files.blobs import collect_garbage
+
+
+class Command(BaseCommand):
+    help = 'Recount blob references and delete blobs no file field refers to'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=float, default=None,
+                            help='Keep unreferenced blobs touched within this many hours (default: BLOB_GC_GRACE_HOURS)')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be deleted')
+
+    def handle(self, *args, **options):
+        grace = timedelta(hours=options['grace_hours']) if options['grace_hours'] is not None else None
+        result = collect_garbage(grace=grace, dry_run=options['dry_run'])
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(f"🔁 Reconciled {result['reconciled']} reference counts")
+        self.stdout.write(self.style.SUCCESS(
+            f"🗑️  {verb} {result['deleted']} blobs ({result['freed_bytes'] / (1024 * 1024):.1f} MB)"
+        ))
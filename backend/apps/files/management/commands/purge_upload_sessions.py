@@ -0,0 +1,17 @@
+"""
+Django Management Command: Purge Upload Sessions
+Xóa các phiên tải lên theo chunk đã hết hạn cùng các file tạm trên đĩa
+Chạy: python manage.py purge_upload_sessions
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.files.uploads import purge_expired
+
+
+class Command(BaseCommand):
+    help = 'Delete expired chunked upload sessions and their temporary files'
+
+    def handle(self, *args, **options):
+        count = purge_expired()
+        self.stdout.write(self.style.SUCCESS(f'🗑️  Deleted {count} expired upload sessions'))
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:53
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('purpose', models.CharField(choices=[('material', 'Tài liệu lớp học'), ('submission', 'Bài nộp'), ('assignment', 'Bài nộp bài tập')], max_length=20)),
+                ('target_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('filename', models.CharField(max_length=255)),
+                ('size', models.PositiveBigIntegerField()),
+                ('chunk_size', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('uploading', 'Đang tải lên'), ('complete', 'Đã ghép xong'), ('consumed', 'Đã sử dụng')], default='uploading', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('expires_at', models.DateTimeField()),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'upload_sessions',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['owner', 'status'], name='upload_sess_owner_i_ec255b_idx'), models.Index(fields=['expires_at'], name='upload_sess_expires_aebd1e_idx')],
+            },
+        ),
+    ]
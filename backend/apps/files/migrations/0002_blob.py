@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('files', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64)),
+                ('extension', models.CharField(blank=True, max_length=10)),
+                ('size', models.PositiveBigIntegerField()),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'blobs',
+                'indexes': [models.Index(fields=['ref_count', 'updated_at'], name='blobs_ref_cou_97be9d_idx')],
+                'unique_together': {('digest', 'extension')},
+            },
+        ),
+    ]
@@ -0,0 +1,88 @@
+import uuid
+
+from django.db import models
+
+from apps.accounts.models import User
+
+
+class UploadSession(models.Model):
+    """A chunked, resumable upload in progress (see ``apps.files.uploads``)."""
+
+    class Purpose(models.TextChoices):
+        MATERIAL = 'material', 'Tài liệu lớp học'
+        SUBMISSION = 'submission', 'Bài nộp'
+        ASSIGNMENT = 'assignment', 'Bài nộp bài tập'
+
+    class Status(models.TextChoices):
+        UPLOADING = 'uploading', 'Đang tải lên'
+        COMPLETE = 'complete', 'Đã ghép xong'
+        CONSUMED = 'consumed', 'Đã sử dụng'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    purpose = models.CharField(max_length=20, choices=Purpose.choices)
+    # Assignment id for Purpose.ASSIGNMENT (its own size/type limits apply)
+    target_id = models.PositiveIntegerField(blank=True, null=True)
+
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.UPLOADING)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'upload_sessions'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['owner', 'status']),
+            models.Index(fields=['expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.get_status_display()})"
+
+    @property
+    def chunk_count(self):
+        return max((self.size + self.chunk_size - 1) // self.chunk_size, 1)
+
+    def expected_chunk_size(self, index):
+        """Exact byte length of chunk ``index``: every chunk is full except the last."""
+        if index < self.chunk_count - 1:
+            return self.chunk_size
+        return self.size - self.chunk_size * (self.chunk_count - 1)
+
+
+class Blob(models.Model):
+    """One stored file body, shared by every file field with the same content (see ``apps.files.storage``).
+
+    ``ref_count`` is kept up to date as files are saved and deleted through
+    the storage and reconciled by ``apps.files.blobs.collect_garbage``, which
+    also removes blobs nothing refers to any more.
+    """
+    digest = models.CharField(max_length=64)  # sha256 hex
+    # Kept in the blob's own name so direct media URLs keep their content type
+    extension = models.CharField(max_length=10, blank=True)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'blobs'
+        unique_together = ['digest', 'extension']
+        indexes = [
+            models.Index(fields=['ref_count', 'updated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.digest[:12]}.{self.extension} ({self.ref_count})"
+
+    @property
+    def path(self):
+        """Name of the blob file relative to ``MEDIA_ROOT``."""
+        suffix = f'.{self.extension}' if self.extension else ''
+        return f'blobs/{self.digest[:2]}/{self.digest[2:4]}/{self.digest}{suffix}'
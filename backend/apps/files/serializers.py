@@ -0,0 +1,28 @@
+from rest_framework import serializers
+
+from .models import UploadSession
+from .uploads import received_chunks
+
+
+class UploadSessionCreateSerializer(serializers.Serializer):
+    purpose = serializers.ChoiceField(choices=UploadSession.Purpose.choices)
+    filename = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(min_value=1)
+    chunk_size = serializers.IntegerField(required=False, min_value=1)
+    target_id = serializers.IntegerField(required=False, min_value=1)
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    chunk_count = serializers.IntegerField(read_only=True)
+    received_chunks = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = [
+            'id', 'purpose', 'target_id', 'filename', 'size', 'chunk_size', 'chunk_count',
+            'received_chunks', 'status', 'created_at', 'expires_at',
+        ]
+        read_only_fields = fields
+
+    def get_received_chunks(self, obj):
+        return received_chunks(obj)
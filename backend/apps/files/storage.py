@@ -0,0 +1,144 @@
+"""Content-addressed file storage.
+
+Every file body is stored once, under its sha256 digest, in
+``MEDIA_ROOT/blobs/ab/cd/<digest>.<ext>``. The name saved in the model keeps
+the usual ``upload_to`` directory and the original file name around the
+digest::
+
+    class_materials/<digest>/Slide_Chuong1.pptx
+
+so ``file.name`` and the ``file_name`` properties read as before, while
+``path()``, ``open()``, ``url()`` and ``size()`` resolve to the shared blob.
+
+Saving hashes the content in one streaming pass first; when a blob with that
+digest is already on disk nothing is written, otherwise the content is moved
+(``temporary_file_path()``) or streamed into place. Each save adds a
+reference to the ``Blob`` row and each ``delete()`` removes one; files are
+never unlinked here, ``apps.files.blobs.collect_garbage`` does that later.
+
+Names that do not contain a digest (files stored before this backend) are
+handled exactly like ``FileSystemStorage`` does.
+"""
+import hashlib
+import os
+import posixpath
+import re
+import uuid
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Blob
+
+
+DIGEST_NAME = re.compile(r'(?:^|/)(?P<digest>[0-9a-f]{64})/(?P<filename>[^/]+)$')
+EXTENSION = re.compile(r'^[a-z0-9]{1,10}$')
+
+
+def blob_key(name):
+    """``(digest, extension)`` of a content-addressed name, ``None`` for any other name."""
+    match = DIGEST_NAME.search(name or '')
+    if match is None:
+        return None
+    return match['digest'], blob_extension(match['filename'])
+
+
+def blob_extension(filename):
+    extension = os.path.splitext(filename)[1].lower().lstrip('.')
+    return extension if EXTENSION.match(extension) else ''
+
+
+def content_digest(content):
+    """``(sha256 hex, size)`` of a ``File``, read chunk by chunk."""
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in content.chunks():
+        digest.update(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
+
+
+class ContentAddressedStorage(FileSystemStorage):
+
+    def blob_path(self, name):
+        """Name relative to the storage root that ``name`` is actually stored under."""
+        key = blob_key(name)
+        if key is None:
+            return name
+        return Blob(digest=key[0], extension=key[1]).path
+
+    def path(self, name):
+        return super().path(self.blob_path(name))
+
+    def url(self, name):
+        return super().url(self.blob_path(name))
+
+    def get_available_name(self, name, max_length=None):
+        # Same name means same content here, so names are never suffixed; the
+        # file name is only shortened to leave room for the digest directory.
+        if max_length is not None:
+            directory, filename = posixpath.split(name)
+            overflow = len(posixpath.join(directory, '0' * 64, filename)) - max_length
+            if overflow > 0:
+                root, ext = os.path.splitext(filename)
+                name = posixpath.join(directory, root[:max(len(root) - overflow, 1)] + ext)
+        return name
+
+    def _save(self, name, content):
+        digest, size = content_digest(content)
+        directory, filename = posixpath.split(name)
+        blob = Blob(digest=digest, extension=blob_extension(filename), size=size, ref_count=1)
+        # Take the reference before looking at the disk: a blob with references
+        # is never collected, so a file seen here stays there
+        if not self._add_reference(blob):
+            try:
+                with transaction.atomic():
+                    blob.save()
+            except IntegrityError:
+                self._add_reference(blob)
+        full_path = super().path(blob.path)
+        if not os.path.exists(full_path):
+            self._write_blob(full_path, content)
+        return posixpath.join(directory, digest, filename)
+
+    def _add_reference(self, blob):
+        return Blob.objects.filter(digest=blob.digest, extension=blob.extension).update(
+            ref_count=F('ref_count') + 1, updated_at=timezone.now(),
+        )
+
+    def _write_blob(self, full_path, content):
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        if hasattr(content, 'temporary_file_path'):
+            # Concurrent writers of one digest write identical bytes, so overwriting is harmless
+            file_move_safe(content.temporary_file_path(), full_path, allow_overwrite=True)
+        else:
+            temporary = f'{full_path}.{uuid.uuid4().hex}.tmp'
+            try:
+                with open(temporary, 'wb') as out:
+                    for chunk in content.chunks():
+                        out.write(chunk)
+                os.replace(temporary, full_path)
+            finally:
+                if os.path.exists(temporary):
+                    os.remove(temporary)
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
+
+    def delete(self, name):
+        key = blob_key(name)
+        if key is None:
+            return super().delete(name)
+        Blob.objects.filter(digest=key[0], extension=key[1], ref_count__gt=0).update(
+            ref_count=F('ref_count') - 1, updated_at=timezone.now(),
+        )
+
+
+blob_storage_instance = ContentAddressedStorage()
+
+
+def blob_storage():
+    """Storage of the deduplicated file fields (a callable keeps it out of migrations)."""
+    return blob_storage_instance
@@ -0,0 +1,14 @@
+from celery import shared_task
+
+from .blobs import collect_garbage
+from .uploads import purge_expired
+
+
+@shared_task(name='apps.files.tasks.purge_upload_sessions', ignore_result=True)
+def purge_upload_sessions():
+    return purge_expired()
+
+
+@shared_task(name='apps.files.tasks.gc_blobs', ignore_result=True)
+def gc_blobs():
+    return collect_garbage()
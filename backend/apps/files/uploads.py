@@ -0,0 +1,319 @@
+"""Chunked, resumable uploads.
+
+A client uploads a file in three steps:
+
+1. ``init``: declares purpose, file name and total size. Extension and size
+   are checked against the limits of the purpose before any byte is sent.
+2. ``append``: sends chunk ``i`` (exactly ``chunk_size`` bytes, the last one
+   shorter) as a raw request body. The body is streamed to
+   ``UPLOAD_SESSION_DIR/<session>/<i>.part`` in small blocks and rejected as
+   soon as it outgrows the expected length; the first chunk's leading bytes
+   must match the file type. Chunks can be sent in any order and re-sent,
+   so an interrupted upload resumes with the chunks that are missing.
+3. ``finalize``: concatenates the parts into one file on disk with
+   ``os.copy_file_range`` (or ``os.sendfile``), so the data is copied by the
+   kernel without passing through Python.
+
+The assembled file is then handed to a model ``FileField`` through
+``open_upload``; it exposes ``temporary_file_path()``, so the storage moves
+it into ``MEDIA_ROOT`` instead of copying it again.
+"""
+import os
+import shutil
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.utils import timezone
+
+from .models import UploadSession
+
+
+UPLOAD_DIR = Path(getattr(settings, 'UPLOAD_SESSION_DIR', Path(settings.BASE_DIR) / 'tmp' / 'uploads'))
+DEFAULT_CHUNK_SIZE = getattr(settings, 'UPLOAD_CHUNK_SIZE', 1024 * 1024)
+MAX_CHUNK_SIZE = getattr(settings, 'UPLOAD_MAX_CHUNK_SIZE', 8 * 1024 * 1024)
+SESSION_TTL = timedelta(hours=getattr(settings, 'UPLOAD_SESSION_TTL_HOURS', 24))
+
+# Bytes read from the request per write
+BLOCK_SIZE = 64 * 1024
+
+_OLE = (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1',)
+_ZIP = (b'PK\x03\x04', b'PK\x05\x06')
+# Leading bytes each extension must start with; unlisted extensions are not sniffed
+SIGNATURES = {
+    'pdf': (b'%PDF',),
+    'doc': _OLE, 'xls': _OLE, 'ppt': _OLE,
+    'docx': _ZIP, 'xlsx': _ZIP, 'pptx': _ZIP, 'zip': _ZIP,
+}
+
+
+class UploadError(ValueError):
+    """Invalid upload request; the message is shown to the user."""
+
+
+def extension(filename):
+    return os.path.splitext(filename)[1].lower().lstrip('.')
+
+
+def upload_limits(purpose, target_id=None):
+    """``(allowed extensions or None for any, max size in bytes)`` for a purpose."""
+    if purpose == UploadSession.Purpose.MATERIAL:
+        from apps.materials.models import ALLOWED_EXTENSIONS, MAX_FILE_SIZE
+        return ALLOWED_EXTENSIONS, MAX_FILE_SIZE
+    if purpose == UploadSession.Purpose.SUBMISSION:
+        from apps.submissions.models import SUBMISSION_ALLOWED_EXTENSIONS, SUBMISSION_MAX_FILE_SIZE
+        return SUBMISSION_ALLOWED_EXTENSIONS, SUBMISSION_MAX_FILE_SIZE
+    if purpose == UploadSession.Purpose.ASSIGNMENT:
+        from apps.assignments.models import Assignment
+        try:
+            assignment = Assignment.objects.get(id=target_id)
+        except (Assignment.DoesNotExist, TypeError, ValueError):
+            raise UploadError('Không tìm thấy bài tập')
+        allowed = {ext.strip().lower() for ext in (assignment.allowed_file_types or '').split(',') if ext.strip()}
+        max_size = assignment.max_file_size_mb * 1024 * 1024 if assignment.max_file_size_mb else None
+        return allowed or None, max_size
+    raise UploadError('purpose không hợp lệ')
+
+
+def session_dir(session):
+    return UPLOAD_DIR / str(session.pk)
+
+
+def _part_path(session, index):
+    return session_dir(session) / f'{index:06d}.part'
+
+
+def _assembled_path(session):
+    return session_dir(session) / 'assembled'
+
+
+# -- steps -----------------------------------------------------------------
+
+def init_upload(owner, purpose, filename, size, chunk_size=None, target_id=None):
+    """Validate the declared file and create its ``UploadSession``."""
+    filename = os.path.basename(filename or '').strip()
+    if not filename:
+        raise UploadError('Thiếu tên file')
+    if size <= 0:
+        raise UploadError('Kích thước file không hợp lệ')
+    allowed, max_size = upload_limits(purpose, target_id)
+    if allowed and extension(filename) not in allowed:
+        raise UploadError(f'Định dạng không hợp lệ. Cho phép: {", ".join(sorted(allowed))}.')
+    if max_size and size > max_size:
+        raise UploadError(f'File quá lớn (>{max_size // (1024 * 1024)}MB).')
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+    if not 64 * 1024 <= chunk_size <= MAX_CHUNK_SIZE:
+        raise UploadError(f'chunk_size phải từ 64KB đến {MAX_CHUNK_SIZE // 1024}KB')
+
+    session = UploadSession.objects.create(
+        owner=owner, purpose=purpose, target_id=target_id, filename=filename, size=size,
+        chunk_size=chunk_size, expires_at=timezone.now() + SESSION_TTL,
+    )
+    session_dir(session).mkdir(parents=True, exist_ok=True)
+    return session
+
+
+def received_chunks(session):
+    """Indexes of the chunks stored so far."""
+    directory = session_dir(session)
+    if not directory.exists():
+        return []
+    return sorted(int(path.stem) for path in directory.glob('*.part'))
+
+
+def _check_signature(session, head):
+    signatures = SIGNATURES.get(extension(session.filename))
+    if signatures and not head.startswith(signatures):
+        raise UploadError('Nội dung file không khớp với định dạng')
+
+
+def append_chunk(session, index, stream, content_length=None):
+    """Stream chunk ``index`` from ``stream`` to disk; returns its size.
+
+    The chunk is written to a temporary name and renamed when complete, so a
+    dropped connection never leaves a partial part behind.
+    """
+    if session.status != UploadSession.Status.UPLOADING:
+        raise UploadError('Phiên tải lên đã kết thúc')
+    if session.expires_at < timezone.now():
+        raise UploadError('Phiên tải lên đã hết hạn')
+    if not 0 <= index < session.chunk_count:
+        raise UploadError(f'Chỉ số chunk phải từ 0 đến {session.chunk_count - 1}')
+    expected = session.expected_chunk_size(index)
+    if stream is None:
+        raise UploadError(f'Chunk {index} không có dữ liệu')
+    if content_length is not None and content_length != expected:
+        raise UploadError(f'Chunk {index} phải dài đúng {expected} bytes')
+
+    target = _part_path(session, index)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temporary = target.with_name(f'{target.name}.{uuid.uuid4().hex}.tmp')
+    written = 0
+    try:
+        with open(temporary, 'wb') as out:
+            while written <= expected:
+                block = stream.read(min(BLOCK_SIZE, expected - written + 1))
+                if not block:
+                    break
+                if written == 0 and index == 0:
+                    _check_signature(session, block)
+                written += len(block)
+                if written > expected:
+                    raise UploadError(f'Chunk {index} dài hơn {expected} bytes')
+                out.write(block)
+        if written != expected:
+            raise UploadError(f'Chunk {index} thiếu dữ liệu ({written}/{expected} bytes)')
+        os.replace(temporary, target)
+    finally:
+        if temporary.exists():
+            temporary.unlink()
+    return written
+
+
+def _copy_into(source_fd, target_fd, count):
+    """Append ``count`` bytes of ``source_fd`` to ``target_fd`` in the kernel when possible."""
+    copy_file_range = getattr(os, 'copy_file_range', None)
+    sendfile = getattr(os, 'sendfile', None)
+    offset = 0
+    while offset < count:
+        try:
+            if copy_file_range is not None:
+                copied = copy_file_range(source_fd, target_fd, count - offset, offset_src=offset)
+            elif sendfile is not None:
+                copied = sendfile(target_fd, source_fd, offset, count - offset)
+            else:
+                break
+        except OSError:
+            # Not supported for this file system / kernel: try the next method
+            if copy_file_range is not None:
+                copy_file_range = None
+                continue
+            if sendfile is not None:
+                sendfile = None
+                continue
+            raise
+        if copied == 0:
+            break
+        offset += copied
+    if offset < count:
+        os.lseek(source_fd, offset, os.SEEK_SET)
+        while offset < count:
+            block = os.read(source_fd, min(1024 * 1024, count - offset))
+            if not block:
+                raise UploadError('Chunk bị thiếu dữ liệu trên đĩa')
+            os.write(target_fd, block)
+            offset += len(block)
+
+
+def finalize_upload(session):
+    """Join every chunk into one file; the session becomes ``complete``."""
+    if session.status == UploadSession.Status.COMPLETE:
+        return session
+    if session.status != UploadSession.Status.UPLOADING:
+        raise UploadError('Phiên tải lên đã kết thúc')
+    missing = sorted(set(range(session.chunk_count)) - set(received_chunks(session)))
+    if missing:
+        raise UploadError(f'Còn thiếu {len(missing)} chunk: {", ".join(map(str, missing[:20]))}')
+
+    assembled = _assembled_path(session)
+    with open(assembled, 'wb') as out:
+        target_fd = out.fileno()
+        for index in range(session.chunk_count):
+            with open(_part_path(session, index), 'rb') as part:
+                _copy_into(part.fileno(), target_fd, session.expected_chunk_size(index))
+    if assembled.stat().st_size != session.size:
+        assembled.unlink()
+        raise UploadError('Kích thước file sau khi ghép không khớp')
+    for index in range(session.chunk_count):
+        _part_path(session, index).unlink()
+
+    session.status = UploadSession.Status.COMPLETE
+    session.save(update_fields=['status', 'updated_at'])
+    return session
+
+
+def discard_upload(session):
+    shutil.rmtree(session_dir(session), ignore_errors=True)
+    session.delete()
+
+
+# -- handing the file over to a model --------------------------------------
+
+class AssembledUpload(UploadedFile):
+    """The assembled file of a session, usable as ``FileField`` content.
+
+    ``temporary_file_path()`` lets ``FileSystemStorage`` move the file into
+    place rather than copy it. The file is only opened when something reads
+    it, so an upload rejected by validation (name/size checks) never holds
+    a descriptor.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self._path = str(_assembled_path(session))
+        self._file = None
+        super().__init__(None, name=session.filename, size=session.size)
+
+    @property
+    def file(self):
+        if self._file is None or self._file.closed:
+            self._file = open(self._path, 'rb')
+        return self._file
+
+    @file.setter
+    def file(self, value):
+        self._file = value
+
+    @property
+    def closed(self):
+        return self._file is None or self._file.closed
+
+    def open(self, mode=None):
+        self.close()
+        self._file = open(self._path, mode or 'rb')
+        return self
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+    def temporary_file_path(self):
+        return self._path
+
+
+def open_upload(upload_id, owner, purpose, target_id=None):
+    """``AssembledUpload`` of a complete session of ``owner``, for ``purpose``."""
+    try:
+        session = UploadSession.objects.get(pk=upload_id, owner=owner)
+    except (UploadSession.DoesNotExist, ValueError):
+        raise UploadError('Không tìm thấy phiên tải lên')
+    if session.purpose != purpose or (target_id is not None and session.target_id != target_id):
+        raise UploadError('Phiên tải lên không dành cho mục này')
+    if session.status == UploadSession.Status.CONSUMED:
+        raise UploadError('File của phiên tải lên này đã được sử dụng')
+    if session.status != UploadSession.Status.COMPLETE:
+        raise UploadError('File chưa tải lên xong')
+    return AssembledUpload(session)
+
+
+def consume_upload(upload):
+    """Mark the session of an ``AssembledUpload`` used once its file has been saved."""
+    upload.close()
+    session = upload.session
+    session.status = UploadSession.Status.CONSUMED
+    session.save(update_fields=['status', 'updated_at'])
+    shutil.rmtree(session_dir(session), ignore_errors=True)
+
+
+def purge_expired(now=None):
+    """Delete expired sessions (consumed ones included) and their chunks; returns the count."""
+    now = now or timezone.now()
+    expired = UploadSession.objects.filter(expires_at__lt=now)
+    count = 0
+    for session in expired.iterator():
+        shutil.rmtree(session_dir(session), ignore_errors=True)
+        count += 1
+    expired.delete()
+    return count
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('uploads/', views.UploadSessionCreateView.as_view(), name='upload_session_create'),
+    path('uploads/<uuid:upload_id>/', views.UploadSessionDetailView.as_view(), name='upload_session_detail'),
+    path('uploads/<uuid:upload_id>/chunks/<int:index>/', views.UploadChunkView.as_view(), name='upload_chunk'),
+    path('uploads/<uuid:upload_id>/complete/', views.UploadCompleteView.as_view(), name='upload_complete'),
+]
@@ -0,0 +1,81 @@
+from rest_framework import status, permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .models import UploadSession
+from .serializers import UploadSessionCreateSerializer, UploadSessionSerializer
+from .uploads import UploadError, init_upload, append_chunk, finalize_upload, discard_upload
+
+
+def _own_session(request, upload_id):
+    try:
+        return UploadSession.objects.get(pk=upload_id, owner=request.user)
+    except UploadSession.DoesNotExist:
+        return None
+
+
+class UploadSessionCreateView(APIView):
+    """Start a chunked upload: ``{purpose, filename, size[, chunk_size, target_id]}``."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = UploadSessionCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            session = init_upload(owner=request.user, **serializer.validated_data)
+        except UploadError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(UploadSessionSerializer(session).data, status=status.HTTP_201_CREATED)
+
+
+class UploadSessionDetailView(APIView):
+    """Progress of an upload (``received_chunks`` tells a client what to resend), or abort it."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, upload_id):
+        session = _own_session(request, upload_id)
+        if session is None:
+            return Response({'error': 'Không tìm thấy phiên tải lên'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(UploadSessionSerializer(session).data)
+
+    def delete(self, request, upload_id):
+        session = _own_session(request, upload_id)
+        if session is None:
+            return Response({'error': 'Không tìm thấy phiên tải lên'}, status=status.HTTP_404_NOT_FOUND)
+        discard_upload(session)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadChunkView(APIView):
+    """``PUT`` one chunk as the raw request body (``application/octet-stream``)."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def put(self, request, upload_id, index):
+        session = _own_session(request, upload_id)
+        if session is None:
+            return Response({'error': 'Không tìm thấy phiên tải lên'}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            content_length = int(request.META.get('CONTENT_LENGTH') or 0) or None
+        except ValueError:
+            content_length = None
+        try:
+            # request.stream is read block by block; the body is never loaded whole
+            size = append_chunk(session, index, request.stream, content_length)
+        except UploadError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'index': index, 'size': size})
+
+
+class UploadCompleteView(APIView):
+    """Assemble the chunks; the returned ``id`` is then passed as ``upload_id``."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, upload_id):
+        session = _own_session(request, upload_id)
+        if session is None:
+            return Response({'error': 'Không tìm thấy phiên tải lên'}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            finalize_upload(session)
+        except UploadError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(UploadSessionSerializer(session).data)
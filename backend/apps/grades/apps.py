@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class GradesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.grades'
+
+    def ready(self):
+        # Import signals to ensure they are registered
+        from . import signals  # noqa
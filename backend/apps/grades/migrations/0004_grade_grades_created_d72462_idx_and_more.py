@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grades', '0003_grade_component'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='grade',
+            index=models.Index(fields=['-created_at', '-id'], name='grades_created_d72462_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='grade',
+            index=models.Index(fields=['class_obj', '-created_at'], name='grades_class_o_1e85b5_idx'),
+        ),
+    ]
@@ -67,6 +67,11 @@ class Grade(models.Model):
         verbose_name_plural = 'Điểm số'
         unique_together = ['student', 'class_obj', 'subject', 'grade_type']
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination, optionally narrowed by class
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['class_obj', '-created_at']),
+        ]
     
     def __str__(self):
         return f"{self.student.student_id} - {self.subject.subject_name} - {self.get_grade_type_display()}: {self.score}"
@@ -0,0 +1,52 @@
+"""Email notifications for grade publication."""
+from collections import defaultdict
+
+from apps.classes.models import ClassStudent
+from apps.core import mailer
+from .models import Grade
+
+
+def notify_grades_published(class_obj, message=''):
+    """Queue one email per active student of ``class_obj`` listing their grades.
+
+    Uses two queries (roster + grades) regardless of class size; the emails
+    are sent in batches over a shared connection by ``apps.core.mailer``.
+    Returns the number of emails queued.
+    """
+    roster = (
+        ClassStudent.objects
+        .filter(class_obj=class_obj, is_active=True)
+        .values_list('student_id', 'student__email', 'student__first_name')
+    )
+
+    grades_by_student = defaultdict(list)
+    grades = (
+        Grade.objects
+        .filter(class_obj=class_obj)
+        .select_related('subject')
+        .order_by('subject__subject_name', 'grade_type')
+    )
+    for grade in grades:
+        grades_by_student[grade.student_id].append({
+            'subject': grade.subject.subject_name,
+            'grade_type': grade.get_grade_type_display(),
+            # Strings keep the payload JSON-serializable for Celery
+            'score': str(grade.score),
+            'max_score': str(grade.max_score),
+        })
+
+    teacher = class_obj.teacher
+    return mailer.queue_bulk(
+        (
+            (email, {'first_name': first_name, 'grades': grades_by_student.get(student_pk, [])})
+            for student_pk, email, first_name in roster
+        ),
+        f"Điểm lớp {class_obj.class_name} đã được công bố - EduAttend",
+        'grades_published',
+        {
+            'class_name': class_obj.class_name,
+            'class_code': class_obj.class_id,
+            'teacher_name': f"{teacher.first_name} {teacher.last_name}".strip(),
+            'message': message,
+        },
+    )
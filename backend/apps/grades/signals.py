@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.core.view_cache import bump_class
+from .models import Grade, GradeSummary
+
+
+@receiver([post_save, post_delete], sender=Grade)
+@receiver([post_save, post_delete], sender=GradeSummary)
+def invalidate_grade_views(sender, instance, **kwargs):
+    bump_class(instance.class_obj_id, 'grades')
@@ -0,0 +1,47 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase
+
+from apps.accounts.models import User
+from apps.classes.models import Class, ClassStudent
+from apps.core import mailer
+from apps.students.models import Student
+from .models import Grade, Subject
+from .notifications import notify_grades_published
+
+
+@mock.patch.object(mailer, 'MAIL_QUEUE', 'sync')
+class NotifyGradesPublishedTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = User.objects.create_user(
+            'teacher@example.com', 'Teacher@123', role='teacher', first_name='Văn', last_name='Giảng',
+        )
+        cls.class_obj = Class.objects.create(class_id='LTW01', class_name='Lập trình web', teacher=cls.teacher)
+        subject = Subject.objects.create(subject_id='LTW', subject_name='Lập trình web')
+        for n in range(3):
+            student = Student.objects.create(
+                student_id=f'SV{n}', first_name=f'An{n}', last_name='Nguyễn', email=f'sv{n}@example.com',
+                gender='male', date_of_birth='2004-01-01',
+            )
+            ClassStudent.objects.create(class_obj=cls.class_obj, student=student, is_active=n < 2)
+            Grade.objects.create(
+                student=student, class_obj=cls.class_obj, subject=subject, grade_type='midterm',
+                score=Decimal('7.5') + n, max_score=10, created_by=cls.teacher,
+            )
+
+    def test_one_email_per_active_student(self):
+        # Roster and grades, however many students
+        with self.assertNumQueries(2):
+            queued = notify_grades_published(self.class_obj, message='Chúc mừng')
+        self.assertEqual(queued, 2)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['sv0@example.com', 'sv1@example.com'])
+
+    def test_email_lists_the_student_grades(self):
+        notify_grades_published(self.class_obj)
+        body = {message.to[0]: message.body for message in mail.outbox}['sv1@example.com']
+        self.assertIn('Xin chào An1', body)
+        self.assertIn('Lập trình web (Giữa kỳ): 8.50/10.00', body)
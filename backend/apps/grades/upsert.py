@@ -0,0 +1,61 @@
+"""Writing many grades of one class at once.
+
+``bulk_upsert_grades`` inserts or updates every row in one statement per
+batch (``INSERT ... ON CONFLICT DO UPDATE`` / ``ON DUPLICATE KEY UPDATE``)
+keyed on ``(student, class_obj, subject, grade_type)``. Signals do not fire
+for bulk writes, so the cached grade views of the class are invalidated here.
+"""
+from django.db import connection
+from django.db.models import Q
+
+from apps.core.view_cache import bump_class
+from .models import Grade, Subject
+
+
+BATCH_SIZE = 500
+
+
+def resolve_subject(class_obj, subject_id=None):
+    """Subject of the grades of ``class_obj``; ``None`` if it cannot be determined.
+
+    ``subject_id`` wins when given (``Subject.DoesNotExist`` if unknown);
+    otherwise the subject of any existing grade of the class, then a subject
+    whose code or name matches the last ``-`` part of the class name.
+    """
+    if subject_id:
+        return Subject.objects.get(id=subject_id)
+    existing_any = Grade.objects.filter(class_obj=class_obj).select_related('subject').first()
+    if existing_any and existing_any.subject:
+        return existing_any.subject
+    class_name = getattr(class_obj, 'class_name', '') or ''
+    # Extract last token after '-' and trim, e.g. "... - DH22TIN06"
+    candidate = class_name.split('-')[-1].strip() if '-' in class_name else ''
+    if not candidate:
+        return None
+    return Subject.objects.filter(Q(subject_id__iexact=candidate) | Q(subject_name__icontains=candidate)).first()
+
+
+def bulk_upsert_grades(class_obj, subject, grade_type, scores, created_by, component=None):
+    """Insert or update one grade per student; ``scores`` maps student pk -> ``(score, comment)``.
+
+    Returns the number of rows written.
+    """
+    grades = [
+        Grade(
+            student_id=student_id, class_obj=class_obj, subject=subject, grade_type=grade_type,
+            component=component, score=score, max_score=10, comment=comment, created_by=created_by,
+        )
+        for student_id, (score, comment) in scores.items()
+    ]
+    if not grades:
+        return 0
+    options = {
+        'update_conflicts': True,
+        'update_fields': ['score', 'comment', 'component', 'updated_at'],
+    }
+    # MySQL's ON DUPLICATE KEY UPDATE takes no conflict target
+    if connection.features.supports_update_conflicts_with_target:
+        options['unique_fields'] = ['student', 'class_obj', 'subject', 'grade_type']
+    Grade.objects.bulk_create(grades, batch_size=BATCH_SIZE, **options)
+    bump_class(class_obj.id, 'grades')
+    return len(grades)
@@ -13,6 +13,7 @@ urlpatterns = [
     path('statistics/', views.grade_statistics, name='grade_statistics'),
     path('student/<str:student_id>/summary/', views.student_grade_summary, name='student_grade_summary'),
     path('class/<int:class_id>/summary/', views.class_grade_summary, name='class_grade_summary'),
+    path('class/<int:class_id>/notify/', views.notify_class_grades, name='notify_class_grades'),
     
     # Import/Export
     path('import-excel/', views.import_excel, name='import_excel'),
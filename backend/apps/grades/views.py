@@ -2,16 +2,20 @@ from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
-from django.db.models import Q, Avg, Count
+from django.db.models import Q, Avg, Count, Max, Min
 from django.http import HttpResponse, JsonResponse
-from .models import Grade
+from .models import Grade, Subject
 from .serializers import GradeSerializer, GradeCreateSerializer
+from .upsert import resolve_subject
+from apps.core.pagination import KeysetPaginationMixin
+from apps.core.view_cache import cached_view, class_scope
 
 
-class GradeListCreateView(generics.ListCreateAPIView):
-    """List and create grades"""
+class GradeListCreateView(KeysetPaginationMixin, generics.ListCreateAPIView):
+    """List and create grades (``?pagination=cursor`` for keyset mode)"""
     queryset = Grade.objects.all()
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('-created_at', '-id')
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -28,7 +32,7 @@ class GradeListCreateView(generics.ListCreateAPIView):
         if class_id is not None:
             queryset = queryset.filter(class_obj_id=class_id)
             
-        return queryset.order_by('-created_at')
+        return queryset.order_by('-created_at', '-id')
 
     def perform_create(self, serializer):
         user = self.request.user
@@ -138,30 +142,12 @@ def upsert_grade(request):
             return Response({'error': 'Không tìm thấy sinh viên với mã này'}, status=status.HTTP_404_NOT_FOUND)
 
         # Determine subject
-        subject = None
-        if subject_id:
-            try:
-                subject = Subject.objects.get(id=subject_id)
-            except Subject.DoesNotExist:
-                return Response({'error': 'Subject không tồn tại'}, status=status.HTTP_400_BAD_REQUEST)
-        else:
-            # Try to infer from any existing grade in this class (any student)
-            existing_any = Grade.objects.filter(class_obj=class_obj).select_related('subject').first()
-            if existing_any and existing_any.subject:
-                subject = existing_any.subject
-            else:
-                # Heuristic: try to extract subject code from class name like "... - DH22TIN06"
-                try:
-                    from django.db.models import Q
-                    class_name = getattr(class_obj, 'class_name', '') or ''
-                    # Extract last token after '-' and trim
-                    candidate = class_name.split('-')[-1].strip() if '-' in class_name else ''
-                    if candidate:
-                        subject = Subject.objects.filter(Q(subject_id__iexact=candidate) | Q(subject_name__icontains=candidate)).first()
-                except Exception:
-                    subject = None
-                if not subject:
-                    return Response({'error': 'Không xác định được môn học cho lớp này. Hãy tạo ít nhất một bản ghi điểm có subject hoặc truyền subject_id.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            subject = resolve_subject(class_obj, subject_id)
+        except Subject.DoesNotExist:
+            return Response({'error': 'Subject không tồn tại'}, status=status.HTTP_400_BAD_REQUEST)
+        if not subject:
+            return Response({'error': 'Không xác định được môn học cho lớp này. Hãy tạo ít nhất một bản ghi điểm có subject hoặc truyền subject_id.'}, status=status.HTTP_400_BAD_REQUEST)
 
         # Upsert grade
         grade, created = Grade.objects.get_or_create(
@@ -196,6 +182,7 @@ def upsert_grade(request):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@cached_view(scopes=['grades'])
 def grade_statistics(request):
     """Get comprehensive grade statistics"""
     try:
@@ -280,6 +267,7 @@ def _get_max_score_for_letter(letter):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@cached_view(scopes=['grades', 'students'])
 def student_grade_summary(request, student_id):
     """Get comprehensive grade summary for a student"""
     try:
@@ -345,6 +333,10 @@ def student_grade_summary(request, student_id):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@cached_view(
+    scopes=lambda request, class_id: [class_scope(class_id), 'students'],
+    vary_on_user=True,
+)
 def class_grade_summary(request, class_id):
     """Get grade summary for all students in a class"""
     try:
@@ -417,6 +409,35 @@ def class_grade_summary(request, class_id):
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def notify_class_grades(request, class_id):
+    """Email every active student of a class that grades have been published"""
+    try:
+        from apps.classes.models import Class
+        from .notifications import notify_grades_published
+
+        class_obj = Class.objects.select_related('teacher').get(id=class_id)
+
+        if request.user.role != 'admin' and class_obj.teacher != request.user:
+            return Response(
+                {'error': 'Bạn không có quyền gửi thông báo cho lớp này'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        queued = notify_grades_published(class_obj, message=request.data.get('message', ''))
+
+        return Response({
+            'message': f'Đã xếp hàng gửi thông báo điểm tới {queued} sinh viên',
+            'queued': queued
+        }, status=status.HTTP_202_ACCEPTED)
+
+    except Class.DoesNotExist:
+        return Response({'error': 'Không tìm thấy lớp học'}, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 def _calculate_gpa(grades):
     """Calculate GPA based on grades"""
     if not grades.exists():
@@ -501,7 +522,7 @@ def import_excel(request):
             'class_id': ['class_id', 'lop', 'class'],
             'subject': ['subject', 'mon_hoc', 'course'],
             'score': ['score', 'diem', 'grade', 'mark'],
-            'exam_type': ['exam_type', 'loai_kiem_tra', 'type'],
+            'exam_type': ['exam_type', 'grade_type', 'loai_kiem_tra', 'type'],
             'semester': ['semester', 'hoc_ky', 'term'],
             'academic_year': ['academic_year', 'nam_hoc', 'year']
         }
@@ -516,6 +537,8 @@ def import_excel(request):
         
         created_grades = []
         errors = []
+        # Subject column value (code or pk) -> pk, looked up once per value
+        subjects = {}
         
         # Process each row
         for row_num in range(2, worksheet.max_row + 1):
@@ -553,8 +576,27 @@ def import_excel(request):
                     })
                     continue
                 
+                # GradeCreateSerializer takes the subject pk and grade_type
+                subject = row_data.get('subject', '')
+                if subject not in subjects:
+                    match = Subject.objects.filter(subject_id=subject).first()
+                    if match is None and subject.isdigit():
+                        match = Subject.objects.filter(pk=subject).first()
+                    subjects[subject] = match.pk if match else None
+                if subjects[subject] is None:
+                    errors.append({
+                        'row': row_num,
+                        'error': f'Subject not found: {subject}',
+                        'data': row_data
+                    })
+                    continue
+                row_data['subject_id'] = subjects[subject]
+                row_data['grade_type'] = row_data['exam_type']
+                # The model default (10.00) is a float, which Decimal scores cannot divide by
+                row_data['max_score'] = 10
+                
                 # Create grade
-                serializer = GradeCreateSerializer(data=row_data)
+                serializer = GradeCreateSerializer(data=row_data, context={'request': request})
                 if serializer.is_valid():
                     grade = serializer.save()
                     created_grades.append(GradeSerializer(grade).data)
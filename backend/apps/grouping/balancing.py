@@ -0,0 +1,197 @@
+"""Balanced group formation.
+
+Students are described by a feature matrix (one row per student):
+
+* ``grade``: average score in the class, as a fraction of ``max_score``;
+* ``attendance``: share of the class's recorded attendances that are present/late;
+* ``gender``: one column per value of ``Student.gender``;
+
+every column standardized (students without data get the class mean), so
+each criterion weighs the same. ``teammates`` adds a penalty for every pair of
+students who already shared a group in the class's recent group sets.
+
+The cost of a grouping is ``sum over groups of |sum of member rows|^2 / size``
+(how far each group's mean is from the class mean, weighted by its size)
+plus ``conflict_weight`` per repeated pair. It is minimized by a greedy
+assignment (students with the most extreme profile first, each into the open
+group where it adds the least cost) followed by local search: for every
+student the best swap with a student of another group is evaluated for all
+candidates at once with NumPy and applied if it lowers the cost.
+
+Everything random goes through one generator seeded from ``seed``, so the
+same seed over the same data gives the same groups.
+"""
+import hashlib
+
+import numpy as np
+from django.db.models import Avg, Count, F, Q
+
+from .models import GroupMember, GroupSet
+
+
+CRITERIA = ('grade', 'attendance', 'gender', 'teammates')
+
+# Recent group sets of the class whose teammates should not meet again
+TEAMMATE_HISTORY = 5
+CONFLICT_WEIGHT = 2.0
+MAX_PASSES = 2
+
+
+def _rng(seed):
+    if not seed:
+        return np.random.default_rng()
+    return np.random.default_rng(int.from_bytes(hashlib.sha256(str(seed).encode()).digest()[:8], 'big'))
+
+
+def _standardize(column):
+    """Z-scores of ``column``; NaN (no data) becomes the mean, constant columns become 0."""
+    known = ~np.isnan(column)
+    if not known.any():
+        return np.zeros_like(column)
+    column = np.where(known, column, column[known].mean())
+    std = column.std()
+    return (column - column.mean()) / std if std > 0 else np.zeros_like(column)
+
+
+def _per_student(rows, index, n):
+    column = np.full(n, np.nan)
+    for student_id, value in rows:
+        if value is not None and student_id in index:
+            column[index[student_id]] = float(value)
+    return column
+
+
+def student_features(class_obj, students, criteria=CRITERIA):
+    """``(features, conflicts)`` for ``students`` of ``class_obj``.
+
+    ``features`` is an ``n x k`` float matrix, ``conflicts`` an ``n x n``
+    matrix counting how often two students were teammates (or ``None``).
+    Costs one query per criterion.
+    """
+    from apps.attendance.models import Attendance
+    from apps.grades.models import Grade
+
+    n = len(students)
+    index = {student.pk: position for position, student in enumerate(students)}
+    columns = []
+
+    if 'grade' in criteria:
+        rows = (
+            Grade.objects.filter(class_obj=class_obj, max_score__gt=0)
+            .values('student_id').annotate(value=Avg(F('score') / F('max_score')))
+            .values_list('student_id', 'value')
+        )
+        columns.append(_standardize(_per_student(rows, index, n)))
+
+    if 'attendance' in criteria:
+        rows = (
+            Attendance.objects.filter(session__class_obj=class_obj)
+            .values('student_id')
+            .annotate(total=Count('id'), attended=Count('id', filter=Q(status__in=('present', 'late'))))
+            .values_list('student_id', 'total', 'attended')
+        )
+        columns.append(_standardize(_per_student(
+            ((student_id, attended / total) for student_id, total, attended in rows if total), index, n,
+        )))
+
+    if 'gender' in criteria:
+        genders = np.array([student.gender or '' for student in students])
+        for value in sorted(set(genders)):
+            columns.append(_standardize((genders == value).astype(float)))
+
+    conflicts = None
+    if 'teammates' in criteria:
+        conflicts = np.zeros((n, n))
+        recent = GroupSet.objects.filter(class_obj=class_obj).order_by('-created_at', '-id')[:TEAMMATE_HISTORY]
+        members = {}
+        for group_id, student_id in (
+            GroupMember.objects.filter(group__groupset__in=list(recent.values_list('id', flat=True)))
+            .values_list('group_id', 'student_id')
+        ):
+            if student_id in index:
+                members.setdefault(group_id, []).append(index[student_id])
+        for positions in members.values():
+            conflicts[np.ix_(positions, positions)] += 1
+        np.fill_diagonal(conflicts, 0)
+
+    features = np.column_stack(columns) if columns else np.zeros((n, 0))
+    return features, conflicts
+
+
+def group_sizes(n, group_size):
+    """Sizes of the groups ``split_round_robin`` would form (differ by at most one)."""
+    count = max((n + group_size - 1) // group_size, 1)
+    return np.array([n // count + (i < n % count) for i in range(count)])
+
+
+def balanced_assignment(features, sizes, conflicts=None, seed=None,
+                        conflict_weight=CONFLICT_WEIGHT, max_passes=MAX_PASSES):
+    """Group index (``0..len(sizes)-1``) of every row of ``features``."""
+    rng = _rng(seed)
+    n = features.shape[0]
+    g = len(sizes)
+    sizes = np.asarray(sizes, dtype=float)
+    X = np.asarray(features, dtype=float)
+    C = conflicts * conflict_weight if conflicts is not None else np.zeros((n, n))
+
+    # Greedy: extreme profiles first; ties broken by the seeded permutation
+    order = rng.permutation(n)
+    order = order[np.argsort(-np.einsum('ij,ij->i', X[order], X[order]), kind='stable')]
+    sums = np.zeros((g, X.shape[1]))
+    filled = np.zeros(g)
+    # together[i, h]: penalty of student i for the current members of group h
+    together = np.zeros((n, g))
+    assign = np.empty(n, dtype=int)
+    for i in order:
+        grown = sums + X[i]
+        added = (np.einsum('ij,ij->i', grown, grown) - np.einsum('ij,ij->i', sums, sums)) / sizes
+        added += together[i]
+        added[filled >= sizes] = np.inf
+        h = int(np.argmin(added))
+        assign[i] = h
+        sums[h] = grown[h]
+        filled[h] += 1
+        together[:, h] += C[:, i]
+
+    if g < 2:
+        return assign
+
+    # Local search: best improving swap per student, all candidates at once
+    rows = np.arange(n)
+    for _ in range(max_passes):
+        improved = False
+        for i in rng.permutation(n):
+            a = assign[i]
+            diff = X - X[i]                       # x_j - x_i for every candidate j
+            diff_sq = np.einsum('ij,ij->i', diff, diff)
+            sums_b = sums[assign]
+            delta = (2 * diff @ sums[a] + diff_sq) / sizes[a]
+            delta += (diff_sq - 2 * np.einsum('ij,ij->i', diff, sums_b)) / sizes[assign]
+            delta += (together[i, assign] - together[i, a]
+                      + together[:, a] - together[rows, assign] - 2 * C[i])
+            delta[assign == a] = np.inf
+            j = int(np.argmin(delta))
+            if delta[j] >= -1e-9:
+                continue
+            b = assign[j]
+            sums[a] += diff[j]
+            sums[b] -= diff[j]
+            together[:, a] += C[:, j] - C[:, i]
+            together[:, b] += C[:, i] - C[:, j]
+            assign[i], assign[j] = b, a
+            improved = True
+        if not improved:
+            break
+    return assign
+
+
+def split_balanced(class_obj, students, group_size, seed=None, criteria=CRITERIA):
+    """Buckets of students balanced on ``criteria`` (see module docstring)."""
+    students = list(students)
+    features, conflicts = student_features(class_obj, students, criteria)
+    sizes = group_sizes(len(students), group_size)
+    assign = balanced_assignment(features, sizes, conflicts, seed=seed)
+    buckets = [[] for _ in range(len(sizes))]
+    for student, h in zip(students, assign):
+        buckets[h].append(student)
+    return buckets
@@ -0,0 +1,76 @@
+"""Streaming exports of a group set.
+
+Rows come from one query over the memberships (``.iterator()``, no model
+instances), so memory does not grow with the number of groups.
+
+* CSV is generated row by row straight into a ``StreamingHttpResponse``.
+* XLSX uses openpyxl's write-only mode: rows are written to a temporary file
+  as they are produced and the finished file is streamed back in chunks,
+  instead of keeping the whole workbook in memory.
+"""
+import csv
+import tempfile
+
+from django.http import FileResponse, StreamingHttpResponse
+
+from .models import GroupMember
+
+
+HEADER = ['STT', 'Nhóm', 'MSSV', 'Họ tên', 'Email']
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def export_rows(groupset):
+    """Yield ``[stt, group name, student id, full name, email]`` in group order."""
+    rows = (
+        GroupMember.objects.filter(group__groupset=groupset)
+        .order_by('group__index', 'id')
+        .values_list('group__name', 'student__student_id', 'student__first_name',
+                     'student__last_name', 'student__email')
+    )
+    for number, (group_name, student_id, first_name, last_name, email) in enumerate(rows.iterator(), start=1):
+        yield [number, group_name, student_id, f"{first_name} {last_name}".strip(), email]
+
+
+def export_filename(groupset, extension):
+    return f"Groups_{groupset.class_obj.class_id}_{groupset.created_at.strftime('%Y%m%d')}.{extension}"
+
+
+class _Echo:
+    """File-like object whose ``write`` returns the value, for ``csv.writer``."""
+
+    def write(self, value):
+        return value
+
+
+def csv_response(groupset):
+    writer = csv.writer(_Echo())
+
+    def lines():
+        # BOM so Excel opens the UTF-8 file with Vietnamese names intact
+        yield '\ufeff' + writer.writerow(HEADER)
+        for row in export_rows(groupset):
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(lines(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(groupset, "csv")}"'
+    return response
+
+
+def xlsx_response(groupset):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Groups')
+    sheet.append(HEADER)
+    for row in export_rows(groupset):
+        sheet.append(row)
+
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    # FileResponse streams the file in blocks and closes it when done
+    return FileResponse(
+        output, as_attachment=True, filename=export_filename(groupset, 'xlsx'), content_type=XLSX_CONTENT_TYPE,
+    )
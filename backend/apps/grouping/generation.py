@@ -0,0 +1,110 @@
+"""Group generation and loading: split a class roster into groups, store them
+in bulk and read whole group sets back.
+
+A group set is written with a fixed number of statements whatever the class
+size: the ``GroupSet`` row, one ``bulk_create`` for all groups and one for
+all memberships (batched by ``BATCH_SIZE``). Backends that do not return
+primary keys from ``bulk_create`` (MySQL) cost one extra query to read the
+group ids back by ``(groupset, index)``. ``load_groups`` reads a group set
+back with two queries (groups, then all memberships with their students).
+"""
+import random
+
+from django.db.models import Prefetch
+
+from .models import GroupSet, Group, GroupMember
+
+
+BATCH_SIZE = 1000
+
+STUDENT_FIELDS = ('id', 'student_id', 'first_name', 'last_name', 'email', 'gender')
+
+
+def active_students(class_obj):
+    """Active students of a class as light ``Student`` instances, in enrollment order."""
+    from apps.students.models import Student
+
+    return list(
+        Student.objects.filter(class_students__class_obj=class_obj, class_students__is_active=True)
+        .only(*STUDENT_FIELDS)
+        .order_by('class_students__id')
+    )
+
+
+def split_round_robin(students, group_size, seed=None):
+    """Shuffle by ``seed`` and deal students into groups whose sizes differ by at most one."""
+    students = list(students)
+    random.Random(seed or None).shuffle(students)
+    groups_count = max((len(students) + group_size - 1) // group_size, 1)
+    buckets = [[] for _ in range(groups_count)]
+    for i, student in enumerate(students):
+        buckets[i % groups_count].append(student)
+    return buckets
+
+
+def save_groupset(class_obj, buckets, group_size, seed=None, title=None, created_by=None):
+    """Store ``buckets`` (lists of students) as a new group set.
+
+    Returns ``(groupset, groups)`` where ``groups`` is the response payload
+    built from memory, so nothing is read back except missing primary keys.
+    Call inside a transaction.
+    """
+    groupset = GroupSet.objects.create(
+        class_obj=class_obj,
+        group_size=group_size,
+        seed=seed or None,
+        title=title,
+        created_by=created_by,
+    )
+    groups = Group.objects.bulk_create(
+        [Group(groupset=groupset, index=index, name=f"Nhóm {index}") for index in range(1, len(buckets) + 1)],
+        batch_size=BATCH_SIZE,
+    )
+    if any(group.pk is None for group in groups):
+        ids = dict(Group.objects.filter(groupset=groupset).values_list('index', 'id'))
+        for group in groups:
+            group.pk = ids[group.index]
+
+    GroupMember.objects.bulk_create(
+        [
+            GroupMember(group_id=group.pk, student_id=student.pk)
+            for group, members in zip(groups, buckets)
+            for student in members
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+    return groupset, [group_payload(group, members) for group, members in zip(groups, buckets)]
+
+
+def group_payload(group, students):
+    return {
+        'id': group.pk,
+        'index': group.index,
+        'name': group.name,
+        'members': [
+            {
+                'id': student.id,
+                'student_id': student.student_id,
+                'full_name': student.full_name,
+                'email': student.email,
+            } for student in students
+        ]
+    }
+
+
+def load_groups(groupset):
+    """Response payload of every group of ``groupset``, in two queries."""
+    memberships = (
+        GroupMember.objects.select_related('student')
+        .only('group', *(f'student__{name}' for name in STUDENT_FIELDS))
+        .order_by('id')
+    )
+    groups = (
+        Group.objects.filter(groupset=groupset).order_by('index')
+        .prefetch_related(Prefetch('memberships', queryset=memberships))
+    )
+    return [
+        group_payload(group, [membership.student for membership in group.memberships.all()])
+        for group in groups
+    ]
@@ -6,6 +6,7 @@ from .views import (
     GroupSetDetailView,
     GroupDetailView,
     GroupMemberManageView,
+    GroupSetMovesView,
     AvailableStudentsView,
     ExportGroupsExcelView,
 )
@@ -17,6 +18,7 @@ urlpatterns = [
     path('groupsets/<int:pk>/', GroupSetDetailView.as_view(), name='groupset_detail'),
     path('groups/<int:pk>/', GroupDetailView.as_view(), name='group_detail'),
     path('groups/<int:group_id>/members/', GroupMemberManageView.as_view(), name='group_member_manage'),
+    path('groupsets/<int:pk>/moves/', GroupSetMovesView.as_view(), name='groupset_moves'),
     path('available-students/', AvailableStudentsView.as_view(), name='available_students'),
     path('export/<int:groupset_id>/', ExportGroupsExcelView.as_view(), name='export_groups_excel'),
 ]
@@ -3,12 +3,11 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import generics
 from django.db import transaction
-from django.http import HttpResponse
-import random
-import io
-from openpyxl import Workbook
 
 from apps.grouping.models import GroupSet, Group, GroupMember
+from apps.grouping.generation import active_students, split_round_robin, save_groupset, load_groups
+from apps.grouping.exports import csv_response, xlsx_response
+from apps.grouping.balancing import CRITERIA, split_balanced
 from apps.grouping.serializers import GroupSetSerializer, GroupSerializer
 from apps.classes.models import Class, ClassStudent
 from apps.students.models import Student
@@ -44,6 +43,20 @@ class GenerateGroupsView(APIView):
         if group_size < 2:
             return Response({'error': 'Kích thước nhóm tối thiểu là 2'}, status=status.HTTP_400_BAD_REQUEST)
 
+        # 'random' (seeded shuffle) or 'balanced' on grade/attendance/gender/teammates
+        strategy = request.data.get('strategy') or 'random'
+        if strategy not in ('random', 'balanced'):
+            return Response({'error': 'strategy phải là random hoặc balanced'}, status=status.HTTP_400_BAD_REQUEST)
+        criteria = request.data.get('balance_on') or list(CRITERIA)
+        if isinstance(criteria, str):
+            criteria = [item.strip() for item in criteria.split(',') if item.strip()]
+        unknown = set(criteria) - set(CRITERIA)
+        if unknown:
+            return Response(
+                {'error': f'Tiêu chí không hợp lệ: {", ".join(sorted(unknown))}. Hỗ trợ: {", ".join(CRITERIA)}'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
         try:
             class_obj = Class.objects.get(id=class_id)
         except Class.DoesNotExist:
@@ -55,56 +68,25 @@ class GenerateGroupsView(APIView):
             return Response({'error': 'Bạn không có quyền chia nhóm cho lớp này'}, status=status.HTTP_403_FORBIDDEN)
 
         # Fetch active students of the class
-        student_qs = ClassStudent.objects.select_related('student').filter(class_obj=class_obj, is_active=True)
-        students = [cs.student for cs in student_qs]
+        students = active_students(class_obj)
         if not students:
             return Response({'error': 'Lớp chưa có sinh viên hoạt động'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Shuffle by seed
-        rnd = random.Random(seed or None)
-        rnd.shuffle(students)
-
-        # Determine number of groups
-        n = len(students)
-        groups_count = (n + group_size - 1) // group_size
-        if groups_count <= 0:
-            groups_count = 1
-
-        # Round-robin distribute so size diff <= 1
-        buckets = [[] for _ in range(groups_count)]
-        for i, st in enumerate(students):
-            buckets[i % groups_count].append(st)
-
-        # Create GroupSet and groups
-        gs = GroupSet.objects.create(
-            class_obj=class_obj,
-            group_size=group_size,
-            seed=seed or None,
-            title=title,
-            created_by=request.user
+        if strategy == 'balanced':
+            buckets = split_balanced(class_obj, students, group_size, seed, criteria)
+        else:
+            # Shuffle by seed, round-robin distribute so size diff <= 1
+            buckets = split_round_robin(students, group_size, seed)
+
+        # Create GroupSet, groups and memberships in bulk
+        gs, groups = save_groupset(
+            class_obj, buckets, group_size,
+            seed=seed, title=title, created_by=request.user,
         )
-        groups = []
-        for idx, members in enumerate(buckets, start=1):
-            g = Group.objects.create(groupset=gs, index=idx, name=f"Nhóm {idx}")
-            GroupMember.objects.bulk_create([
-                GroupMember(group=g, student=st) for st in members
-            ])
-            groups.append({
-                'id': g.id,
-                'index': g.index,
-                'name': g.name,
-                'members': [
-                    {
-                        'id': st.id,
-                        'student_id': st.student_id,
-                        'full_name': st.full_name,
-                        'email': st.email,
-                    } for st in members
-                ]
-            })
 
         payload = {
             'groupset': GroupSetSerializer(gs).data,
+            'strategy': strategy,
             'groups': groups
         }
         return Response(payload)
@@ -143,7 +125,7 @@ class GroupListView(APIView):
         if not groupset_id:
             return Response({'error': 'Thiếu groupset_id'}, status=status.HTTP_400_BAD_REQUEST)
         try:
-            gs = GroupSet.objects.get(id=int(groupset_id))
+            gs = GroupSet.objects.select_related('class_obj').get(id=int(groupset_id))
         except GroupSet.DoesNotExist:
             return Response({'error': 'Không tìm thấy GroupSet'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -151,17 +133,7 @@ class GroupListView(APIView):
         if request.user.role != 'admin' and gs.class_obj.teacher_id != request.user.id:
             return Response({'error': 'Không có quyền xem nhóm của lớp này'}, status=status.HTTP_403_FORBIDDEN)
 
-        groups = []
-        for g in gs.groups.all().order_by('index'):
-            members = [
-                {
-                    'id': m.student.id,
-                    'student_id': m.student.student_id,
-                    'full_name': m.student.full_name,
-                    'email': m.student.email,
-                } for m in g.memberships.select_related('student').all()
-            ]
-            groups.append({'id': g.id, 'index': g.index, 'name': g.name, 'members': members})
+        groups = load_groups(gs)
         return Response({'groupset': GroupSetSerializer(gs).data, 'groups': groups})
 
 
@@ -263,6 +235,88 @@ class GroupMemberManageView(APIView):
         return Response({'success': True, 'deleted': deleted})
 
 
+class GroupSetMovesView(APIView):
+    """Apply a batch of membership moves to one GroupSet.
+
+    Body: ``{"moves": [{"student_id": "SV001", "group_id": 12}, ...]}`` where a
+    student may be given by ``student_id`` (code) or ``student_pk`` and
+    ``group_id: null`` removes the student from the set. The batch is
+    validated as a whole against the class roster, then written with one
+    delete and one bulk insert; the response lists what actually changed.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk):
+        try:
+            gs = GroupSet.objects.select_related('class_obj').get(id=int(pk))
+        except GroupSet.DoesNotExist:
+            return Response({'error': 'Không tìm thấy GroupSet'}, status=status.HTTP_404_NOT_FOUND)
+        if request.user.role != 'admin' and gs.class_obj.teacher_id != request.user.id:
+            return Response({'error': 'Không có quyền'}, status=status.HTTP_403_FORBIDDEN)
+
+        moves = request.data.get('moves')
+        if not isinstance(moves, list) or not moves:
+            return Response({'error': 'Thiếu danh sách moves'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Roster and groups fetched once for the whole batch
+        roster = dict(
+            ClassStudent.objects.filter(class_obj=gs.class_obj, is_active=True)
+            .values_list('student__student_id', 'student_id')
+        )
+        roster_pks = set(roster.values())
+        group_ids = set(Group.objects.filter(groupset=gs).values_list('id', flat=True))
+
+        targets = {}
+        errors = []
+        for position, move in enumerate(moves):
+            if not isinstance(move, dict):
+                errors.append({'index': position, 'error': 'Sai định dạng'})
+                continue
+            code = move.get('student_id')
+            try:
+                student_pk = roster.get(code) if code else int(move.get('student_pk') or move.get('student'))
+                group_id = move.get('group_id')
+                group_id = int(group_id) if group_id is not None else None
+            except (TypeError, ValueError):
+                errors.append({'index': position, 'error': 'Thiếu hoặc sai student_id/student_pk/group_id'})
+                continue
+            if student_pk not in roster_pks:
+                errors.append({'index': position, 'error': 'Sinh viên không thuộc lớp này'})
+                continue
+            if group_id is not None and group_id not in group_ids:
+                errors.append({'index': position, 'error': 'Nhóm không thuộc GroupSet này'})
+                continue
+            # A later move of the same student wins
+            targets[student_pk] = group_id
+        if errors:
+            return Response({'error': 'Danh sách moves không hợp lệ', 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        current = dict(
+            GroupMember.objects.filter(group__groupset=gs, student_id__in=list(targets))
+            .values_list('student_id', 'group_id')
+        )
+        changed = {student_pk: group_id for student_pk, group_id in targets.items() if current.get(student_pk) != group_id}
+
+        if changed:
+            with transaction.atomic():
+                GroupMember.objects.filter(group__groupset=gs, student_id__in=list(changed)).delete()
+                GroupMember.objects.bulk_create([
+                    GroupMember(group_id=group_id, student_id=student_pk)
+                    for student_pk, group_id in changed.items() if group_id is not None
+                ])
+
+        codes_by_pk = {student_pk: code for code, student_pk in roster.items()}
+        diff = [
+            {
+                'student_pk': student_pk,
+                'student_id': codes_by_pk.get(student_pk),
+                'from_group': current.get(student_pk),
+                'to_group': group_id,
+            } for student_pk, group_id in changed.items()
+        ]
+        return Response({'success': True, 'moved': diff, 'unchanged': len(targets) - len(changed)})
+
+
 class AvailableStudentsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -298,36 +352,17 @@ class ExportGroupsExcelView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, groupset_id):
+        """Download the groups as XLSX (default) or CSV (``?file_format=csv``), streamed."""
         try:
-            gs = GroupSet.objects.get(id=int(groupset_id))
+            gs = GroupSet.objects.select_related('class_obj').get(id=int(groupset_id))
         except GroupSet.DoesNotExist:
             return Response({'error': 'Không tìm thấy GroupSet'}, status=status.HTTP_404_NOT_FOUND)
         if request.user.role != 'admin' and gs.class_obj.teacher_id != request.user.id:
             return Response({'error': 'Không có quyền export'}, status=status.HTTP_403_FORBIDDEN)
 
-        # Build workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = 'Groups'
-        # Header
-        ws.append(['STT', 'Nhóm', 'MSSV', 'Họ tên', 'Email'])
-        row = 2
-        idx = 1
-        for g in gs.groups.all().order_by('index'):
-            for m in g.memberships.select_related('student').all():
-                st = m.student
-                ws.append([idx, g.name, st.student_id, st.full_name, st.email])
-                idx += 1
-                row += 1
-
-        # Save to bytes
-        buf = io.BytesIO()
-        wb.save(buf)
-        buf.seek(0)
-        resp = HttpResponse(
-            buf.getvalue(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        filename = f"Groups_{gs.class_obj.class_id}_{gs.created_at.strftime('%Y%m%d')}.xlsx"
-        resp['Content-Disposition'] = f'attachment; filename="{filename}"'
-        return resp
+        file_format = request.query_params.get('file_format', 'xlsx')
+        if file_format == 'csv':
+            return csv_response(gs)
+        if file_format != 'xlsx':
+            return Response({'error': 'file_format phải là xlsx hoặc csv'}, status=status.HTTP_400_BAD_REQUEST)
+        return xlsx_response(gs)
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:57
+
+import apps.files.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('materials', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='classmaterial',
+            name='file',
+            field=models.FileField(blank=True, max_length=255, null=True, storage=apps.files.storage.blob_storage, upload_to='class_materials/'),
+        ),
+    ]
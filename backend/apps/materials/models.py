@@ -3,6 +3,7 @@ from django.core.exceptions import ValidationError
 import os
 from apps.accounts.models import User
 from apps.classes.models import Class
+from apps.files.storage import blob_storage
 
 ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'ppt', 'pptx', 'xls', 'xlsx', 'zip'}
 MAX_FILE_SIZE_MB = 20
@@ -14,7 +15,7 @@ class ClassMaterial(models.Model):
     class_obj = models.ForeignKey(Class, on_delete=models.CASCADE, related_name='materials')
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True, null=True)
-    file = models.FileField(upload_to='class_materials/', blank=True, null=True)
+    file = models.FileField(upload_to='class_materials/', storage=blob_storage, max_length=255, blank=True, null=True)
     link = models.URLField(blank=True, null=True)
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='uploaded_materials')
     created_at = models.DateTimeField(auto_now_add=True)
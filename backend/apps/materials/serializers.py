@@ -1,22 +1,36 @@
+from django.urls import reverse
 from rest_framework import serializers
 from .models import ClassMaterial, ALLOWED_EXTENSIONS, MAX_FILE_SIZE, MAX_FILE_SIZE_MB
+from apps.files.models import UploadSession
+from apps.files.uploads import UploadError, open_upload, consume_upload
 import os
 
 
 class ClassMaterialSerializer(serializers.ModelSerializer):
     file_url = serializers.SerializerMethodField()
+    # Permission-checked download, also served in production (apps.files.downloads)
+    download_url = serializers.SerializerMethodField()
     uploader = serializers.SerializerMethodField()
     file_size = serializers.SerializerMethodField()
+    # Id of a finished chunked upload (apps.files), instead of a multipart file
+    upload_id = serializers.UUIDField(write_only=True, required=False)
 
     class Meta:
         model = ClassMaterial
         fields = [
-            'id', 'class_obj', 'title', 'description', 'file', 'file_url', 'file_size', 'link',
-            'created_by', 'uploader', 'created_at'
+            'id', 'class_obj', 'title', 'description', 'file', 'file_url', 'download_url', 'file_size', 'link',
+            'created_by', 'uploader', 'created_at', 'upload_id'
         ]
         read_only_fields = ['id', 'created_by', 'uploader', 'created_at', 'file_size']
 
     def validate(self, attrs):
+        upload_id = attrs.pop('upload_id', None)
+        if upload_id:
+            request = self.context.get('request')
+            try:
+                attrs['file'] = open_upload(upload_id, request.user, UploadSession.Purpose.MATERIAL)
+            except UploadError as e:
+                raise serializers.ValidationError({'upload_id': str(e)})
         file = attrs.get('file') or getattr(getattr(self, 'instance', None), 'file', None)
         link = attrs.get('link') or getattr(getattr(self, 'instance', None), 'link', None)
         errors = {}
@@ -34,6 +48,13 @@ class ClassMaterialSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(errors)
         return attrs
 
+    def save(self, **kwargs):
+        upload = self.validated_data.get('file')
+        instance = super().save(**kwargs)
+        if hasattr(upload, 'session'):
+            consume_upload(upload)
+        return instance
+
     def get_file_url(self, obj):
         request = self.context.get('request')
         try:
@@ -43,6 +64,13 @@ class ClassMaterialSerializer(serializers.ModelSerializer):
             return None
         return None
 
+    def get_download_url(self, obj):
+        if not obj.file or not obj.pk:
+            return None
+        request = self.context.get('request')
+        url = reverse('class_material_download', args=[obj.pk])
+        return request.build_absolute_uri(url) if request else url
+
     def get_file_size(self, obj):
         try:
             return getattr(obj.file, 'size', None) if obj.file else None
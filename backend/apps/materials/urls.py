@@ -4,4 +4,5 @@ from . import views
 urlpatterns = [
     path('', views.ClassMaterialListCreateView.as_view(), name='class_material_list_create'),
     path('<int:pk>/', views.ClassMaterialDetailView.as_view(), name='class_material_detail'),
+    path('<int:pk>/download/', views.download_material, name='class_material_download'),
 ]
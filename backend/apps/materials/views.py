@@ -1,11 +1,13 @@
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 
 from .models import ClassMaterial
 from .serializers import ClassMaterialSerializer
 from apps.classes.models import Class, ClassStudent
+from apps.files.downloads import serve_file
 
 
 class ClassMaterialListCreateView(generics.ListCreateAPIView):
@@ -30,7 +32,7 @@ class ClassMaterialListCreateView(generics.ListCreateAPIView):
         user = self.request.user
         class_obj = serializer.validated_data.get('class_obj')
         if user.role != 'admin' and class_obj.teacher != user:
-            raise permissions.PermissionDenied('Bạn không có quyền đăng tài liệu cho lớp này')
+            raise PermissionDenied('Bạn không có quyền đăng tài liệu cho lớp này')
         serializer.save(created_by=user)
 
 
@@ -45,3 +47,23 @@ class ClassMaterialDetailView(generics.RetrieveDestroyAPIView):
         if user.role != 'admin' and instance.class_obj.teacher != user:
             return Response({'error': 'Bạn không có quyền xóa tài liệu này'}, status=status.HTTP_403_FORBIDDEN)
         return super().destroy(request, *args, **kwargs)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def download_material(request, pk):
+    """Protected download of a material's file (nginx/X-Sendfile when configured)."""
+    try:
+        material = ClassMaterial.objects.select_related('class_obj').get(pk=pk)
+    except ClassMaterial.DoesNotExist:
+        return Response({'error': 'Không tìm thấy tài liệu'}, status=status.HTTP_404_NOT_FOUND)
+    user = request.user
+    if user.role != 'admin' and material.class_obj.teacher_id != user.id:
+        is_enrolled = ClassStudent.objects.filter(
+            class_obj_id=material.class_obj_id, student__email__iexact=user.email, is_active=True
+        ).exists()
+        if not is_enrolled:
+            return Response({'error': 'Bạn không có quyền tải tài liệu này'}, status=status.HTTP_403_FORBIDDEN)
+    if not material.file:
+        return Response({'error': 'Tài liệu này không có file'}, status=status.HTTP_404_NOT_FOUND)
+    return serve_file(request, material.file, material.file_name)
@@ -0,0 +1,204 @@
+"""Bulk room allocation for attendance sessions.
+
+A semester of generated sessions is assigned in one pass:
+
+1. rooms that can host a session are those of a compatible ``room_type``
+   (see ``SESSION_ROOM_TYPES``) with ``capacity >= Class.max_students``;
+2. sessions are processed hardest first (largest class, then fewest
+   compatible rooms) and each takes the smallest free room that fits
+   (best fit), preferring the room the same class already got at the same
+   weekday and time so a course keeps its room all semester;
+3. "free" comes from the availability index plus the assignments made
+   earlier in the same run.
+
+The result is written with one ``bulk_create`` of ``RoomSchedule`` rows and
+one ``bulk_update`` of the sessions, inside a transaction that locks the
+candidate rooms and re-validates the new bookings against the database.
+
+A booking belongs to its session: ``release_rooms`` gives it back when the
+session moves, and deleting the session deletes it (``signals.py``).
+"""
+from collections import defaultdict
+
+from django.db import transaction
+
+from apps.attendance.models import AttendanceSession
+from .availability import availability, to_minutes
+from .conflicts import validate_batch
+from .models import Room, RoomSchedule
+
+
+SESSION_ROOM_TYPES = {
+    'lecture': [Room.RoomType.LECTURE, Room.RoomType.HALL],
+    'practice': [Room.RoomType.PRACTICE, Room.RoomType.COMPUTER, Room.RoomType.LAB],
+    'seminar': [Room.RoomType.MEETING, Room.RoomType.LECTURE],
+    'exam': [Room.RoomType.LECTURE, Room.RoomType.HALL],
+}
+
+UNUSABLE_STATUSES = [Room.RoomStatus.MAINTENANCE, Room.RoomStatus.CLOSED]
+
+
+def _candidate_rooms(room_types=None, building_id=None):
+    rooms = Room.objects.filter(is_active=True).exclude(status__in=UNUSABLE_STATUSES)
+    if room_types:
+        rooms = rooms.filter(room_type__in=room_types)
+    if building_id:
+        rooms = rooms.filter(building__building_id=building_id)
+    return list(rooms.select_related('building').order_by('capacity', 'id'))
+
+
+def plan_allocation(sessions, rooms, busy=None):
+    """Choose a room per session without touching the database.
+
+    ``sessions`` need ``id``, ``class_obj`` (with ``max_students``),
+    ``session_type``, ``session_date``, ``start_time`` and ``end_time``.
+    ``busy(room_id, day, start, end)`` reports existing bookings and defaults
+    to the availability index. Returns ``({session_id: room}, [unassigned])``.
+    """
+    busy = busy or availability.is_busy
+    rooms_by_type = defaultdict(list)
+    for room in rooms:
+        rooms_by_type[room.room_type].append(room)
+
+    def candidates(session):
+        types = SESSION_ROOM_TYPES.get(session.session_type, [Room.RoomType.LECTURE])
+        needed = session.class_obj.max_students
+        fitting = [room for t in types for room in rooms_by_type[t] if room.capacity >= needed]
+        return sorted(fitting, key=lambda room: (room.capacity, room.id))
+
+    options = {session.id: candidates(session) for session in sessions}
+    order = sorted(
+        sessions,
+        key=lambda s: (-s.class_obj.max_students, len(options[s.id]), s.session_date, s.start_time),
+    )
+
+    taken = defaultdict(list)       # (day, room_id) -> [(start, end)] booked in this run
+    preferred = {}                  # (class, weekday, start_time) -> room
+    assignment, unassigned = {}, []
+
+    for session in order:
+        start, end = to_minutes(session.start_time), to_minutes(session.end_time)
+        key = (session.class_obj.id, session.session_date.weekday(), session.start_time)
+        pool = options[session.id]
+        if key in preferred and preferred[key] in pool:
+            pool = [preferred[key]] + [room for room in pool if room is not preferred[key]]
+
+        for room in pool:
+            slot = (session.session_date, room.id)
+            if any(s < end and e > start for s, e in taken[slot]):
+                continue
+            if busy(room.id, session.session_date, session.start_time, session.end_time):
+                continue
+            taken[slot].append((start, end))
+            preferred.setdefault(key, room)
+            assignment[session.id] = room
+            break
+        else:
+            unassigned.append(session)
+
+    return assignment, unassigned
+
+
+def allocate_rooms(sessions, created_by, building_id=None, update_location=True):
+    """Assign rooms to ``sessions`` and book them. Returns ``(assigned, unassigned)``.
+
+    ``assigned`` is a list of sessions that got a room; the instances are
+    updated in place (``room``, ``room_schedule``, ``location``).
+    """
+    sessions = [s for s in sessions if s.room_id is None]
+    if not sessions:
+        return [], []
+
+    room_types = {t for s in sessions for t in SESSION_ROOM_TYPES.get(s.session_type, [Room.RoomType.LECTURE])}
+    rooms = _candidate_rooms(room_types, building_id)
+    availability.ensure_days({s.session_date for s in sessions})
+
+    with transaction.atomic():
+        # Same lock as single bookings, so concurrent writers wait for us
+        list(Room.objects.select_for_update().filter(id__in=[room.id for room in rooms]).values_list('id'))
+        assignment, unassigned = plan_allocation(
+            sessions, rooms,
+            busy=lambda room_id, day, start, end: availability.is_busy(room_id, day, start, end, load=False),
+        )
+
+        booked = [s for s in sessions if s.id in assignment]
+        rows = [{
+            'id': None,
+            'room_id': assignment[s.id].id,
+            'start_date': s.session_date,
+            'end_date': s.session_date,
+            'start_time': s.start_time,
+            'end_time': s.end_time,
+            'is_recurring': False,
+            'recurring_days': None,
+        } for s in booked]
+        # Bookings committed by other processes after our index was loaded
+        for session, outcome in list(zip(booked, validate_batch(rows))):
+            if outcome['conflicts']:
+                booked.remove(session)
+                unassigned.append(session)
+                del assignment[session.id]
+
+        schedules = RoomSchedule.objects.bulk_create([
+            RoomSchedule(
+                room=assignment[s.id],
+                title=f"{s.class_obj.class_id} - {s.session_name}",
+                description=s.description,
+                start_date=s.session_date,
+                end_date=s.session_date,
+                start_time=s.start_time,
+                end_time=s.end_time,
+                is_recurring=False,
+                created_by=created_by,
+            )
+            for s in booked
+        ])
+        if any(schedule.pk is None for schedule in schedules):
+            # Backends without RETURNING (MySQL): (room, day, start) is unique
+            # among conflict-free bookings, so look the new rows up by it
+            ids = {
+                (room_id, day, start): pk
+                for pk, room_id, day, start in RoomSchedule.objects.filter(
+                    room_id__in={s.room_id for s in schedules},
+                    start_date__in={s.start_date for s in schedules},
+                    created_by=created_by,
+                ).values_list('id', 'room_id', 'start_date', 'start_time')
+            }
+            for schedule in schedules:
+                schedule.pk = ids.get((schedule.room_id, schedule.start_date, schedule.start_time))
+
+        for session, schedule in zip(booked, schedules):
+            room = assignment[session.id]
+            session.room = room
+            session.room_schedule = schedule
+            if update_location:
+                session.location = room.full_name
+        fields = ['room', 'room_schedule'] + (['location'] if update_location else [])
+        AttendanceSession.objects.bulk_update(booked, fields, batch_size=500)
+
+    # bulk_create sends no signals: refresh every process's availability index
+    transaction.on_commit(availability.invalidate_all)
+    return booked, unassigned
+
+
+def release_rooms(sessions):
+    """Delete the bookings of ``sessions`` and clear their room. Returns the number released.
+
+    ``location`` is cleared too when it still shows the released room.
+    """
+    sessions = [s for s in sessions if s.room_id is not None]
+    if not sessions:
+        return 0
+    rooms = Room.objects.select_related('building').in_bulk({s.room_id for s in sessions})
+    schedule_ids = [s.room_schedule_id for s in sessions if s.room_schedule_id]
+    with transaction.atomic():
+        for session in sessions:
+            room = rooms.get(session.room_id)
+            if room is not None and session.location == room.full_name:
+                session.location = None
+            session.room = None
+            session.room_schedule = None
+        AttendanceSession.objects.bulk_update(sessions, ['room', 'room_schedule', 'location'], batch_size=500)
+        # Per-row delete: the signals update the availability index
+        RoomSchedule.objects.filter(id__in=schedule_ids).delete()
+    return len(sessions)
@@ -5,3 +5,7 @@ class RoomsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.rooms'
     verbose_name = 'Quản lý phòng học'
+
+    def ready(self):
+        # Import signals to ensure they are registered
+        from . import signals  # noqa
@@ -0,0 +1,343 @@
+"""In-memory room availability index.
+
+Bookings (``RoomSchedule`` rows) are expanded into per-day occurrences and
+stored per ``(date, room)`` as intervals sorted by start time, together with
+a running maximum of end times. "Is room R busy between s and e on day D" is
+then a single ``bisect``: among intervals starting before ``e``, the largest
+end must not exceed ``s``. That is O(log n) per room instead of a SQL overlap
+scan per request.
+
+Semantics match the original overlap filter: a non-recurring schedule
+occupies its time window on every day from ``start_date`` to ``end_date``; a
+recurring one only on the weekdays listed in ``recurring_days`` (falling back
+to the weekday of ``start_date`` when the field is empty).
+
+Days are loaded lazily (one query per batch of missing days) and kept in an
+LRU of ``ROOM_AVAILABILITY_MAX_DAYS`` days. Schedule saves/deletes are
+applied incrementally to the loaded days of the current process via signals;
+other processes notice through a generation counter in the shared cache and
+drop their index. That needs a cache shared by all workers (``CACHE_URL``):
+with the per-process memory cache they never see each other's counter, so a
+loaded day is also reloaded once it is ``ROOM_AVAILABILITY_MAX_AGE`` seconds
+old, which bounds how stale any worker can be.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from functools import lru_cache
+from datetime import timedelta
+from itertools import accumulate
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import RoomSchedule
+
+
+MAX_DAYS = getattr(settings, 'ROOM_AVAILABILITY_MAX_DAYS', 400)
+MAX_AGE = getattr(settings, 'ROOM_AVAILABILITY_MAX_AGE', 60)
+GENERATION_KEY = 'rooms:availability:generation'
+
+SCHEDULE_FIELDS = (
+    'id', 'room_id', 'start_date', 'end_date', 'start_time', 'end_time',
+    'is_recurring', 'recurring_days',
+)
+
+# Python weekday numbers: Monday=0 .. Sunday=6
+_DAY_NAMES = {
+    'mon': 0, 'monday': 0, 't2': 0,
+    'tue': 1, 'tuesday': 1, 't3': 1,
+    'wed': 2, 'wednesday': 2, 't4': 2,
+    'thu': 3, 'thursday': 3, 't5': 3,
+    'fri': 4, 'friday': 4, 't6': 4,
+    'sat': 5, 'saturday': 5, 't7': 5,
+    'sun': 6, 'sunday': 6, 'cn': 6,
+}
+_VIETNAMESE_DAY = re.compile(r'(?:thứ|thu)\s*([2-7])')
+_SUNDAY = re.compile(r'chủ\s*nhật|chu\s*nhat')
+
+
+@lru_cache(maxsize=512)
+def parse_recurring_days(value):
+    """Parse ``recurring_days`` into a set of Python weekday numbers.
+
+    Accepts comma/space separated tokens: digits follow JavaScript's
+    ``Date.getDay()`` (0 = Sunday, 1 = Monday ... 6 = Saturday), English
+    names/abbreviations (``mon``, ``Tuesday``) and Vietnamese labels
+    (``T2`` .. ``T7``, ``Thứ 2``, ``CN``). Unknown tokens are ignored.
+    """
+    text = (value or '').strip().lower()
+    text = _SUNDAY.sub('cn', _VIETNAMESE_DAY.sub(r't\1', text))
+    days = set()
+    for token in re.split(r'[\s,;|/]+', text):
+        if token.isdigit():
+            for digit in token:
+                if digit in '0123456':
+                    days.add((int(digit) - 1) % 7)
+        elif token in _DAY_NAMES:
+            days.add(_DAY_NAMES[token])
+    return frozenset(days)
+
+
+def to_minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def iter_occurrences(row, first_day, last_day):
+    """Yield the days in ``[first_day, last_day]`` on which a schedule row is active."""
+    day = max(row['start_date'], first_day)
+    end = min(row['end_date'], last_day)
+    if day > end:
+        return
+    if not row['is_recurring']:
+        while day <= end:
+            yield day
+            day += timedelta(days=1)
+        return
+    # Recurring: jump a week at a time per weekday (days are not yielded in order)
+    weekdays = parse_recurring_days(row['recurring_days']) or {row['start_date'].weekday()}
+    for weekday in weekdays:
+        current = day + timedelta(days=(weekday - day.weekday()) % 7)
+        while current <= end:
+            yield current
+            current += timedelta(weeks=1)
+
+
+class DayIntervals:
+    """Intervals of one room on one day, sorted by start with prefix-max ends."""
+    __slots__ = ('items', 'starts', 'max_ends')
+
+    def __init__(self, items):
+        self.items = sorted(items)
+        self.starts = [item[0] for item in self.items]
+        self.max_ends = list(accumulate((item[1] for item in self.items), max))
+
+    def overlaps(self, start, end):
+        # Intervals [0, i) start before ``end``; one of them overlaps iff the
+        # latest end among them is after ``start``
+        i = bisect_left(self.starts, end)
+        return i > 0 and self.max_ends[i - 1] > start
+
+
+class AvailabilityIndex:
+    """Per-process interval index over ``RoomSchedule``."""
+
+    def __init__(self, max_days=MAX_DAYS, max_age=MAX_AGE):
+        self.max_days = max_days
+        self.max_age = max_age
+        self._days = OrderedDict()      # date -> {room_id: DayIntervals}
+        self._loaded_at = {}            # date -> time.monotonic() of its load
+        self._by_schedule = {}          # schedule id -> {(date, room_id)}
+        self._generation = None
+        self._lock = threading.RLock()
+
+    # -- loading -----------------------------------------------------------
+
+    def reset(self):
+        with self._lock:
+            self._days.clear()
+            self._loaded_at.clear()
+            self._by_schedule.clear()
+
+    def _sync_generation(self):
+        generation = cache.get(GENERATION_KEY, 0)
+        if generation != self._generation:
+            self.reset()
+            self._generation = generation
+
+    def load_rows(self, rows, days):
+        """Index ``days`` from already-fetched schedule rows (dicts of ``SCHEDULE_FIELDS``)."""
+        days = sorted(set(days))
+        if not days:
+            return
+        self._sync_generation()
+        wanted = set(days)
+        per_day = {day: {} for day in days}
+        refs = []
+        with self._lock:
+            for row in rows:
+                start, end = to_minutes(row['start_time']), to_minutes(row['end_time'])
+                for day in iter_occurrences(row, days[0], days[-1]):
+                    if day in wanted:
+                        per_day[day].setdefault(row['room_id'], []).append((start, end, row['id']))
+                        refs.append((row['id'], day, row['room_id']))
+            # Reloaded days first drop their previous references
+            loaded_at = time.monotonic()
+            for day in days:
+                self._forget(day)
+                self._days[day] = {room: DayIntervals(items) for room, items in per_day[day].items()}
+                self._loaded_at[day] = loaded_at
+            for schedule_id, day, room_id in refs:
+                self._by_schedule.setdefault(schedule_id, set()).add((day, room_id))
+            self._evict()
+
+    def _forget(self, day):
+        """Drop one loaded day and its schedule references."""
+        rooms = self._days.pop(day, None)
+        self._loaded_at.pop(day, None)
+        for room_id, intervals in (rooms or {}).items():
+            for _start, _end, schedule_id in intervals.items:
+                refs = self._by_schedule.get(schedule_id)
+                if refs is not None:
+                    refs.discard((day, room_id))
+                    if not refs:
+                        del self._by_schedule[schedule_id]
+
+    def _evict(self):
+        while len(self._days) > self.max_days:
+            self._forget(next(iter(self._days)))
+
+    def _fresh(self, day):
+        loaded_at = self._loaded_at.get(day)
+        return loaded_at is not None and time.monotonic() - loaded_at < self.max_age
+
+    def ensure_days(self, days):
+        """Load missing or expired days with a single query covering their range."""
+        self._sync_generation()
+        with self._lock:
+            missing = sorted(day for day in set(days) if not self._fresh(day))
+        if not missing:
+            return
+        rows = RoomSchedule.objects.filter(
+            start_date__lte=missing[-1],
+            end_date__gte=missing[0],
+        ).values(*SCHEDULE_FIELDS)
+        self.load_rows(rows, missing)
+
+    # -- queries -----------------------------------------------------------
+
+    def _day(self, day):
+        rooms = self._days.get(day)
+        if rooms is not None:
+            self._days.move_to_end(day)
+        return rooms or {}
+
+    def is_busy(self, room_id, day, start_time, end_time, load=True):
+        # ``load=False`` skips the generation check for tight loops that
+        # already called ``ensure_days``
+        if load:
+            self.ensure_days([day])
+        with self._lock:
+            intervals = self._day(day).get(room_id)
+            return intervals is not None and intervals.overlaps(to_minutes(start_time), to_minutes(end_time))
+
+    def busy_room_ids(self, day, start_time, end_time):
+        """Ids of rooms with a booking overlapping the slot on ``day``."""
+        self.ensure_days([day])
+        start, end = to_minutes(start_time), to_minutes(end_time)
+        with self._lock:
+            return {
+                room_id for room_id, intervals in self._day(day).items()
+                if intervals.overlaps(start, end)
+            }
+
+    def week_grid(self, room_ids, days, slots):
+        """Busy flags for every room x day x slot, loading all days at once.
+
+        ``slots`` is a list of ``(start_time, end_time)``. Returns
+        ``{room_id: [[busy, ...] per slot] per day]}``.
+        """
+        self.ensure_days(days)
+        slot_minutes = [(to_minutes(s), to_minutes(e)) for s, e in slots]
+        grid = {}
+        with self._lock:
+            day_maps = [self._day(day) for day in days]
+            for room_id in room_ids:
+                rows = []
+                for rooms in day_maps:
+                    intervals = rooms.get(room_id)
+                    if intervals is None:
+                        rows.append([False] * len(slot_minutes))
+                    else:
+                        rows.append([intervals.overlaps(s, e) for s, e in slot_minutes])
+                grid[room_id] = rows
+        return grid
+
+    def slot_bitsets(self, room_ids, days, origin, slot_minutes, slot_count):
+        """Occupancy of every room x day as an int bitset over fixed-width slots.
+
+        Slot ``i`` covers ``[origin + i * slot_minutes, origin + (i + 1) * slot_minutes)``
+        minutes and bit ``i`` (least significant first) is set when any
+        booking overlaps it. Returns ``{room_id: [bits per day]}``.
+        """
+        self.ensure_days(days)
+        full = (1 << slot_count) - 1
+        bits = {}
+        with self._lock:
+            day_maps = [self._day(day) for day in days]
+            for room_id in room_ids:
+                per_day = []
+                for rooms in day_maps:
+                    value = 0
+                    intervals = rooms.get(room_id)
+                    for start, end, _schedule_id in (intervals.items if intervals else ()):
+                        first = max((start - origin) // slot_minutes, 0)
+                        # Ceiling division: a booking ending mid-slot still occupies that slot
+                        last = min(-(-(end - origin) // slot_minutes), slot_count)
+                        if last > first:
+                            value |= full & (((1 << (last - first)) - 1) << first)
+                    per_day.append(value)
+                bits[room_id] = per_day
+        return bits
+
+    # -- incremental updates ----------------------------------------------
+
+    def apply_change(self, schedule_id, row=None):
+        """Re-index one schedule on the loaded days (``row=None`` means deleted)."""
+        with self._lock:
+            touched = self._by_schedule.pop(schedule_id, set())
+            for day, room_id in touched:
+                rooms = self._days.get(day)
+                intervals = rooms.get(room_id) if rooms else None
+                if intervals is None:
+                    continue
+                remaining = [item for item in intervals.items if item[2] != schedule_id]
+                if remaining:
+                    rooms[room_id] = DayIntervals(remaining)
+                else:
+                    del rooms[room_id]
+
+            if row is None or not self._days:
+                return
+            start, end = to_minutes(row['start_time']), to_minutes(row['end_time'])
+            loaded = self._days.keys()
+            for day in iter_occurrences(row, min(loaded), max(loaded)):
+                rooms = self._days.get(day)
+                if rooms is None:
+                    continue
+                items = rooms[row['room_id']].items if row['room_id'] in rooms else []
+                rooms[row['room_id']] = DayIntervals(items + [(start, end, schedule_id)])
+                self._by_schedule.setdefault(schedule_id, set()).add((day, row['room_id']))
+
+    def schedule_changed(self, schedule_id, row=None):
+        """Apply a change locally and tell other processes to drop their index."""
+        try:
+            generation = cache.incr(GENERATION_KEY)
+        except ValueError:
+            cache.set(GENERATION_KEY, 1, None)
+            generation = 1
+        with self._lock:
+            if self._generation is not None and generation == self._generation + 1:
+                self.apply_change(schedule_id, row)
+            else:
+                # Missed another process's change: start over
+                self.reset()
+            self._generation = generation
+
+    def invalidate_all(self):
+        """Drop the index everywhere, e.g. after ``bulk_create`` (no signals)."""
+        try:
+            cache.incr(GENERATION_KEY)
+        except ValueError:
+            cache.set(GENERATION_KEY, 1, None)
+        self.reset()
+
+
+def schedule_row(instance):
+    """``SCHEDULE_FIELDS`` dict of a ``RoomSchedule`` instance."""
+    return {field: getattr(instance, field) for field in SCHEDULE_FIELDS}
+
+
+availability = AvailabilityIndex()
@@ -0,0 +1,131 @@
+"""Double-booking detection for ``RoomSchedule``.
+
+Candidates are matched against existing bookings of the same room with one
+overlap query (``room``, date range, time window) backed by the
+``(room, start_date, end_date)`` index, then recurring expansions are
+compared in memory: two bookings conflict only if they share at least one
+actual day. Writes lock the ``Room`` row first so two concurrent bookings of
+the same room cannot both pass the check.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+
+from .availability import SCHEDULE_FIELDS, iter_occurrences
+from .models import Room, RoomSchedule
+
+
+class ScheduleConflict(Exception):
+    """Raised when a booking overlaps existing ones; views answer 409."""
+
+    def __init__(self, conflicts):
+        super().__init__('Schedule conflicts with existing bookings.')
+        self.conflicts = conflicts
+
+
+def _times_overlap(a, b):
+    return a['start_time'] < b['end_time'] and a['end_time'] > b['start_time']
+
+
+def shares_a_day(a, b):
+    """True if two schedule rows are active on at least one common day."""
+    first = max(a['start_date'], b['start_date'])
+    last = min(a['end_date'], b['end_date'])
+    if first > last:
+        return False
+    days_b = set(iter_occurrences(b, first, last))
+    return any(day in days_b for day in iter_occurrences(a, first, last))
+
+
+def rows_conflict(a, b):
+    return a['room_id'] == b['room_id'] and _times_overlap(a, b) and shares_a_day(a, b)
+
+
+def _overlap_candidates(room_ids, start_date, end_date):
+    return RoomSchedule.objects.filter(
+        room_id__in=room_ids,
+        start_date__lte=end_date,
+        end_date__gte=start_date,
+    ).values(*SCHEDULE_FIELDS, 'title')
+
+
+def describe(row):
+    return {
+        'id': row.get('id'),
+        'title': row.get('title'),
+        'room': row['room_id'],
+        'start_date': row['start_date'],
+        'end_date': row['end_date'],
+        'start_time': row['start_time'],
+        'end_time': row['end_time'],
+        'is_recurring': row['is_recurring'],
+        'recurring_days': row['recurring_days'],
+    }
+
+
+def find_conflicts(candidate, exclude_id=None):
+    """Existing bookings that clash with ``candidate`` (a ``SCHEDULE_FIELDS`` dict)."""
+    existing = _overlap_candidates([candidate['room_id']], candidate['start_date'], candidate['end_date']).filter(
+        start_time__lt=candidate['end_time'],
+        end_time__gt=candidate['start_time'],
+    )
+    if exclude_id is not None:
+        existing = existing.exclude(id=exclude_id)
+    return [describe(row) for row in existing if shares_a_day(candidate, row)]
+
+
+def lock_room(room_id):
+    """Serialize bookings of one room. Must be called inside ``transaction.atomic``."""
+    Room.objects.select_for_update().filter(pk=room_id).first()
+
+
+def save_without_conflicts(serializer, **save_kwargs):
+    """Lock the room, re-check for clashes, then save; raises ``ScheduleConflict``."""
+    data = serializer.validated_data
+    instance = serializer.instance
+    candidate = {
+        field: data.get(field, getattr(instance, field, None))
+        for field in ('start_date', 'end_date', 'start_time', 'end_time', 'is_recurring', 'recurring_days')
+    }
+    room = data.get('room') or instance.room
+    candidate['room_id'] = room.pk
+    candidate['is_recurring'] = bool(candidate['is_recurring'])
+
+    with transaction.atomic():
+        lock_room(room.pk)
+        conflicts = find_conflicts(candidate, exclude_id=instance.pk if instance else None)
+        if conflicts:
+            raise ScheduleConflict(conflicts)
+        return serializer.save(**save_kwargs)
+
+
+def validate_batch(rows):
+    """Check a list of candidate rows against the database and each other.
+
+    ``rows`` are ``SCHEDULE_FIELDS`` dicts (``id`` may be ``None``). Runs one
+    overlap query for the whole batch. Returns, per row, the list of clashing
+    existing bookings and the indexes of clashing rows in the batch.
+    """
+    results = [{'conflicts': [], 'batch_conflicts': []} for _ in rows]
+    if not rows:
+        return results
+
+    existing_by_room = defaultdict(list)
+    for row in _overlap_candidates(
+        {row['room_id'] for row in rows},
+        min(row['start_date'] for row in rows),
+        max(row['end_date'] for row in rows),
+    ):
+        existing_by_room[row['room_id']].append(row)
+
+    seen_by_room = defaultdict(list)
+    for index, row in enumerate(rows):
+        for other in existing_by_room[row['room_id']]:
+            if other['id'] != row.get('id') and rows_conflict(row, other):
+                results[index]['conflicts'].append(describe(other))
+        for other_index in seen_by_room[row['room_id']]:
+            if rows_conflict(row, rows[other_index]):
+                results[index]['batch_conflicts'].append(other_index)
+                results[other_index]['batch_conflicts'].append(index)
+        seen_by_room[row['room_id']].append(index)
+    return results
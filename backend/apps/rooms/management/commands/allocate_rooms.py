@@ -0,0 +1,74 @@
+"""
+Django Management Command: Allocate Rooms
+Xếp phòng hàng loạt cho các buổi học chưa có phòng
+Chạy: python manage.py allocate_rooms --from 2025-09-01 --to 2026-01-15 [--class CS101] [--dry-run]
+"""
+
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.attendance.models import AttendanceSession
+from apps.rooms.allocation import SESSION_ROOM_TYPES, _candidate_rooms, allocate_rooms, plan_allocation
+from apps.rooms.availability import availability
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Assign rooms to attendance sessions that have none, booking them in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from', help='First session date (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='date_to', help='Last session date (YYYY-MM-DD)')
+        parser.add_argument('--class', dest='class_code', help='Only sessions of this class (class_id)')
+        parser.add_argument('--building', help='Only use rooms of this building (building_id)')
+        parser.add_argument('--user', help='Email recorded as creator of the bookings (default: first admin)')
+        parser.add_argument('--dry-run', action='store_true', help='Show the plan without saving')
+
+    def handle(self, *args, **options):
+        sessions = AttendanceSession.objects.filter(room__isnull=True, is_active=True).select_related('class_obj')
+        try:
+            if options['date_from']:
+                sessions = sessions.filter(session_date__gte=datetime.strptime(options['date_from'], '%Y-%m-%d').date())
+            if options['date_to']:
+                sessions = sessions.filter(session_date__lte=datetime.strptime(options['date_to'], '%Y-%m-%d').date())
+        except ValueError as e:
+            raise CommandError(f'Ngày không hợp lệ: {e}')
+        if options['class_code']:
+            sessions = sessions.filter(class_obj__class_id=options['class_code'])
+        sessions = list(sessions)
+
+        if not sessions:
+            self.stdout.write(self.style.WARNING('⚠️  No sessions without a room'))
+            return
+
+        if options['dry_run']:
+            room_types = {t for s in sessions for t in SESSION_ROOM_TYPES.get(s.session_type, ['lecture'])}
+            availability.ensure_days({s.session_date for s in sessions})
+            assignment, unassigned = plan_allocation(sessions, _candidate_rooms(room_types, options['building']))
+            for session in sessions:
+                room = assignment.get(session.id)
+                self.stdout.write(
+                    f'{session.session_date} {session.start_time:%H:%M}-{session.end_time:%H:%M} '
+                    f'{session.class_obj.class_id} {session.session_name}: {room.room_id if room else "—"}'
+                )
+            self.stdout.write(self.style.SUCCESS(
+                f'📋 Plan: {len(assignment)} assigned, {len(unassigned)} without a room (dry run)'
+            ))
+            return
+
+        if options['user']:
+            user = User.objects.filter(email=options['user']).first()
+        else:
+            user = User.objects.filter(is_superuser=True).order_by('id').first()
+        if user is None:
+            raise CommandError('Không tìm thấy người dùng để ghi nhận lịch phòng')
+
+        assigned, unassigned = allocate_rooms(sessions, user, building_id=options['building'])
+        self.stdout.write(self.style.SUCCESS(f'✅ Assigned rooms to {len(assigned)} sessions'))
+        for session in unassigned:
+            self.stdout.write(self.style.WARNING(
+                f'⚠️  No room for {session.class_obj.class_id} {session.session_name} ({session.session_date})'
+            ))
@@ -0,0 +1,103 @@
+"""
+Django Management Command: Benchmark Availability
+Đo tốc độ tra cứu phòng trống với chỉ mục khoảng thời gian trong bộ nhớ
+Chạy: python manage.py benchmark_availability --rooms 500 --weeks 15
+"""
+
+import random
+import time as timer
+from datetime import date, time, timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.rooms.availability import AvailabilityIndex, iter_occurrences, to_minutes
+
+
+# Typical teaching periods (start, end)
+PERIODS = [
+    (time(7, 0), time(9, 30)),
+    (time(9, 45), time(12, 15)),
+    (time(13, 0), time(15, 30)),
+    (time(15, 45), time(18, 15)),
+    (time(18, 30), time(21, 0)),
+]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the room availability index against a linear scan (no database needed)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rooms', type=int, default=500)
+        parser.add_argument('--weeks', type=int, default=15, help='Semester length in weeks')
+        parser.add_argument('--bookings', type=int, default=12, help='Recurring bookings per room')
+        parser.add_argument('--queries', type=int, default=2000, help='Single-slot queries to run')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        today = date.today()
+        semester_start = today - timedelta(days=today.weekday())
+        semester_end = semester_start + timedelta(weeks=options['weeks']) - timedelta(days=1)
+        days = [semester_start + timedelta(days=i) for i in range((semester_end - semester_start).days + 1)]
+        room_ids = list(range(1, options['rooms'] + 1))
+
+        rows = []
+        for room_id in room_ids:
+            for _ in range(options['bookings']):
+                start, end = rng.choice(PERIODS)
+                first_week = rng.randrange(0, max(options['weeks'] // 3, 1))
+                rows.append({
+                    'id': len(rows) + 1,
+                    'room_id': room_id,
+                    'start_date': semester_start + timedelta(weeks=first_week),
+                    'end_date': semester_end,
+                    'start_time': start,
+                    'end_time': end,
+                    'is_recurring': True,
+                    'recurring_days': ','.join(str(d) for d in rng.sample(range(1, 7), rng.randint(1, 2))),
+                })
+
+        self.stdout.write(self.style.SUCCESS(
+            f'🚀 {len(room_ids)} rooms, {len(rows)} recurring bookings, {len(days)} days'
+        ))
+
+        index = AvailabilityIndex(max_days=len(days))
+        started = timer.perf_counter()
+        index.load_rows(rows, days)
+        build = timer.perf_counter() - started
+        occurrences = sum(len(iv.items) for rooms in index._days.values() for iv in rooms.values())
+        self.stdout.write(f'   Build: {build * 1000:.0f} ms ({occurrences} occurrences indexed)')
+
+        queries = [(rng.choice(days), rng.choice(PERIODS)) for _ in range(options['queries'])]
+
+        started = timer.perf_counter()
+        indexed = [index.busy_room_ids(day, start, end) for day, (start, end) in queries]
+        indexed_time = timer.perf_counter() - started
+
+        sample = queries[:max(len(queries) // 20, 1)]
+        started = timer.perf_counter()
+        scanned = [self.linear_scan(rows, day, start, end) for day, (start, end) in sample]
+        scan_time = (timer.perf_counter() - started) * len(queries) / len(sample)
+
+        mismatches = sum(1 for a, b in zip(indexed, scanned) if a != b)
+        per_query = indexed_time / len(queries) * 1e6
+        self.stdout.write(f'\n📊 Free-room queries ({len(queries)} slots x {len(room_ids)} rooms)')
+        self.stdout.write(self.style.SUCCESS(f'   Index: {per_query:.0f} µs/query, '
+                                             f'{per_query / len(room_ids) * 1000:.0f} ns per room'))
+        self.stdout.write(f'   Linear scan (estimated): {scan_time / len(queries) * 1e6:.0f} µs/query')
+        self.stdout.write(f'   Speed-up: {scan_time / indexed_time:.1f}x, mismatches: {mismatches}')
+
+        week = days[:7]
+        started = timer.perf_counter()
+        index.week_grid(room_ids, week, PERIODS)
+        grid_time = timer.perf_counter() - started
+        self.stdout.write(f'\n📊 Week grid ({len(room_ids)} rooms x 7 days x {len(PERIODS)} periods)')
+        self.stdout.write(self.style.SUCCESS(f'   {grid_time * 1000:.1f} ms'))
+
+    def linear_scan(self, rows, day, start_time, end_time):
+        start, end = to_minutes(start_time), to_minutes(end_time)
+        return {
+            row['room_id'] for row in rows
+            if to_minutes(row['start_time']) < end and to_minutes(row['end_time']) > start
+            and any(True for _ in iter_occurrences(row, day, day))
+        }
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='roomschedule',
+            index=models.Index(fields=['room', 'start_date', 'end_date'], name='room_schedu_room_id_ed0791_idx'),
+        ),
+    ]
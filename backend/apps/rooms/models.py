@@ -2,6 +2,17 @@ from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
+class BuildingQuerySet(models.QuerySet):
+    def with_room_counts(self):
+        """Annotate room counts so listings don't run a COUNT per building"""
+        return self.annotate(
+            annotated_total_rooms=models.Count('rooms', distinct=True),
+            annotated_available_rooms=models.Count(
+                'rooms', filter=models.Q(rooms__status='available'), distinct=True
+            ),
+        )
+
+
 class Building(models.Model):
     """Building model - Quản lý các khu"""
     
@@ -30,6 +41,8 @@ class Building(models.Model):
     is_active = models.BooleanField(default=True, verbose_name='Hoạt động')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = BuildingQuerySet.as_manager()
     
     class Meta:
         db_table = 'buildings'
@@ -42,10 +55,14 @@ class Building(models.Model):
     
     @property
     def total_rooms(self):
+        if hasattr(self, 'annotated_total_rooms'):
+            return self.annotated_total_rooms
         return self.rooms.count()
     
     @property
     def available_rooms(self):
+        if hasattr(self, 'annotated_available_rooms'):
+            return self.annotated_available_rooms
         return self.rooms.filter(status='available').count()
 
 
@@ -170,6 +187,9 @@ class RoomSchedule(models.Model):
         verbose_name = 'Lịch phòng'
         verbose_name_plural = 'Lịch các phòng'
         ordering = ['start_date', 'start_time']
+        indexes = [
+            models.Index(fields=['room', 'start_date', 'end_date']),
+        ]
     
     def __str__(self):
         return f"{self.room.room_name} - {self.title} ({self.start_date})"
@@ -74,6 +74,29 @@ class RoomScheduleSerializer(serializers.ModelSerializer):
         return data
 
 
+class RoomScheduleBatchItemSerializer(RoomScheduleSerializer):
+    """One row of a timetable submitted for batch conflict validation.
+
+    ``room`` is looked up in ``context['rooms']`` (``{pk: Room}`` fetched once
+    for the whole batch) instead of one query per row.
+    """
+    id = serializers.IntegerField(required=False, allow_null=True)
+    room = serializers.IntegerField()
+
+    def validate_room(self, value):
+        room = self.context['rooms'].get(value)
+        if room is None:
+            raise serializers.ValidationError(f'Invalid pk "{value}" - object does not exist.')
+        return room
+
+    class Meta(RoomScheduleSerializer.Meta):
+        fields = [
+            'id', 'room', 'title', 'start_date', 'end_date',
+            'start_time', 'end_time', 'is_recurring', 'recurring_days'
+        ]
+        read_only_fields = []
+
+
 class RoomAvailabilitySerializer(serializers.Serializer):
     """Serializer for room availability queries"""
     date = serializers.DateField()
@@ -0,0 +1,25 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.attendance.models import AttendanceSession
+from .models import RoomSchedule
+from .availability import availability, schedule_row
+
+
+@receiver(post_save, sender=RoomSchedule)
+def update_availability_on_save(sender, instance, **kwargs):
+    row = schedule_row(instance)
+    transaction.on_commit(lambda: availability.schedule_changed(row['id'], row))
+
+
+@receiver(post_delete, sender=RoomSchedule)
+def update_availability_on_delete(sender, instance, **kwargs):
+    schedule_id = instance.pk
+    transaction.on_commit(lambda: availability.schedule_changed(schedule_id))
+
+
+@receiver(post_delete, sender=AttendanceSession)
+def release_booking_on_session_delete(sender, instance, **kwargs):
+    # Allocator bookings belong to their session (see allocation.py)
+    if instance.room_schedule_id:
+        RoomSchedule.objects.filter(pk=instance.room_schedule_id).delete()
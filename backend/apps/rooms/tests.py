@@ -0,0 +1,171 @@
+from datetime import date, time, timedelta
+
+from django.utils import timezone
+
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import User
+from apps.attendance.models import AttendanceSession
+from apps.classes.models import Class
+from .allocation import allocate_rooms
+from .availability import availability
+from .models import Building, Room, RoomSchedule
+
+
+class ListQueryCountTests(APITestCase):
+    """Building and room listings run a fixed number of queries, however many rows they return."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            'teacher@example.com', 'Teacher@123', role='teacher', first_name='T', last_name='E',
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def add_buildings(self, count, rooms_per_building=4):
+        start = Building.objects.count()
+        for n in range(start, start + count):
+            building = Building.objects.create(building_id=f'B{n:02d}', building_name=f'Khu {n}')
+            Room.objects.bulk_create([
+                Room(
+                    room_id=f'B{n:02d}-{r}', room_name=str(r), building=building, floor=1, capacity=40,
+                    status=Room.RoomStatus.AVAILABLE if r % 2 else Room.RoomStatus.MAINTENANCE,
+                )
+                for r in range(rooms_per_building)
+            ])
+        return building
+
+    def assert_constant_queries(self, url, expected):
+        with self.assertNumQueries(expected):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.add_buildings(9)
+        with self.assertNumQueries(expected):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_building_list(self):
+        self.add_buildings(3)
+        # count + page, with the room counts annotated
+        self.assert_constant_queries('/api/rooms/buildings/', 2)
+
+    def test_building_list_counts(self):
+        self.add_buildings(1)
+        building = self.client.get('/api/rooms/buildings/').data['results'][0]
+        self.assertEqual((building['total_rooms'], building['available_rooms']), (4, 2))
+
+    def test_building_detail(self):
+        self.add_buildings(1)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/rooms/buildings/B00/')
+        self.assertEqual(response.data['total_rooms'], 4)
+
+    def test_room_list(self):
+        self.add_buildings(3)
+        # count + page; buildings come with the rooms
+        self.assert_constant_queries('/api/rooms/rooms/', 2)
+
+    def test_building_rooms(self):
+        building = self.add_buildings(1, rooms_per_building=12)
+        # building + its rooms
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/rooms/buildings/{building.building_id}/rooms/')
+        self.assertEqual(len(response.data), 12)
+
+
+class TimetableGridTests(APITestCase):
+    """The timetable grid reads the availability index and revalidates with an ETag."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            'teacher@example.com', 'Teacher@123', role='teacher', first_name='T', last_name='E',
+        )
+        cls.building = Building.objects.create(building_id='B01', building_name='Khu A')
+        cls.room = Room.objects.create(room_id='B01-1', room_name='101', building=cls.building, floor=1, capacity=40)
+
+    def setUp(self):
+        availability.reset()
+        self.client.force_authenticate(self.user)
+        # Monday 08:00-09:30
+        RoomSchedule.objects.create(
+            room=self.room, title='Lớp A', start_date=date(2025, 9, 1), end_date=date(2025, 9, 1),
+            start_time=time(8), end_time=time(9, 30), created_by=self.user,
+        )
+
+    def test_matches_availability_grid(self):
+        timetable = self.client.get('/api/rooms/rooms/timetable-grid/', {
+            'start': '2025-09-01', 'end': '2025-09-01', 'day_start': '07:00', 'day_end': '12:00', 'slot_minutes': 60,
+        }).data
+        grid = self.client.get('/api/rooms/rooms/availability-grid/', {
+            'week_start': '2025-09-01', 'days': 1, 'slots': '07:00-08:00,08:00-09:00,09:00-10:00,10:00-11:00,11:00-12:00',
+        }).data
+        bits = int(timetable['rooms'][0]['occupancy'][0], 16)
+        self.assertEqual(
+            [bool(bits >> i & 1) for i in range(timetable['slots_per_day'])],
+            grid['rooms'][0]['busy'][0],
+        )
+        self.assertEqual(grid['rooms'][0]['busy'][0], [False, True, True, False, False])
+
+    def test_etag_follows_buildings(self):
+        url = '/api/rooms/rooms/timetable-grid/?start=2025-09-01'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        Building.objects.filter(pk=self.building.pk).update(building_name='Khu B', updated_at=timezone.now() + timedelta(days=1))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class SessionBookingLifecycleTests(APITestCase):
+    """An allocator booking follows its session: released on delete, re-booked on a move."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            'teacher@example.com', 'Teacher@123', role='teacher', first_name='T', last_name='E',
+        )
+        building = Building.objects.create(building_id='B01', building_name='Khu A')
+        cls.room = Room.objects.create(room_id='B01-1', room_name='101', building=building, floor=1, capacity=60)
+        cls.class_obj = Class.objects.create(class_id='CS101', class_name='Lập trình', teacher=cls.user, max_students=40)
+
+    def setUp(self):
+        availability.reset()
+        self.client.force_authenticate(self.user)
+        self.session = AttendanceSession.objects.create(
+            class_obj=self.class_obj, session_name='Buổi 1', session_date=date(2025, 9, 1),
+            start_time=time(8), end_time=time(10), created_by=self.user,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            allocate_rooms([self.session], self.user)
+        self.assertEqual(self.session.room_id, self.room.id)
+
+    def test_delete_releases_booking(self):
+        schedule_id = self.session.room_schedule_id
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(f'/api/attendance/sessions/{self.session.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(RoomSchedule.objects.filter(pk=schedule_id).exists())
+        self.assertFalse(availability.is_busy(self.room.id, date(2025, 9, 1), time(8), time(10)))
+
+    def test_time_change_rebooks_room(self):
+        old_schedule_id = self.session.room_schedule_id
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                f'/api/attendance/sessions/{self.session.pk}/', {'start_time': '13:00', 'end_time': '15:00'},
+            )
+        self.assertEqual(response.status_code, 200)
+        self.session.refresh_from_db()
+        self.assertFalse(RoomSchedule.objects.filter(pk=old_schedule_id).exists())
+        self.assertEqual(self.session.room_id, self.room.id)
+        schedule = self.session.room_schedule
+        self.assertEqual((schedule.start_time, schedule.end_time), (time(13), time(15)))
+        self.assertFalse(availability.is_busy(self.room.id, date(2025, 9, 1), time(8), time(10)))
+        self.assertTrue(availability.is_busy(self.room.id, date(2025, 9, 1), time(13), time(15)))
+
+    def test_other_edits_keep_booking(self):
+        schedule_id = self.session.room_schedule_id
+        response = self.client.patch(f'/api/attendance/sessions/{self.session.pk}/', {'session_name': 'Buổi mở đầu'})
+        self.assertEqual(response.status_code, 200)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.room_schedule_id, schedule_id)
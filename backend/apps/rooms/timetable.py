@@ -0,0 +1,53 @@
+"""Rooms x time-slots occupancy matrix for campus dashboards.
+
+Each room-day is encoded as a bitset over fixed-width slots (bit ``i`` set =
+slot ``i`` busy, least significant bit first) and serialized as a
+zero-padded hex string, so a week of 500 rooms in 30-minute slots is a few
+hundred KB of JSON instead of thousands of booking objects.
+
+Occupancy is read from the availability index (``availability.py``), the
+same source as ``rooms/available/`` and ``rooms/availability-grid/``, so
+every endpoint gives the same answer to "is this room free". Sessions hold a
+room only through an allocator booking, which is a ``RoomSchedule`` row.
+``fingerprint`` lets the view answer ``If-None-Match`` with a few aggregate
+queries and no grid at all.
+"""
+import hashlib
+from datetime import timedelta
+
+from django.db.models import Count, Max
+
+from .availability import availability, to_minutes
+from .models import Building, RoomSchedule
+
+
+def fingerprint(rooms, start_date, end_date, params):
+    """Cheap version tag of the grid: changes whenever any input row changes."""
+    room_ids = rooms.values('id')
+    schedules = RoomSchedule.objects.filter(
+        room_id__in=room_ids,
+        start_date__lte=end_date,
+        end_date__gte=start_date,
+    )
+    buildings = Building.objects.filter(rooms__in=room_ids)
+    parts = [repr(sorted(params.items()))]
+    parts.append(rooms.aggregate(n=Count('id'), last=Max('updated_at')))
+    parts.append(buildings.aggregate(n=Count('id', distinct=True), last=Max('updated_at')))
+    parts.append(schedules.aggregate(n=Count('id'), last=Max('updated_at')))
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def build_grid(rooms, start_date, end_date, day_start, day_end, slot_minutes):
+    """Return ``(days, slots_per_day, {room_id: [hex per day]})``."""
+    days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+    origin = to_minutes(day_start)
+    slots_per_day = max((to_minutes(day_end) - origin) // slot_minutes, 0)
+
+    bits = availability.slot_bitsets([room.id for room in rooms], days, origin, slot_minutes, slots_per_day)
+
+    width = max((slots_per_day + 3) // 4, 1)
+    grid = {
+        room_id: [format(value, f'0{width}x') for value in per_day]
+        for room_id, per_day in bits.items()
+    }
+    return days, slots_per_day, grid
@@ -10,7 +10,10 @@ router.register(r'schedules', views.RoomScheduleViewSet)
 app_name = 'rooms'
 
 urlpatterns = [
+    # Listed before the router so they are not captured as room detail lookups
+    path('rooms/available/', views.AvailableRoomsView.as_view(), name='available-rooms'),
+    path('rooms/availability-grid/', views.RoomAvailabilityGridView.as_view(), name='room-availability-grid'),
+    path('rooms/timetable-grid/', views.TimetableGridView.as_view(), name='room-timetable-grid'),
     path('', include(router.urls)),
     path('buildings/<str:building_id>/rooms/', views.BuildingRoomsListView.as_view(), name='building-rooms'),
-    path('rooms/available/', views.AvailableRoomsView.as_view(), name='available-rooms'),
 ]
\ No newline at end of file
@@ -6,18 +6,22 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django.db import models
 from django.utils import timezone
-from datetime import datetime, time
+from django.utils.http import quote_etag
+from datetime import datetime, time, timedelta
 
 from .models import Building, Room, RoomSchedule
+from . import timetable
+from .availability import availability
+from .conflicts import ScheduleConflict, save_without_conflicts, validate_batch
 from .serializers import (
     BuildingSerializer, RoomSerializer, RoomScheduleSerializer,
-    RoomAvailabilitySerializer
+    RoomAvailabilitySerializer, RoomScheduleBatchItemSerializer
 )
 
 
 class BuildingViewSet(viewsets.ModelViewSet):
     """ViewSet for Building CRUD operations"""
-    queryset = Building.objects.all()
+    queryset = Building.objects.with_room_counts()
     serializer_class = BuildingSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -43,7 +47,7 @@ class BuildingViewSet(viewsets.ModelViewSet):
         """Get all rooms in a building"""
         try:
             building = self.get_object()
-            rooms = building.rooms.filter(is_active=True)
+            rooms = building.rooms.filter(is_active=True).select_related('building')
             serializer = RoomSerializer(rooms, many=True)
             return Response(serializer.data)
         except Building.DoesNotExist:
@@ -60,7 +64,7 @@ class BuildingViewSet(viewsets.ModelViewSet):
             available_rooms = building.rooms.filter(
                 is_active=True, 
                 status='available'
-            )
+            ).select_related('building')
             serializer = RoomSerializer(available_rooms, many=True)
             return Response(serializer.data)
         except Building.DoesNotExist:
@@ -120,7 +124,7 @@ class RoomViewSet(viewsets.ModelViewSet):
         """Get room schedule"""
         try:
             room = self.get_object()
-            schedules = room.schedules.all().order_by('start_date', 'start_time')
+            schedules = room.schedules.select_related('created_by').order_by('start_date', 'start_time')
             serializer = RoomScheduleSerializer(schedules, many=True)
             return Response(serializer.data)
         except Room.DoesNotExist:
@@ -142,19 +146,89 @@ class RoomScheduleViewSet(viewsets.ModelViewSet):
     ordering = ['start_date', 'start_time']
 
     def perform_create(self, serializer):
-        """Automatically set the created_by field"""
-        serializer.save(created_by=self.request.user)
+        """Automatically set the created_by field, rejecting double bookings"""
+        save_without_conflicts(serializer, created_by=self.request.user)
+
+    def perform_update(self, serializer):
+        save_without_conflicts(serializer)
+
+    def _conflict_response(self, exc):
+        return Response(
+            {'error': str(exc), 'conflicts': exc.conflicts},
+            status=status.HTTP_409_CONFLICT
+        )
 
     def create(self, request, *args, **kwargs):
         """Override create to add conflict checking"""
         try:
             return super().create(request, *args, **kwargs)
+        except ScheduleConflict as e:
+            return self._conflict_response(e)
         except Exception as e:
             return Response(
                 {'error': str(e)}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+    def update(self, request, *args, **kwargs):
+        try:
+            return super().update(request, *args, **kwargs)
+        except ScheduleConflict as e:
+            return self._conflict_response(e)
+
+    @action(detail=False, methods=['post'], url_path='validate-batch')
+    def validate_batch(self, request):
+        """Check a whole timetable for double bookings without saving it"""
+        items = request.data.get('schedules') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list):
+            return Response(
+                {'error': 'Expected a list of schedules (or {"schedules": [...]}).'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = [{'index': index, 'valid': False, 'errors': {}, 'conflicts': [], 'batch_conflicts': []}
+                   for index in range(len(items))]
+        room_ids = set()
+        for item in items:
+            try:
+                room_ids.add(int(item.get('room')))
+            except (AttributeError, TypeError, ValueError):
+                continue
+        context = {'rooms': Room.objects.in_bulk(room_ids)}
+
+        rows, positions = [], []
+        for index, item in enumerate(items):
+            serializer = RoomScheduleBatchItemSerializer(data=item, context=context)
+            if not serializer.is_valid():
+                results[index]['errors'] = serializer.errors
+                continue
+            data = serializer.validated_data
+            rows.append({
+                'id': data.get('id'),
+                'room_id': data['room'].pk,
+                'start_date': data['start_date'],
+                'end_date': data['end_date'],
+                'start_time': data['start_time'],
+                'end_time': data['end_time'],
+                'is_recurring': data.get('is_recurring', False),
+                'recurring_days': data.get('recurring_days'),
+            })
+            positions.append(index)
+
+        for row_index, outcome in enumerate(validate_batch(rows)):
+            result = results[positions[row_index]]
+            result['conflicts'] = outcome['conflicts']
+            result['batch_conflicts'] = [positions[i] for i in outcome['batch_conflicts']]
+            result['valid'] = not outcome['conflicts'] and not outcome['batch_conflicts']
+
+        invalid = sum(1 for result in results if not result['valid'])
+        return Response({
+            'total': len(results),
+            'valid': len(results) - invalid,
+            'invalid': invalid,
+            'results': results
+        })
+
 
 class BuildingRoomsListView(APIView):
     """List all rooms in a specific building"""
@@ -162,8 +236,8 @@ class BuildingRoomsListView(APIView):
 
     def get(self, request, building_id):
         try:
-            building = Building.objects.get(building_id=building_id)
-            rooms = building.rooms.filter(is_active=True)
+            building = Building.objects.with_room_counts().get(building_id=building_id)
+            rooms = building.rooms.filter(is_active=True).select_related('building')
             
             # Apply filters
             room_type = request.query_params.get('room_type')
@@ -253,13 +327,8 @@ class AvailableRoomsView(APIView):
             except ValueError:
                 pass
         
-        # Check for schedule conflicts
-        conflicting_rooms = RoomSchedule.objects.filter(
-            start_date__lte=query_date,
-            end_date__gte=query_date,
-            start_time__lt=end_time_obj,
-            end_time__gt=start_time_obj
-        ).values_list('room_id', flat=True)
+        # Check for schedule conflicts (recurring schedules expanded in memory)
+        conflicting_rooms = availability.busy_room_ids(query_date, start_time_obj, end_time_obj)
         
         available_rooms = rooms.exclude(id__in=conflicting_rooms)
         
@@ -298,13 +367,8 @@ class AvailableRoomsView(APIView):
             if data.get('min_capacity'):
                 rooms = rooms.filter(capacity__gte=data['min_capacity'])
             
-            # Check for schedule conflicts
-            conflicting_rooms = RoomSchedule.objects.filter(
-                start_date__lte=data['date'],
-                end_date__gte=data['date'],
-                start_time__lt=data['end_time'],
-                end_time__gt=data['start_time']
-            ).values_list('room_id', flat=True)
+            # Check for schedule conflicts (recurring schedules expanded in memory)
+            conflicting_rooms = availability.busy_room_ids(data['date'], data['start_time'], data['end_time'])
             
             available_rooms = rooms.exclude(id__in=conflicting_rooms)
             
@@ -314,4 +378,147 @@ class AvailableRoomsView(APIView):
                 'available_rooms': room_serializer.data
             })
         
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class RoomAvailabilityGridView(APIView):
+    """Busy/free grid of rooms for a whole week in one request"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    # Hourly slots from 07:00 to 21:00 unless ``slots`` is given
+    default_slots = [(time(hour), time(hour + 1)) for hour in range(7, 21)]
+
+    def get(self, request):
+        try:
+            week_start = request.query_params.get('week_start')
+            if week_start:
+                week_start = datetime.strptime(week_start, '%Y-%m-%d').date()
+            else:
+                today = timezone.localdate()
+                week_start = today - timedelta(days=today.weekday())
+            days = min(max(int(request.query_params.get('days', 7)), 1), 31)
+            slots = self.default_slots
+            if request.query_params.get('slots'):
+                slots = []
+                for item in request.query_params['slots'].split(','):
+                    start, end = item.strip().split('-')
+                    slots.append((
+                        datetime.strptime(start, '%H:%M').time(),
+                        datetime.strptime(end, '%H:%M').time(),
+                    ))
+        except ValueError as e:
+            return Response(
+                {'error': f'Invalid date/time format: {str(e)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        rooms = Room.objects.filter(is_active=True).select_related('building')
+        building_id = request.query_params.get('building_id')
+        room_type = request.query_params.get('room_type')
+        if building_id:
+            rooms = rooms.filter(building__building_id=building_id)
+        if room_type:
+            rooms = rooms.filter(room_type=room_type)
+        rooms = list(rooms)
+
+        dates = [week_start + timedelta(days=offset) for offset in range(days)]
+        grid = availability.week_grid([room.id for room in rooms], dates, slots)
+
+        return Response({
+            'dates': dates,
+            'slots': [{'start_time': start, 'end_time': end} for start, end in slots],
+            'rooms': [
+                {
+                    'id': room.id,
+                    'room_id': room.room_id,
+                    'room_name': room.room_name,
+                    'building_name': room.building.building_name,
+                    'capacity': room.capacity,
+                    'status': room.status,
+                    'busy': grid[room.id],
+                }
+                for room in rooms
+            ]
+        })
+
+
+class TimetableGridView(APIView):
+    """Compact form of the availability grid: hex bitsets per room-day, with ETag revalidation"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            start = request.query_params.get('start')
+            if start:
+                start = datetime.strptime(start, '%Y-%m-%d').date()
+            else:
+                today = timezone.localdate()
+                start = today - timedelta(days=today.weekday())
+            end = request.query_params.get('end')
+            end = datetime.strptime(end, '%Y-%m-%d').date() if end else start + timedelta(days=6)
+            day_start = datetime.strptime(request.query_params.get('day_start', '07:00'), '%H:%M').time()
+            day_end = datetime.strptime(request.query_params.get('day_end', '21:00'), '%H:%M').time()
+            slot_minutes = int(request.query_params.get('slot_minutes', 30))
+        except ValueError as e:
+            return Response(
+                {'error': f'Invalid date/time format: {str(e)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if end < start or (end - start).days > 62:
+            return Response(
+                {'error': 'end must be on or after start and within 63 days'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not 5 <= slot_minutes <= 240 or day_end <= day_start:
+            return Response(
+                {'error': 'slot_minutes must be 5-240 and day_end after day_start'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        rooms = Room.objects.filter(is_active=True)
+        building_id = request.query_params.get('building_id')
+        room_type = request.query_params.get('room_type')
+        if building_id:
+            rooms = rooms.filter(building__building_id=building_id)
+        if room_type:
+            rooms = rooms.filter(room_type=room_type)
+
+        params = {
+            'start': start, 'end': end, 'day_start': day_start, 'day_end': day_end,
+            'slot_minutes': slot_minutes, 'building_id': building_id, 'room_type': room_type,
+        }
+        etag = quote_etag(timetable.fingerprint(rooms, start, end, params))
+        if_none_match = request.headers.get('If-None-Match', '')
+        if etag in [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')] or if_none_match.strip() == '*':
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        rooms = list(rooms.select_related('building').order_by('building__building_id', 'room_id'))
+        days, slots_per_day, grid = timetable.build_grid(rooms, start, end, day_start, day_end, slot_minutes)
+
+        response = Response({
+            'start': start,
+            'end': end,
+            'days': days,
+            'day_start': day_start,
+            'day_end': day_end,
+            'slot_minutes': slot_minutes,
+            'slots_per_day': slots_per_day,
+            # Hex bitset per room-day; bit i (least significant first) = slot i busy
+            'encoding': 'hex-bitset-lsb',
+            'rooms': [
+                {
+                    'id': room.id,
+                    'room_id': room.room_id,
+                    'room_name': room.room_name,
+                    'building_id': room.building.building_id,
+                    'room_type': room.room_type,
+                    'capacity': room.capacity,
+                    'occupancy': grid[room.id],
+                }
+                for room in rooms
+            ]
+        })
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
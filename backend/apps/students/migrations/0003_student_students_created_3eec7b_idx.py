@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0002_student_user_student_students_student_1ff8ed_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['-created_at', '-id'], name='students_created_3eec7b_idx'),
+        ),
+    ]
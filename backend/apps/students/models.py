@@ -52,6 +52,8 @@ class Student(models.Model):
             models.Index(fields=['last_name', 'first_name']),
             models.Index(fields=['is_active']),
             models.Index(fields=['created_at']),
+            # Keyset pagination: ORDER BY created_at DESC, id DESC
+            models.Index(fields=['-created_at', '-id']),
         ]
     
     def __str__(self):
@@ -0,0 +1,9 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.core.view_cache import bump
+from .models import Student
+
+
+@receiver([post_save, post_delete], sender=Student)
+def invalidate_student_views(sender, instance, **kwargs):
+    bump('students')
@@ -12,12 +12,15 @@ from django.db.models import Q
 from .models import Student
 from .serializers import StudentSerializer, StudentCreateSerializer
 from .bulk_views import bulk_create_students
+from apps.core.pagination import KeysetPaginationMixin
+from apps.core.view_cache import cached_view
 
 
-class StudentListCreateView(generics.ListCreateAPIView):
-    """List and create students with pagination"""
+class StudentListCreateView(KeysetPaginationMixin, generics.ListCreateAPIView):
+    """List and create students with pagination (``?pagination=cursor`` for keyset mode)"""
     queryset = Student.objects.select_related('user').all()
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('-created_at', '-id')
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -42,7 +45,7 @@ class StudentListCreateView(generics.ListCreateAPIView):
                 is_active = is_active.lower() == 'true'
                 queryset = queryset.filter(is_active=is_active)
                 
-            return queryset.order_by('-created_at')
+            return queryset.order_by('-created_at', '-id')
         except Exception as e:
             logger.error(f'Error in get_queryset: {str(e)}')
             return Student.objects.none()
@@ -378,6 +381,7 @@ def export_excel(request):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@cached_view(scopes=['students'])
 def student_statistics(request):
     """Get comprehensive student statistics"""
     try:
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:57
+
+import apps.files.storage
+import apps.submissions.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submissions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='submission',
+            name='file',
+            field=models.FileField(max_length=255, storage=apps.files.storage.blob_storage, upload_to=apps.submissions.models.submission_upload_path),
+        ),
+    ]
@@ -4,6 +4,7 @@ import os
 
 from apps.accounts.models import User
 from apps.classes.models import Class, ClassStudent
+from apps.files.storage import blob_storage
 from apps.students.models import Student
 
 SUBMISSION_ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'ppt', 'pptx', 'xls', 'xlsx', 'zip'}
@@ -23,7 +24,7 @@ class Submission(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='submissions')
     title = models.CharField(max_length=200, blank=True, null=True)
     description = models.TextField(blank=True, null=True)
-    file = models.FileField(upload_to=submission_upload_path)
+    file = models.FileField(upload_to=submission_upload_path, storage=blob_storage, max_length=255)
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='created_submissions')
     created_at = models.DateTimeField(auto_now_add=True)
 
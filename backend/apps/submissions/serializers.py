@@ -1,22 +1,37 @@
+from django.urls import reverse
 from rest_framework import serializers
 from .models import Submission, SUBMISSION_ALLOWED_EXTENSIONS, SUBMISSION_MAX_FILE_SIZE, SUBMISSION_MAX_FILE_SIZE_MB
+from apps.files.models import UploadSession
+from apps.files.uploads import UploadError, open_upload, consume_upload
 import os
 
 
 class SubmissionSerializer(serializers.ModelSerializer):
     file_url = serializers.SerializerMethodField()
+    # Permission-checked download, also served in production (apps.files.downloads)
+    download_url = serializers.SerializerMethodField()
     file_size = serializers.SerializerMethodField()
     student_info = serializers.SerializerMethodField()
+    # Id of a finished chunked upload (apps.files), instead of a multipart file
+    upload_id = serializers.UUIDField(write_only=True, required=False)
 
     class Meta:
         model = Submission
         fields = [
             'id', 'class_obj', 'student', 'title', 'description', 'file',
-            'file_url', 'file_size', 'student_info', 'created_at'
+            'file_url', 'download_url', 'file_size', 'student_info', 'created_at', 'upload_id'
         ]
+        extra_kwargs = {'file': {'required': False}}
         read_only_fields = ['id', 'student', 'created_at', 'file_size', 'student_info']
 
     def validate(self, attrs):
+        upload_id = attrs.pop('upload_id', None)
+        if upload_id:
+            request = self.context.get('request')
+            try:
+                attrs['file'] = open_upload(upload_id, request.user, UploadSession.Purpose.SUBMISSION)
+            except UploadError as e:
+                raise serializers.ValidationError({'upload_id': str(e)})
         file = attrs.get('file') or getattr(getattr(self, 'instance', None), 'file', None)
         errors = {}
         if not file:
@@ -32,6 +47,13 @@ class SubmissionSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(errors)
         return attrs
 
+    def save(self, **kwargs):
+        upload = self.validated_data.get('file')
+        instance = super().save(**kwargs)
+        if hasattr(upload, 'session'):
+            consume_upload(upload)
+        return instance
+
     def get_file_url(self, obj):
         request = self.context.get('request')
         try:
@@ -41,6 +63,13 @@ class SubmissionSerializer(serializers.ModelSerializer):
             return None
         return None
 
+    def get_download_url(self, obj):
+        if not obj.file or not obj.pk:
+            return None
+        request = self.context.get('request')
+        url = reverse('submission_download', args=[obj.pk])
+        return request.build_absolute_uri(url) if request else url
+
     def get_file_size(self, obj):
         try:
             return getattr(obj.file, 'size', None) if obj.file else None
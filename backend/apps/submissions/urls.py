@@ -3,5 +3,7 @@ from . import views
 
 urlpatterns = [
     path('', views.SubmissionListCreateView.as_view(), name='submission_list_create'),
+    path('download/', views.download_class_submissions, name='submission_class_download'),
     path('<int:pk>/', views.SubmissionDetailView.as_view(), name='submission_detail'),
+    path('<int:pk>/download/', views.download_submission, name='submission_download'),
 ]
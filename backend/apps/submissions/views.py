@@ -1,12 +1,17 @@
 from rest_framework import generics, status, permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 
 from .models import Submission
 from .serializers import SubmissionSerializer
 from apps.classes.models import Class, ClassStudent
 from apps.students.models import Student
+from apps.files.archives import ZipStream, csv_bytes, zip_response
+from apps.files.downloads import serve_file
 
 
 class IsAuthenticatedAndRole(permissions.BasePermission):
@@ -52,24 +57,24 @@ class SubmissionListCreateView(generics.ListCreateAPIView):
     def perform_create(self, serializer):
         user = self.request.user
         if user.role != 'student':
-            raise permissions.PermissionDenied('Chỉ sinh viên mới được nộp bài.')
+            raise PermissionDenied('Chỉ sinh viên mới được nộp bài.')
 
         class_obj = serializer.validated_data.get('class_obj')
         if not class_obj:
-            raise permissions.PermissionDenied('Thiếu thông tin lớp học.')
+            raise PermissionDenied('Thiếu thông tin lớp học.')
 
         # Verify enrollment
         is_enrolled = ClassStudent.objects.filter(
             class_obj=class_obj, student__email__iexact=user.email, is_active=True
         ).exists()
         if not is_enrolled:
-            raise permissions.PermissionDenied('Bạn không thuộc lớp này, không thể nộp bài.')
+            raise PermissionDenied('Bạn không thuộc lớp này, không thể nộp bài.')
 
         # Find the Student profile
         try:
             student = Student.objects.get(email__iexact=user.email)
         except Student.DoesNotExist:
-            raise permissions.PermissionDenied('Không tìm thấy hồ sơ sinh viên cho tài khoản này.')
+            raise PermissionDenied('Không tìm thấy hồ sơ sinh viên cho tài khoản này.')
 
         serializer.save(student=student, created_by=user)
 
@@ -93,3 +98,62 @@ class SubmissionDetailView(generics.RetrieveDestroyAPIView):
                 return super().destroy(request, *args, **kwargs)
             return Response({'error': 'Bạn không có quyền xoá bài nộp này.'}, status=status.HTTP_403_FORBIDDEN)
         return Response({'error': 'Không có quyền.'}, status=status.HTTP_403_FORBIDDEN)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticatedAndRole])
+def download_submission(request, pk):
+    """Protected download of a submitted file: its student, the class teacher or an admin."""
+    try:
+        submission = Submission.objects.select_related('class_obj', 'student').get(pk=pk)
+    except Submission.DoesNotExist:
+        return Response({'error': 'Không tìm thấy bài nộp'}, status=status.HTTP_404_NOT_FOUND)
+    user = request.user
+    allowed = (
+        user.role == 'admin'
+        or (user.role == 'teacher' and submission.class_obj.teacher_id == user.id)
+        or (user.role == 'student' and submission.student.email.lower() == user.email.lower())
+    )
+    if not allowed:
+        return Response({'error': 'Bạn không có quyền tải bài nộp này.'}, status=status.HTTP_403_FORBIDDEN)
+    return serve_file(request, submission.file, submission.file_name)
+
+
+MANIFEST_HEADER = ['STT', 'MSSV', 'Họ tên', 'Tiêu đề', 'Nộp lúc', 'File']
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticatedAndRole])
+def download_class_submissions(request):
+    """All submissions of ``?class_id=`` as one streamed ZIP (``<MSSV>/<file>``) plus ``manifest.csv``."""
+    try:
+        class_obj = Class.objects.get(pk=request.query_params.get('class_id'))
+    except (Class.DoesNotExist, ValueError, TypeError):
+        return Response({'error': 'Không tìm thấy lớp học.'}, status=status.HTTP_404_NOT_FOUND)
+    user = request.user
+    if user.role != 'admin' and class_obj.teacher_id != user.id:
+        return Response({'error': 'Bạn không có quyền tải bài nộp của lớp này.'}, status=status.HTTP_403_FORBIDDEN)
+
+    submissions = (
+        Submission.objects.filter(class_obj=class_obj)
+        .select_related('student')
+        .order_by('student__student_id', 'created_at')
+    )
+
+    def archive():
+        stream = ZipStream()
+        rows = []
+        for submission in submissions.iterator(chunk_size=200):
+            student = submission.student
+            name = (yield from stream.add_file(
+                f'{student.student_id}/{submission.file_name}', submission.file, submission.created_at
+            )) or ''
+            rows.append([
+                len(rows) + 1, student.student_id, student.full_name, submission.title or '',
+                timezone.localtime(submission.created_at).strftime('%d/%m/%Y %H:%M'), name,
+            ])
+        yield from stream.add_bytes('manifest.csv', csv_bytes(MANIFEST_HEADER, rows))
+        yield from stream.close()
+
+    filename = f"Bai_nop_{class_obj.class_id}_{timezone.localtime().strftime('%Y%m%d')}.zip"
+    return zip_response(archive(), filename)
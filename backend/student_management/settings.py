@@ -48,6 +48,7 @@ THIRD_PARTY_APPS = [
     'rest_framework',
     'corsheaders',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'django_filters',
 ]
 
@@ -62,12 +63,15 @@ LOCAL_APPS = [
     'apps.assignments',
     'apps.submissions',
     'apps.grouping',
+    'apps.files',
+    'apps.core',
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'apps.core.profiling.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -124,6 +128,39 @@ else:
         }
     }
 
+# Cache
+# Shared Redis cache when CACHE_URL is set (e.g. redis://localhost:6379/1),
+# otherwise a per-process memory cache for development and tests. Required
+# with several workers: invalidations (room availability, cached views, JWT
+# principals) only reach other processes through a shared cache
+if config('CACHE_URL', default=None):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': config('CACHE_URL'),
+            'KEY_PREFIX': config('CACHE_KEY_PREFIX', default='sm'),
+            'TIMEOUT': config('CACHE_TIMEOUT', default=300, cast=int),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'student-management',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+# Room availability index (apps.rooms.availability): seconds before a loaded
+# day is re-read, the upper bound on staleness when CACHE_URL is not shared
+ROOM_AVAILABILITY_MAX_AGE = config('ROOM_AVAILABILITY_MAX_AGE', default=60, cast=int)
+
+# Cached API responses (apps.core.view_cache)
+VIEW_CACHE_ENABLED = config('VIEW_CACHE_ENABLED', default=True, cast=bool)
+VIEW_CACHE_TIMEOUT = config('VIEW_CACHE_TIMEOUT', default=300, cast=int)
+VIEW_CACHE_LOCAL_TTL = config('VIEW_CACHE_LOCAL_TTL', default=5, cast=int)
+VIEW_CACHE_LOCAL_MAXSIZE = config('VIEW_CACHE_LOCAL_MAXSIZE', default=2048, cast=int)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -140,6 +177,27 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing. PASSWORD_HASHER=argon2 needs argon2-cffi installed.
+# Keep every Django default hasher listed so existing hashes still verify.
+PASSWORD_PBKDF2_ITERATIONS = config('PASSWORD_PBKDF2_ITERATIONS', default=600000, cast=int)
+PASSWORD_ARGON2_TIME_COST = config('PASSWORD_ARGON2_TIME_COST', default=2, cast=int)
+PASSWORD_ARGON2_MEMORY_COST = config('PASSWORD_ARGON2_MEMORY_COST', default=102400, cast=int)
+PASSWORD_ARGON2_PARALLELISM = config('PASSWORD_ARGON2_PARALLELISM', default=8, cast=int)
+PASSWORD_HASHERS = [
+    'apps.accounts.hashers.TunedPBKDF2PasswordHasher',
+    'apps.accounts.hashers.TunedArgon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+if config('PASSWORD_HASHER', default='pbkdf2') == 'argon2':
+    PASSWORD_HASHERS.insert(0, PASSWORD_HASHERS.pop(1))
+
+# Last-login write-behind (apps.accounts.login_tracking)
+LAST_LOGIN_WRITE_INTERVAL = config('LAST_LOGIN_WRITE_INTERVAL', default=300, cast=int)
+LAST_LOGIN_FLUSH_SIZE = config('LAST_LOGIN_FLUSH_SIZE', default=200, cast=int)
+LAST_LOGIN_FLUSH_INTERVAL = config('LAST_LOGIN_FLUSH_INTERVAL', default=5, cast=int)
+
 # Internationalization
 LANGUAGE_CODE = 'vi-vn'
 TIME_ZONE = 'Asia/Ho_Chi_Minh'
@@ -153,6 +211,29 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Chunked uploads (apps.files.uploads); keep on the same disk as MEDIA_ROOT
+# so finished files are moved into place instead of copied
+UPLOAD_SESSION_DIR = config('UPLOAD_SESSION_DIR', default=str(BASE_DIR / 'tmp' / 'uploads'))
+UPLOAD_CHUNK_SIZE = config('UPLOAD_CHUNK_SIZE', default=1024 * 1024, cast=int)
+UPLOAD_MAX_CHUNK_SIZE = config('UPLOAD_MAX_CHUNK_SIZE', default=8 * 1024 * 1024, cast=int)
+UPLOAD_SESSION_TTL_HOURS = config('UPLOAD_SESSION_TTL_HOURS', default=24, cast=int)
+
+# Deduplicated file storage (apps.files.storage): unreferenced blobs are
+# deleted by the gc_blobs job once untouched for this long
+BLOB_GC_GRACE_HOURS = config('BLOB_GC_GRACE_HOURS', default=24, cast=int)
+
+# Protected downloads (apps.files.downloads): 'nginx' hands the transfer to an
+# internal nginx location (X-Accel-Redirect), 'sendfile' to Apache/lighttpd
+# (X-Sendfile); empty streams the file from Django with Range support
+MEDIA_SENDFILE = config('MEDIA_SENDFILE', default='')
+MEDIA_SENDFILE_PREFIX = config('MEDIA_SENDFILE_PREFIX', default='/protected-media/')
+
+# Assignment deadlines (apps.assignments.deadlines): expired timed drafts are
+# closed and overdue ones flagged late by Celery beat ('celery'), a thread in
+# each web process ('thread') or an external job ('off')
+ASSIGNMENT_SCHEDULER = config('ASSIGNMENT_SCHEDULER', default='celery')
+ASSIGNMENT_SCHEDULER_INTERVAL = config('ASSIGNMENT_SCHEDULER_INTERVAL', default=60, cast=int)
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -162,7 +243,7 @@ AUTH_USER_MODEL = 'accounts.User'
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.accounts.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -176,13 +257,18 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Cached JWT principal (apps.accounts.authentication)
+AUTH_PRINCIPAL_LOCAL_TTL = config('AUTH_PRINCIPAL_LOCAL_TTL', default=30, cast=int)
+AUTH_PRINCIPAL_CACHE_TTL = config('AUTH_PRINCIPAL_CACHE_TTL', default=300, cast=int)
+AUTH_PRINCIPAL_LOCAL_MAXSIZE = config('AUTH_PRINCIPAL_LOCAL_MAXSIZE', default=4096, cast=int)
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
-    'UPDATE_LAST_LOGIN': True,
+    'UPDATE_LAST_LOGIN': False,  # handled by apps.accounts.login_tracking
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
     'VERIFYING_KEY': None,
@@ -201,8 +287,14 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_EXP_CLAIM': 'refresh_exp',
     'SLIDING_TOKEN_LIFETIME': timedelta(minutes=5),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
+    'TOKEN_REFRESH_SERIALIZER': 'apps.accounts.token_store.CachedTokenRefreshSerializer',
 }
 
+# Refresh token store (apps.accounts.token_store)
+TOKEN_BLACKLIST_CACHE = config('TOKEN_BLACKLIST_CACHE', default=True, cast=bool)
+TOKEN_BLACKLIST_CACHE_AUTHORITATIVE = config('TOKEN_BLACKLIST_CACHE_AUTHORITATIVE', default=False, cast=bool)
+TOKEN_PRUNE_BATCH_SIZE = config('TOKEN_PRUNE_BATCH_SIZE', default=1000, cast=int)
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -222,12 +314,18 @@ CORS_ALLOW_CREDENTIALS = True
 # CORS_ALLOW_ALL_ORIGINS = True  # Disabled for security
 
 # Email settings
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
 EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default=f"EduAttend <{EMAIL_HOST_USER or 'noreply@eduattend.com'}>")
+
+# Outbound mail queue (apps.core.mailer): 'celery', 'thread' or 'sync'.
+# 'thread' keeps mail in process memory, lost if the worker is restarted
+MAIL_QUEUE = config('MAIL_QUEUE', default='celery')
+MAIL_BATCH_SIZE = config('MAIL_BATCH_SIZE', default=100, cast=int)
 
 # Celery settings
 CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://localhost:6379/0')
@@ -236,6 +334,34 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'prune-expired-tokens': {
+        'task': 'apps.accounts.tasks.prune_expired_tokens',
+        'schedule': 60 * 60,
+    },
+    'purge-upload-sessions': {
+        'task': 'apps.files.tasks.purge_upload_sessions',
+        'schedule': 60 * 60,
+    },
+    'gc-blobs': {
+        'task': 'apps.files.tasks.gc_blobs',
+        'schedule': 24 * 60 * 60,
+    },
+    'close-expired-submissions': {
+        'task': 'apps.assignments.tasks.close_expired_submissions',
+        'schedule': ASSIGNMENT_SCHEDULER_INTERVAL,
+    },
+}
+
+# Request profiling (apps.core.profiling); /api/metrics/ and manage.py perf_report.
+# Off unless enabled: it wraps every sampled request and writes under logs/perf
+PERF_PROFILING = config('PERF_PROFILING', default=False, cast=bool)
+PERF_SAMPLE_RATE = config('PERF_SAMPLE_RATE', default=1.0 if DEBUG else 0.1, cast=float)
+PERF_NPLUSONE_THRESHOLD = config('PERF_NPLUSONE_THRESHOLD', default=5, cast=int)
+PERF_STATS_DIR = BASE_DIR / 'logs' / 'perf'
+PERF_FLUSH_INTERVAL = config('PERF_FLUSH_INTERVAL', default=30, cast=int)
+PERF_SNAPSHOT_TTL = config('PERF_SNAPSHOT_TTL', default=60 * 60, cast=int)
+PERF_METRICS_TOKEN = config('PERF_METRICS_TOKEN', default='')
 
 # Logging configuration
 LOGGING = {
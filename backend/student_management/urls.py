@@ -6,6 +6,8 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from apps.core.views import metrics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('apps.accounts.urls')),
@@ -19,6 +21,8 @@ urlpatterns = [
     path('api/assignments/', include('apps.assignments.urls')),
     path('api/submissions/', include('apps.submissions.urls')),
     path('api/grouping/', include('apps.grouping.urls')),
+    path('api/files/', include('apps.files.urls')),
+    path('api/metrics/', metrics, name='metrics'),
 ]
 
 if settings.DEBUG: